@@ -0,0 +1,77 @@
+"""Baseline schema for alerts and patches
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+
+Databases created earlier by init_db() already match this revision and
+can be marked with ``alembic stamp 0001_baseline``.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+alert_severity = sa.Enum("CRITICAL", "HIGH", "MEDIUM", "LOW", name="alertseverity")
+alert_status = sa.Enum("OPEN", "IN_PROGRESS", "RESOLVED", "CLOSED", name="alertstatus")
+patch_severity = sa.Enum("CRITICAL", "IMPORTANT", "MODERATE", "LOW", name="patchseverity")
+patch_status = sa.Enum(
+    "PENDING", "SCHEDULED", "IN_PROGRESS", "COMPLETED", "FAILED", "ROLLED_BACK", name="patchstatus"
+)
+
+
+def upgrade():
+    op.create_table(
+        "alerts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("severity", alert_severity),
+        sa.Column("status", alert_status),
+        sa.Column("source_system", sa.String(100)),
+        sa.Column("source_id", sa.String(100)),
+        sa.Column("assigned_to", sa.String(100)),
+        sa.Column("ai_priority_score", sa.Integer()),
+        sa.Column("ai_classification", sa.String(100)),
+        sa.Column("auto_resolved", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("resolved_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_alerts_id", "alerts", ["id"])
+
+    op.create_table(
+        "patches",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("patch_id", sa.String(100), nullable=False, unique=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("severity", patch_severity),
+        sa.Column("status", patch_status),
+        sa.Column("vendor", sa.String(100)),
+        sa.Column("product", sa.String(100)),
+        sa.Column("version", sa.String(50)),
+        sa.Column("kb_article", sa.String(100)),
+        sa.Column("download_url", sa.String(500)),
+        sa.Column("file_size", sa.Integer()),
+        sa.Column("prerequisites", sa.JSON()),
+        sa.Column("target_systems", sa.JSON()),
+        sa.Column("deployment_schedule", sa.DateTime(timezone=True)),
+        sa.Column("auto_approved", sa.Boolean()),
+        sa.Column("requires_reboot", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("deployed_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_patches_id", "patches", ["id"])
+
+
+def downgrade():
+    op.drop_table("patches")
+    op.drop_table("alerts")
+    for enum in (patch_status, patch_severity, alert_status, alert_severity):
+        enum.drop(op.get_bind(), checkfirst=True)
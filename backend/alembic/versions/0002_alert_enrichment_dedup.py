@@ -0,0 +1,56 @@
+"""Alert enrichment, deduplication and correlation columns
+
+Revision ID: 0002_alert_enrichment_dedup
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_alert_enrichment_dedup"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "alert_clusters",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("alert_count", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("first_seen_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("last_seen_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_alert_clusters_id", "alert_clusters", ["id"])
+
+    with op.batch_alter_table("alerts") as batch:
+        batch.add_column(sa.Column("ml_severity", sa.String(20)))
+        batch.add_column(sa.Column("enriched_at", sa.DateTime(timezone=True)))
+        batch.add_column(sa.Column("fingerprint", sa.String(64)))
+        batch.add_column(sa.Column("occurrence_count", sa.Integer(), nullable=False, server_default="1"))
+        batch.add_column(sa.Column("last_seen_at", sa.DateTime(timezone=True), server_default=sa.func.now()))
+        batch.add_column(sa.Column("cluster_id", sa.Integer()))
+        batch.create_foreign_key("fk_alerts_cluster_id", "alert_clusters", ["cluster_id"], ["id"])
+    op.create_index("ix_alerts_cluster_id", "alerts", ["cluster_id"])
+
+    open_statuses = sa.text("status IN ('OPEN', 'IN_PROGRESS')")
+    op.create_index(
+        "uq_alerts_open_fingerprint",
+        "alerts",
+        ["fingerprint"],
+        unique=True,
+        postgresql_where=open_statuses,
+        sqlite_where=open_statuses,
+    )
+
+
+def downgrade():
+    op.drop_index("uq_alerts_open_fingerprint", table_name="alerts")
+    op.drop_index("ix_alerts_cluster_id", table_name="alerts")
+    with op.batch_alter_table("alerts") as batch:
+        batch.drop_constraint("fk_alerts_cluster_id", type_="foreignkey")
+        for column in ("cluster_id", "last_seen_at", "occurrence_count", "fingerprint", "enriched_at", "ml_severity"):
+            batch.drop_column(column)
+    op.drop_table("alert_clusters")
@@ -0,0 +1,42 @@
+"""Composite indexes for keyset pagination of alert listings
+
+Revision ID: 0003_alert_keyset_indexes
+Revises: 0002_alert_enrichment_dedup
+Create Date: 2026-10-18
+
+On PostgreSQL the indexes are built CONCURRENTLY so large alert tables
+stay writable during the upgrade.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_alert_keyset_indexes"
+down_revision = "0002_alert_enrichment_dedup"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_alerts_created_at_id": [],
+    "ix_alerts_status_created_at_id": ["status"],
+    "ix_alerts_severity_created_at_id": ["severity"],
+}
+
+
+def upgrade():
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, leading in INDEXES.items():
+            op.create_index(
+                name,
+                "alerts",
+                [*leading, sa.text("created_at DESC"), sa.text("id DESC")],
+                postgresql_concurrently=concurrently,
+            )
+
+
+def downgrade():
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name="alerts", postgresql_concurrently=concurrently)
@@ -0,0 +1,34 @@
+"""Hourly and daily metric rollups for the dashboard
+
+Revision ID: 0004_metric_rollups
+Revises: 0003_alert_keyset_indexes
+Create Date: 2026-10-18
+
+Populate with ``python -m app.commands.backfill_rollups`` after upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_metric_rollups"
+down_revision = "0003_alert_keyset_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "metric_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("granularity", sa.String(10), nullable=False),
+        sa.Column("metric", sa.String(50), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("total", sa.Float(), nullable=False, server_default="0"),
+        sa.UniqueConstraint("granularity", "metric", "bucket_start", name="uq_metric_rollups_bucket"),
+    )
+    op.create_index("ix_metric_rollups_id", "metric_rollups", ["id"])
+
+
+def downgrade():
+    op.drop_table("metric_rollups")
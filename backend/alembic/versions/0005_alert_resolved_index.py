@@ -0,0 +1,30 @@
+"""Index resolved alerts by (resolved_at, id) for incremental model training
+
+Revision ID: 0005_alert_resolved_index
+Revises: 0004_metric_rollups
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0005_alert_resolved_index"
+down_revision = "0004_metric_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_alerts_resolved_at_id",
+            "alerts",
+            ["resolved_at", "id"],
+            postgresql_concurrently=concurrently,
+        )
+
+
+def downgrade():
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_alerts_resolved_at_id", table_name="alerts", postgresql_concurrently=concurrently)
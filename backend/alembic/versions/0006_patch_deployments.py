@@ -0,0 +1,70 @@
+"""Wave-based patch deployments and per-host rollout progress
+
+Revision ID: 0006_patch_deployments
+Revises: 0005_alert_resolved_index
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0006_patch_deployments"
+down_revision = "0005_alert_resolved_index"
+branch_labels = None
+depends_on = None
+
+target_status = sa.Enum("PENDING", "SUCCEEDED", "FAILED", "ROLLED_BACK", name="targetstatus")
+
+
+def upgrade():
+    # patchstatus already exists (0001_baseline); reference it without re-creating
+    patch_status = postgresql.ENUM(
+        "PENDING", "SCHEDULED", "IN_PROGRESS", "COMPLETED", "FAILED", "ROLLED_BACK",
+        name="patchstatus",
+        create_type=False,
+    )
+
+    op.create_table(
+        "patch_deployments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("patch_id", sa.Integer(), sa.ForeignKey("patches.id"), nullable=False),
+        sa.Column("status", patch_status, nullable=False),
+        sa.Column("executor", sa.String(50), nullable=False),
+        sa.Column("total_targets", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_waves", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("current_wave", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("succeeded", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("concurrency", sa.Integer(), nullable=False),
+        sa.Column("failure_threshold", sa.Float(), nullable=False),
+        sa.Column("error", sa.Text()),
+        sa.Column("scheduled_for", sa.DateTime(timezone=True)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_patch_deployments_id", "patch_deployments", ["id"])
+    op.create_index("ix_patch_deployments_patch_id", "patch_deployments", ["patch_id"])
+
+    op.create_table(
+        "patch_deployment_targets",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("deployment_id", sa.Integer(), sa.ForeignKey("patch_deployments.id"), nullable=False),
+        sa.Column("host", sa.String(255), nullable=False),
+        sa.Column("wave", sa.Integer(), nullable=False),
+        sa.Column("status", target_status, nullable=False),
+        sa.Column("error", sa.Text()),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index(
+        "ix_patch_deployment_targets_wave",
+        "patch_deployment_targets",
+        ["deployment_id", "wave", "status"],
+    )
+
+
+def downgrade():
+    op.drop_table("patch_deployment_targets")
+    op.drop_table("patch_deployments")
+    target_status.drop(op.get_bind(), checkfirst=True)
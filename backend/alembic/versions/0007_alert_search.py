@@ -0,0 +1,40 @@
+"""Full-text and trigram search over alert titles and descriptions
+
+Revision ID: 0007_alert_search
+Revises: 0006_patch_deployments
+Create Date: 2026-10-18
+
+PostgreSQL only; SQLite deployments search with the in-process index.
+Adding the stored generated column rewrites the alerts table once.
+"""
+from alembic import op
+
+
+revision = "0007_alert_search"
+down_revision = "0006_patch_deployments"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "ALTER TABLE alerts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+        ") STORED"
+    )
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY ix_alerts_search_vector ON alerts USING gin (search_vector)")
+        op.execute("CREATE INDEX CONCURRENTLY ix_alerts_title_trgm ON alerts USING gin (title gin_trgm_ops)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_alerts_title_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_alerts_search_vector")
+    op.execute("ALTER TABLE alerts DROP COLUMN search_vector")
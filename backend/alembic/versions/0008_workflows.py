@@ -0,0 +1,56 @@
+"""Workflow definitions and runs with compact per-step state
+
+Revision ID: 0008_workflows
+Revises: 0007_alert_search
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008_workflows"
+down_revision = "0007_alert_search"
+branch_labels = None
+depends_on = None
+
+workflow_run_status = sa.Enum("PENDING", "RUNNING", "SUCCEEDED", "FAILED", name="workflowrunstatus")
+
+
+def upgrade():
+    op.create_table(
+        "workflows",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False, unique=True),
+        sa.Column("description", sa.Text()),
+        sa.Column("definition", sa.JSON(), nullable=False),
+        sa.Column("trigger_classification", sa.String(100)),
+        sa.Column("max_concurrency", sa.Integer()),
+        sa.Column("enabled", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_workflows_id", "workflows", ["id"])
+    op.create_index("ix_workflows_trigger_classification", "workflows", ["trigger_classification"])
+
+    op.create_table(
+        "workflow_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("workflow_id", sa.Integer(), sa.ForeignKey("workflows.id"), nullable=False),
+        sa.Column("alert_id", sa.Integer(), sa.ForeignKey("alerts.id")),
+        sa.Column("status", workflow_run_status, nullable=False),
+        sa.Column("step_states", sa.String(255), nullable=False),
+        sa.Column("context", sa.JSON()),
+        sa.Column("error", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_workflow_runs_id", "workflow_runs", ["id"])
+    op.create_index("ix_workflow_runs_workflow_id", "workflow_runs", ["workflow_id"])
+    op.create_index("ix_workflow_runs_status_id", "workflow_runs", ["status", "id"])
+
+
+def downgrade():
+    op.drop_table("workflow_runs")
+    op.drop_table("workflows")
+    workflow_run_status.drop(op.get_bind(), checkfirst=True)
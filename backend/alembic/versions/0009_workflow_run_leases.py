@@ -0,0 +1,24 @@
+"""Owner and lease on workflow runs so engines only take over dead ones
+
+Revision ID: 0009_workflow_run_leases
+Revises: 0008_workflows
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009_workflow_run_leases"
+down_revision = "0008_workflows"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("workflow_runs", sa.Column("owner", sa.String(100)))
+    op.add_column("workflow_runs", sa.Column("lease_expires_at", sa.DateTime(timezone=True)))
+
+
+def downgrade():
+    op.drop_column("workflow_runs", "lease_expires_at")
+    op.drop_column("workflow_runs", "owner")
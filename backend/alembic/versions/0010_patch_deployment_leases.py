@@ -0,0 +1,24 @@
+"""Owner and lease on patch deployments so only one worker runs each rollout
+
+Revision ID: 0010_patch_deployment_leases
+Revises: 0009_workflow_run_leases
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010_patch_deployment_leases"
+down_revision = "0009_workflow_run_leases"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("patch_deployments", sa.Column("owner", sa.String(100)))
+    op.add_column("patch_deployments", sa.Column("lease_expires_at", sa.DateTime(timezone=True)))
+
+
+def downgrade():
+    op.drop_column("patch_deployments", "lease_expires_at")
+    op.drop_column("patch_deployments", "owner")
@@ -0,0 +1,22 @@
+"""Lease on pending alerts so only one process queues each for enrichment
+
+Revision ID: 0011_alert_enrichment_leases
+Revises: 0010_patch_deployment_leases
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011_alert_enrichment_leases"
+down_revision = "0010_patch_deployment_leases"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("alerts", sa.Column("enrichment_lease_expires_at", sa.DateTime(timezone=True)))
+
+
+def downgrade():
+    op.drop_column("alerts", "enrichment_lease_expires_at")
@@ -0,0 +1,27 @@
+"""Named leases electing one process for singleton background jobs
+
+Revision ID: 0012_leases
+Revises: 0011_alert_enrichment_leases
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012_leases"
+down_revision = "0011_alert_enrichment_leases"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "leases",
+        sa.Column("name", sa.String(100), primary_key=True),
+        sa.Column("owner", sa.String(100), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("leases")
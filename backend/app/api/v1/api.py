@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import alerts, patches, workflows, dashboard, integrations
+from app.api.v1.endpoints import alerts, patches, workflows, dashboard, integrations, system
 
 api_router = APIRouter()
 
@@ -8,4 +8,5 @@ api_router.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
 api_router.include_router(patches.router, prefix="/patches", tags=["patches"])
 api_router.include_router(workflows.router, prefix="/workflows", tags=["workflows"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
-api_router.include_router(integrations.router, prefix="/integrations", tags=["integrations"])
\ No newline at end of file
+api_router.include_router(integrations.router, prefix="/integrations", tags=["integrations"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
\ No newline at end of file
@@ -1,16 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime
+import asyncio
+import json
+import re
 
-from app.core.database import get_db
-from app.models.alert import Alert, AlertSeverity, AlertStatus
-from app.schemas.alert import AlertCreate, AlertUpdate, AlertResponse
+from app.core.config import settings
+from app.core.database import ReadSessionLocal, get_db, get_read_db
+from app.core.pagination import decode_cursor, decode_rank_cursor, encode_cursor, encode_rank_cursor
+from app.core.responses import FastJSONResponse
+from app.models.alert import Alert, AlertSeverity, AlertStatus, OPEN_ALERT_STATUSES
+from app.schemas.alert import (
+    AlertCreate,
+    AlertUpdate,
+    AlertResponse,
+    AlertClusterResponse,
+    AlertBulkResolve,
+    BulkAlertCreated,
+    BulkAlertError,
+    BulkAlertResponse,
+    BulkResolveResponse,
+)
+from app.services.alert_export import CURSOR_COLUMN, EXPORT_FORMATS, EXPORT_WRITERS, parquet_available, with_cursors
+from app.services.alert_search import AlertSearchService
 from app.services.alert_service import AlertService
 from app.services.ai_service import AIService
+from app.services.ai_client import AIClient, get_ai_client
+from app.services.ai_cache import analysis_cache
+from app.services.enrichment import (
+    EnrichmentQueueFull,
+    build_job,
+    enrichment_backend,
+    predict_severities,
+    trigger_workflows,
+)
+from app.services.dedup_service import DedupService, alert_fingerprint
+from app.services.event_stream import event_broker
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# Columns of AlertResponse, served straight from the alerts table
+ALERT_LIST_FIELDS = tuple(AlertResponse.model_fields)
+
+
+def _parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    if not fields:
+        return ALERT_LIST_FIELDS
+    requested = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in ALERT_LIST_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested"
+        )
+    return requested
+
 
 @router.get("/", response_model=List[AlertResponse])
 async def get_alerts(
@@ -18,35 +69,463 @@ async def get_alerts(
     limit: int = Query(100, ge=1, le=1000),
     severity: Optional[AlertSeverity] = None,
     status: Optional[AlertStatus] = None,
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated AlertResponse fields to return, e.g. id,title,severity"
+    ),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all alerts with optional filtering"""
+    """Get all alerts with optional filtering.
+
+    Prefer ``cursor`` over ``skip`` for deep pages: the next page's cursor is
+    returned in the X-Next-Cursor header and stays fast at any depth.
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    requested = _parse_fields(fields)
+
+    # Rows come back as dicts of plain columns and are rendered by orjson,
+    # skipping ORM hydration and response_model validation (kept for the docs)
     alert_service = AlertService(db)
-    alerts = await alert_service.get_alerts(
+    rows = await alert_service.get_alert_rows(
+        tuple(dict.fromkeys((*requested, "created_at", "id"))),
         skip=skip, 
-        limit=limit, 
+        limit=limit + 1, 
         severity=severity, 
-        status=status
+        status=status,
+        after=after
     )
-    return alerts
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    if requested != ALERT_LIST_FIELDS:
+        rows = [{field: row[field] for field in requested} for row in rows]
+    return FastJSONResponse(rows, headers=headers)
 
 
 @router.post("/", response_model=AlertResponse)
 async def create_alert(
     alert: AlertCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ai_client: AIClient = Depends(get_ai_client)
 ):
-    """Create a new alert"""
+    """Create a new alert, or count a repeat of an open one"""
     alert_service = AlertService(db)
-    ai_service = AIService()
-    
-    # AI-powered alert classification and prioritization
-    ai_analysis = await ai_service.analyze_alert(alert.title, alert.description)
-    
-    new_alert = await alert_service.create_alert(alert, ai_analysis)
+    dedup_service = DedupService(db)
+
+    # A repeat of an open alert only bumps its counter: no insert, no AI call
+    duplicate = await dedup_service.record_duplicate(alert)
+    if duplicate is not None:
+        return duplicate
+
+    ai_analysis = None
+    if enrichment_backend is not None:
+        # Background mode: persist now, classify in the enrichment workers
+        if await enrichment_backend.is_full():
+            raise HTTPException(
+                status_code=503,
+                detail="Alert enrichment backlog is full, retry later",
+                headers={"Retry-After": "5"}
+            )
+    else:
+        ai_service = AIService(ai_client)
+        
+        # AI-powered alert classification and prioritization
+        ai_analysis = await ai_service.analyze_alert(alert.title, alert.description)
+
+    cluster_id, signature = await dedup_service.assign_cluster(alert)
+    try:
+        new_alert = await alert_service.create_alert(alert, ai_analysis, cluster_id)
+    except IntegrityError:
+        # Another worker opened this fingerprint first
+        await db.rollback()
+        duplicate = await dedup_service.record_duplicate_by_fingerprint(alert)
+        if duplicate is None:
+            raise
+        return duplicate
+    await dedup_service.remember(new_alert, signature)
+
+    if enrichment_backend is not None:
+        try:
+            await enrichment_backend.submit(build_job(new_alert))
+        except EnrichmentQueueFull:
+            # Left pending; the enrichment sweep queues it once its lease expires
+            pass
+    else:
+        await trigger_workflows([(new_alert.id, new_alert.ai_classification)])
     return new_alert
 
 
+async def _iter_bulk_items(request: Request) -> AsyncIterator[Any]:
+    """Yield raw items from a JSON array body or a streamed NDJSON body"""
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+        return
+
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+    if not isinstance(body, list):
+        raise HTTPException(status_code=422, detail="Expected a JSON array of alerts")
+    for item in body:
+        yield item
+
+
+def _validate_bulk_item(item: Any) -> AlertCreate:
+    if isinstance(item, bytes):
+        item = json.loads(item)
+    return AlertCreate.model_validate(item)
+
+
+async def _ingest_bulk_chunk(
+    alert_service: AlertService,
+    dedup_service: DedupService,
+    ai_service: AIService,
+    chunk: List[Tuple[int, AlertCreate]],
+    response: BulkAlertResponse
+):
+    # Collapse repeats within the chunk, then against already-open alerts
+    groups: Dict[str, List[Tuple[int, AlertCreate]]] = {}
+    for index, alert in chunk:
+        fingerprint = alert_fingerprint(alert.source_system, alert.source_id, alert.title)
+        groups.setdefault(fingerprint, []).append((index, alert))
+
+    new_groups = []
+    for group in groups.values():
+        duplicate = await dedup_service.record_duplicate(group[0][1], occurrences=len(group))
+        if duplicate is None:
+            new_groups.append(group)
+            continue
+        response.created.extend(
+            BulkAlertCreated(index=index, id=duplicate.id, deduplicated=True) for index, _ in group
+        )
+    if not new_groups:
+        return
+
+    alerts = [group[0][1] for group in new_groups]
+    ai_analyses = None
+    ml_predictions = None
+    if enrichment_backend is None:
+        ai_analyses = await asyncio.gather(
+            *(ai_service.analyze_alert(alert.title, alert.description) for alert in alerts)
+        )
+        ml_predictions = await predict_severities(
+            [
+                {"title": alert.title, "description": alert.description or "", "source_system": alert.source_system}
+                for alert in alerts
+            ]
+        )
+
+    clusters = [await dedup_service.assign_cluster(alert) for alert in alerts]
+    # Commit clusters on their own so a failed insert chunk cannot roll them back
+    await alert_service.db.commit()
+
+    results = await alert_service.create_alerts(
+        alerts,
+        ai_analyses,
+        cluster_ids=[cluster_id for cluster_id, _ in clusters],
+        occurrence_counts=[len(group) for group in new_groups],
+        ml_predictions=ml_predictions
+    )
+    triggered = []
+    for group, (cluster_id, signature), result in zip(new_groups, clusters, results):
+        if isinstance(result, str):
+            # Usually the fingerprint's unique index: an open alert the dedup hints missed
+            duplicate = await dedup_service.record_duplicate_by_fingerprint(group[0][1], occurrences=len(group))
+            if duplicate is None:
+                response.errors.extend(BulkAlertError(index=index, error=result) for index, _ in group)
+                continue
+            await dedup_service.release_cluster(cluster_id)
+            response.created.extend(
+                BulkAlertCreated(index=index, id=duplicate.id, deduplicated=True) for index, _ in group
+            )
+            continue
+        triggered.append((result.id, result.ai_classification))
+        response.created.extend(
+            BulkAlertCreated(index=index, id=result.id, deduplicated=position > 0)
+            for position, (index, _) in enumerate(group)
+        )
+        await dedup_service.remember(result, signature)
+        if enrichment_backend is not None:
+            try:
+                await enrichment_backend.submit(build_job(result))
+            except EnrichmentQueueFull:
+                pass
+    if ai_analyses is not None:
+        await trigger_workflows(triggered)
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkAlertResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": AlertCreate.model_json_schema()}
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def create_alerts_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    ai_client: AIClient = Depends(get_ai_client)
+):
+    """Create many alerts from a JSON array or an NDJSON stream.
+
+    Items are validated and inserted independently, so invalid or rejected
+    rows are reported by index without failing the rest of the batch.
+    """
+    if enrichment_backend is not None and await enrichment_backend.is_full():
+        raise HTTPException(
+            status_code=503,
+            detail="Alert enrichment backlog is full, retry later",
+            headers={"Retry-After": "5"}
+        )
+
+    alert_service = AlertService(db)
+    dedup_service = DedupService(db)
+    ai_service = AIService(ai_client)
+    response = BulkAlertResponse(created=[], errors=[])
+    chunk: List[Tuple[int, AlertCreate]] = []
+
+    index = 0
+    async for item in _iter_bulk_items(request):
+        if index >= settings.ALERT_BULK_MAX_ITEMS:
+            response.errors.append(BulkAlertError(
+                index=index,
+                error=f"Batch exceeds {settings.ALERT_BULK_MAX_ITEMS} items; remaining items ignored"
+            ))
+            break
+        try:
+            chunk.append((index, _validate_bulk_item(item)))
+        except (ValueError, ValidationError) as e:
+            response.errors.append(BulkAlertError(index=index, error=str(e)))
+        index += 1
+
+        if len(chunk) >= AlertService.BULK_INSERT_CHUNK_SIZE:
+            await _ingest_bulk_chunk(alert_service, dedup_service, ai_service, chunk, response)
+            chunk = []
+
+    if chunk:
+        await _ingest_bulk_chunk(alert_service, dedup_service, ai_service, chunk, response)
+    return response
+
+
+# Redis stream ids: "<milliseconds>-<sequence>", or just the milliseconds
+EVENT_ID_PATTERN = re.compile(r"[0-9]+(-[0-9]+)?")
+
+
+def _format_sse(item) -> str:
+    if item is None:
+        return ": keep-alive\n\n"
+    event_id, event = item
+    lines = [f"event: {event['type']}"]
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(event)}")
+    return "\n".join(lines) + "\n\n"
+
+
+@router.post("/resolve", response_model=BulkResolveResponse)
+async def resolve_alerts_bulk(selection: AlertBulkResolve, db: AsyncSession = Depends(get_db)):
+    """Resolve many open alerts at once, selected by ids and/or a filter.
+
+    Runs as a single UPDATE ... RETURNING; at most ``limit`` alerts (capped
+    by ALERT_BULK_RESOLVE_MAX_ITEMS) are resolved per call, so callers
+    draining a large filter repeat until ``resolved`` is 0.
+    """
+    filters = selection.dict(include={"severity", "status", "source_system", "cluster_id", "created_before"})
+    if selection.ids is None and all(value is None for value in filters.values()):
+        raise HTTPException(status_code=400, detail="Provide ids or at least one filter")
+    if selection.status is not None and selection.status not in OPEN_ALERT_STATUSES:
+        raise HTTPException(status_code=400, detail="status filter must be an open status")
+    max_items = settings.ALERT_BULK_RESOLVE_MAX_ITEMS
+    if selection.ids is not None and len(selection.ids) > max_items:
+        raise HTTPException(status_code=413, detail=f"At most {max_items} ids per request")
+
+    alert_service = AlertService(db)
+    resolved = await alert_service.resolve_alerts(
+        ids=selection.ids,
+        auto_resolved=selection.auto_resolved,
+        limit=min(selection.limit or max_items, max_items),
+        **filters
+    )
+    return BulkResolveResponse(resolved=len(resolved), ids=[alert.id for alert in resolved])
+
+
+@router.get("/stream")
+async def stream_alert_events(
+    request: Request,
+    severity: List[AlertSeverity] = Query([]),
+    status: List[AlertStatus] = Query([]),
+    last_event_id: Optional[str] = Query(None, description="Resume after this event id"),
+):
+    """Server-sent events for alert changes and dashboard counter deltas.
+
+    Reconnecting clients resume from the Last-Event-ID header (sent
+    automatically by EventSource) or the ``last_event_id`` parameter.
+    """
+    resume_from = request.headers.get("last-event-id") or last_event_id
+    # Checked before streaming starts: a bad id would otherwise make XRANGE fail mid-response
+    if resume_from and not EVENT_ID_PATTERN.fullmatch(resume_from):
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID: expected a Redis stream id")
+
+    async def events():
+        subscription = event_broker.subscribe(
+            severities={value.value for value in severity},
+            statuses={value.value for value in status},
+            last_event_id=resume_from,
+        )
+        try:
+            async for item in subscription:
+                if await request.is_disconnected():
+                    break
+                yield _format_sse(item)
+        finally:
+            await subscription.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/export")
+async def export_alerts(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    start: Optional[datetime] = Query(None, description="Inclusive lower bound on created_at"),
+    end: Optional[datetime] = Query(None, description="Exclusive upper bound on created_at"),
+    severity: List[AlertSeverity] = Query([]),
+    status: List[AlertStatus] = Query([]),
+    cursor: Optional[str] = Query(None, description="The cursor of the last row received, to resume after it"),
+    fields: Optional[str] = Query(None, description="Comma-separated AlertResponse fields to export"),
+):
+    """Stream every matching alert, oldest first, with constant memory.
+
+    Rows always carry ``created_at``, ``id`` and, last, an opaque
+    ``cursor``; an interrupted export resumes by passing the ``cursor`` of
+    the last row received.
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    columns = tuple(dict.fromkeys(("id", "created_at", *_parse_fields(fields))))
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+
+    async def rows():
+        # A dedicated read session lives exactly as long as the stream
+        async with ReadSessionLocal() as session:
+            batches = AlertService(session).stream_alert_rows(
+                columns,
+                batch_size=settings.ALERT_EXPORT_BATCH_SIZE,
+                start=start,
+                end=end,
+                severities=severity,
+                statuses=status,
+                after=after
+            )
+            async for chunk in EXPORT_WRITERS[format](with_cursors(batches), (*columns, CURSOR_COLUMN)):
+                yield chunk
+
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        rows(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="alerts.{extension}"'}
+    )
+
+
+@router.get("/search")
+async def search_alerts(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to match; typos in titles are tolerated"),
+    limit: int = Query(20, ge=1, le=100),
+    severity: Optional[AlertSeverity] = None,
+    status: Optional[AlertStatus] = None,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated AlertResponse fields to return"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Alerts whose title or description match ``q``, best match first.
+
+    Each row carries its relevance ``score``; the next page's cursor is
+    returned in the X-Next-Cursor header.
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_rank_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    requested = _parse_fields(fields)
+
+    rows = await AlertSearchService(db).search(
+        q,
+        tuple(dict.fromkeys((*requested, "id"))),
+        limit=limit + 1,
+        severity=severity,
+        status=status,
+        after=after
+    )
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_rank_cursor(rows[-1]["score"], rows[-1]["id"])
+    if "id" not in requested:
+        for row in rows:
+            del row["id"]
+    return FastJSONResponse(rows, headers=headers)
+
+
+@router.get("/clusters", response_model=List[AlertClusterResponse])
+async def get_alert_clusters(
+    limit: int = Query(100, ge=1, le=1000),
+    min_alerts: int = Query(2, ge=1),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get recently active clusters of correlated alerts"""
+    dedup_service = DedupService(db)
+    return await dedup_service.get_clusters(limit=limit, min_alerts=min_alerts)
+
+
+@router.get("/clusters/{cluster_id}/alerts", response_model=List[AlertResponse])
+async def get_alert_cluster_alerts(
+    cluster_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the alerts grouped into a correlation cluster"""
+    dedup_service = DedupService(db)
+    if not await dedup_service.get_cluster(cluster_id):
+        raise HTTPException(status_code=404, detail="Cluster not found")
+    return await dedup_service.get_cluster_alerts(cluster_id, limit=limit)
+
+
 @router.get("/{alert_id}", response_model=AlertResponse)
 async def get_alert(alert_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific alert by ID"""
@@ -65,7 +544,15 @@ async def update_alert(
 ):
     """Update an existing alert"""
     alert_service = AlertService(db)
-    updated_alert = await alert_service.update_alert(alert_id, alert_update)
+    try:
+        updated_alert = await alert_service.update_alert(alert_id, alert_update)
+    except IntegrityError:
+        # Reopened or renamed onto the fingerprint of another open alert
+        await db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Another open alert has the same fingerprint; resolve it first"
+        )
     if not updated_alert:
         raise HTTPException(status_code=404, detail="Alert not found")
     return updated_alert
@@ -82,8 +569,24 @@ async def resolve_alert(alert_id: int, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/analytics/summary")
-async def get_alert_analytics(db: AsyncSession = Depends(get_db)):
+async def get_alert_analytics(db: AsyncSession = Depends(get_read_db)):
     """Get alert analytics summary"""
     alert_service = AlertService(db)
     analytics = await alert_service.get_analytics_summary()
-    return analytics
\ No newline at end of file
+    return analytics
+
+
+@router.get("/analytics/ai-cache")
+async def get_ai_cache_stats():
+    """Get AI analysis cache hit/miss/eviction counters"""
+    if analysis_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **analysis_cache.summary()}
+
+
+@router.get("/analytics/enrichment")
+async def get_enrichment_metrics():
+    """Get background enrichment queue depth and lag"""
+    if enrichment_backend is None:
+        return {"backend": "inline"}
+    return await enrichment_backend.metrics()
\ No newline at end of file
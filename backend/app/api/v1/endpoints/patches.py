@@ -1,4 +1,15 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.responses import FastJSONResponse
+from app.models.patch import PatchSeverity
+from app.schemas.patch import PatchDeployRequest, PatchDeploymentResponse
+from app.services.compliance_index import compliance_index
+from app.services.patch_plan import plan_cache
+from app.services.patch_rollout import PatchRolloutService, rollout_manager
 
 router = APIRouter()
 
@@ -9,7 +20,100 @@ async def get_patches():
     return {"message": "Patches endpoint - coming soon"}
 
 
-@router.post("/{patch_id}/deploy")
-async def deploy_patch(patch_id: int):
-    """Deploy a specific patch"""
-    return {"message": f"Deploying patch {patch_id}"}
\ No newline at end of file
+@router.get("/plan")
+async def get_patch_plan(
+    patch_id: List[str] = Query([], description="Only these patches and their prerequisites"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Install order for pending patches, in layers that can each run in parallel.
+
+    Deployed patches count as satisfied prerequisites. Cycles, unknown
+    prerequisites and the patches they block are reported, not placed.
+    """
+    plan, cached = await plan_cache.get(db)
+    content = plan.for_patches(patch_id) if patch_id else plan.as_dict()
+    content["cached"] = cached
+    return FastJSONResponse(content)
+
+
+@router.get("/compliance")
+async def get_compliance_summary():
+    """Fleet compliance per patch severity, from the in-memory index"""
+    return compliance_index.summary()
+
+
+@router.get("/compliance/missing")
+async def get_missing_patches(
+    severity: Optional[PatchSeverity] = None,
+    host: Optional[str] = Query(None, description="List this host's missing patches instead of hosts"),
+    limit: int = Query(100, ge=1, le=10000)
+):
+    """Hosts lacking a targeted patch (optionally of one severity), or one host's missing patches"""
+    if host is None:
+        return compliance_index.hosts_missing(severity, limit)
+    missing = compliance_index.patches_missing(host, severity)
+    if missing is None:
+        raise HTTPException(status_code=404, detail="Host not found")
+    return missing
+
+
+@router.get("/compliance/patches/{patch_id}")
+async def get_patch_compliance(patch_id: str):
+    """Share of targeted hosts, and of the whole fleet, that have a patch installed"""
+    compliance = compliance_index.patch_compliance(patch_id)
+    if compliance is None:
+        raise HTTPException(status_code=404, detail="Patch not found")
+    return compliance
+
+
+@router.get("/deployments/{deployment_id}", response_model=PatchDeploymentResponse)
+async def get_deployment(deployment_id: int, db: AsyncSession = Depends(get_db)):
+    """Rollout progress, with per-status host counts"""
+    rollout_service = PatchRolloutService(db)
+    deployment = await rollout_service.get_deployment(deployment_id)
+    if not deployment:
+        raise HTTPException(status_code=404, detail="Deployment not found")
+    response = PatchDeploymentResponse.model_validate(deployment)
+    response.targets = await rollout_service.get_target_counts(deployment_id)
+    return response
+
+
+@router.post("/{patch_id}/deploy", response_model=PatchDeploymentResponse, status_code=202)
+async def deploy_patch(
+    patch_id: int,
+    options: Optional[PatchDeployRequest] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Start a wave-based rollout of a patch to its target systems.
+
+    Returns immediately; poll GET /patches/deployments/{id} for progress.
+    """
+    options = options or PatchDeployRequest()
+    rollout_service = PatchRolloutService(db)
+    patch = await rollout_service.get_patch(patch_id)
+    if not patch:
+        raise HTTPException(status_code=404, detail="Patch not found")
+    active = await rollout_service.get_active_deployment(patch_id)
+    if active:
+        raise HTTPException(status_code=409, detail=f"Patch is already being deployed (deployment {active.id})")
+
+    hosts = options.targets or patch.target_systems or []
+    if not hosts or not all(isinstance(host, str) and host for host in hosts):
+        raise HTTPException(status_code=400, detail="Patch has no valid target systems to deploy to")
+    # Keep the first occurrence of each host, in order
+    hosts = list(dict.fromkeys(hosts))
+
+    deployment = await rollout_service.create_deployment(
+        patch,
+        hosts,
+        executor=settings.PATCH_EXECUTOR,
+        canary_size=settings.PATCH_ROLLOUT_CANARY_SIZE if options.canary_size is None else options.canary_size,
+        wave_size=options.wave_size or settings.PATCH_ROLLOUT_WAVE_SIZE,
+        concurrency=options.concurrency or settings.PATCH_ROLLOUT_CONCURRENCY,
+        failure_threshold=(
+            settings.PATCH_ROLLOUT_FAILURE_THRESHOLD if options.failure_threshold is None else options.failure_threshold
+        ),
+        scheduled_for=options.scheduled_for or patch.deployment_schedule,
+    )
+    rollout_manager.start(deployment.id, deployment.executor)
+    return deployment
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from typing import Any, Dict, List
+
+from app.core.database import pool_metrics
+
+router = APIRouter()
+
+
+@router.get("/db-pool")
+async def get_db_pool_metrics() -> List[Dict[str, Any]]:
+    """Get connection pool saturation: checked-out connections, overflow and checkout waits"""
+    return [metrics.summary() for metrics in pool_metrics.values()]
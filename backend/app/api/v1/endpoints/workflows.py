@@ -1,15 +1,111 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.core.database import get_db, get_read_db
+from app.schemas.workflow import WorkflowCreate, WorkflowResponse, WorkflowRunCreate, WorkflowRunResponse
+from app.services.alert_service import AlertService
+from app.services.workflow_engine import WorkflowDefinitionError, WorkflowService, workflow_engine
 
 router = APIRouter()
 
 
-@router.get("/")
-async def get_workflows():
+@router.get("/", response_model=List[WorkflowResponse])
+async def get_workflows(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get all workflows"""
-    return {"message": "Workflows endpoint - coming soon"}
+    return await WorkflowService(db).get_workflows(skip=skip, limit=limit)
+
+
+@router.post("/", response_model=WorkflowResponse, status_code=201)
+async def create_workflow(workflow: WorkflowCreate, db: AsyncSession = Depends(get_db)):
+    """Create a new workflow; its steps must form a DAG of known step types"""
+    try:
+        return await WorkflowService(db).create_workflow(workflow.model_dump())
+    except WorkflowDefinitionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=f"A workflow named {workflow.name!r} already exists")
+
+
+@router.get("/engine")
+async def get_engine_metrics():
+    """Runs and steps in flight in this worker, and state flush counters"""
+    return workflow_engine.metrics()
+
+
+@router.get("/runs/{run_id}", response_model=WorkflowRunResponse)
+async def get_workflow_run(run_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Get a run's status and per-step states.
+
+    Runs executing in this worker are reported from memory, ahead of the
+    last state flush.
+    """
+    live = workflow_engine.get_live(run_id)
+    if live is not None:
+        return {**live, "live": True}
+
+    workflow_service = WorkflowService(db)
+    run = await workflow_service.get_run(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Workflow run not found")
+    workflow = await workflow_service.get_workflow(run.workflow_id)
+    steps = {}
+    try:
+        steps = workflow_engine.plan(workflow).describe(run.step_states)
+    except WorkflowDefinitionError:
+        pass
+    return WorkflowRunResponse(
+        id=run.id,
+        workflow_id=run.workflow_id,
+        alert_id=run.alert_id,
+        status=run.status,
+        step_states=run.step_states,
+        steps=steps,
+        context=run.context,
+        error=run.error,
+        created_at=run.created_at,
+        started_at=run.started_at,
+        finished_at=run.finished_at,
+    )
+
+
+@router.get("/{workflow_id}", response_model=WorkflowResponse)
+async def get_workflow(workflow_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Get a specific workflow"""
+    workflow = await WorkflowService(db).get_workflow(workflow_id)
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return workflow
+
+
+@router.post("/{workflow_id}/runs", response_model=WorkflowRunResponse, status_code=202)
+async def start_workflow_run(workflow_id: int, options: WorkflowRunCreate, db: AsyncSession = Depends(get_db)):
+    """Start a run of a workflow.
 
+    Returns immediately; poll GET /workflows/runs/{id} for progress.
+    """
+    workflow = await WorkflowService(db).get_workflow(workflow_id)
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    if not workflow.enabled:
+        raise HTTPException(status_code=409, detail="Workflow is disabled")
+    # Checked here rather than left to the foreign key, which SQLite does not enforce
+    if options.alert_id is not None and not await AlertService(db).get_alert(options.alert_id):
+        raise HTTPException(status_code=404, detail="Alert not found")
+    try:
+        run_id = await workflow_engine.submit(workflow, options.alert_id, options.context)
+    except IntegrityError:
+        # Deleted between the check and the insert
+        raise HTTPException(status_code=404, detail="Alert not found")
 
-@router.post("/")
-async def create_workflow():
-    """Create a new workflow"""
-    return {"message": "Creating workflow"}
\ No newline at end of file
+    live = workflow_engine.get_live(run_id)
+    if live is not None:
+        return {**live, "live": True}
+    # Queued for the poller: this worker is at capacity or not running an engine
+    return await get_workflow_run(run_id, db)
@@ -0,0 +1,25 @@
+"""Rebuild dashboard rollups from the raw alerts and patches tables.
+
+    cd backend && python -m app.commands.backfill_rollups
+
+Run after deploying the rollup table, or whenever counters are suspected
+to have drifted (e.g. after manual SQL edits). Increments written by live
+traffic while the rebuild runs may be lost, so prefer a quiet window.
+"""
+import asyncio
+import time
+
+from app.core.database import SessionLocal, init_db
+from app.services.rollup_service import RollupService
+
+
+async def main():
+    await init_db()
+    started = time.perf_counter()
+    async with SessionLocal() as session:
+        buckets = await RollupService(session).rebuild()
+    print(f"Rebuilt {buckets} rollup buckets in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+"""Train the alert severity model on every resolved alert, incrementally.
+
+    cd backend && python -m app.commands.train_model [--batch-size 5000] [--fresh]
+
+Rows are read through a server-side cursor and fed to ``partial_fit`` one
+mini-batch at a time, so memory stays flat however many alerts exist. The
+result replaces the pipeline artifact in ML_MODEL_PATH; running API
+workers pick it up on restart, or keep learning from it online when
+ML_ONLINE_TRAINING_ENABLED is set.
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.ml_training import OnlineTrainer, TrainingService
+
+
+async def main(args):
+    started = time.perf_counter()
+    trainer = OnlineTrainer(fresh=args.fresh)
+    async with SessionLocal() as session:
+        async for samples in TrainingService(session).stream_resolved(args.batch_size):
+            trainer.partial_fit(samples)
+            print(f"  {trainer.samples} alerts trained", end="\r")
+    if not trainer.samples:
+        print("No resolved alerts to train on")
+        return
+    trainer.publish(save=True)
+    print(
+        f"Trained on {trainer.samples} alerts in {trainer.batches} batches "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=settings.ML_TRAINING_BATCH_SIZE)
+    parser.add_argument("--fresh", action="store_true", help="start from an untrained model")
+    asyncio.run(main(parser.parse_args()))
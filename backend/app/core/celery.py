@@ -0,0 +1,19 @@
+from celery import Celery
+
+from app.core.config import settings
+
+celery_app = Celery(
+    "opsgenieX",
+    broker=settings.REDIS_URL,
+    backend=settings.REDIS_URL,
+    include=["app.tasks.enrichment"],
+)
+
+celery_app.conf.update(
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+    # Workers started without -Q consume the queue enrichment jobs are sent to
+    task_default_queue=settings.ENRICHMENT_CELERY_QUEUE,
+    task_routes={"alerts.enrich": {"queue": settings.ENRICHMENT_CELERY_QUEUE}},
+)
@@ -1,15 +1,55 @@
-from sqlalchemy import create_engine
+import asyncio
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 import redis.asyncio as redis
 
 from app.core.config import settings
+from app.core.pool_metrics import PoolMetrics, instrumented_pool_class
+
+
+def _async_url(url: str) -> str:
+    return url.replace("postgresql://", "postgresql+asyncpg://")
+
+
+def _engine_options(url: str, metrics: PoolMetrics) -> Dict[str, Any]:
+    """Pool and driver tuning; only PostgreSQL gets the queue pool settings"""
+    if not url.startswith("postgresql"):
+        return {}
+    return {
+        "poolclass": instrumented_pool_class(metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        # Prepared statements cached per connection by the asyncpg dialect;
+        # set to 0 behind PgBouncer in transaction mode
+        "connect_args": {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    }
+
+
+def _create_engine(url: str, metrics: PoolMetrics):
+    url = _async_url(url)
+    return create_async_engine(url, **_engine_options(url, metrics))
+
 
 # PostgreSQL Database
-engine = create_async_engine(settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"))
+pool_metrics = {"primary": PoolMetrics("primary")}
+engine = _create_engine(settings.DATABASE_URL, pool_metrics["primary"])
 SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Optional read replica for listing and analytics queries; falls back to the primary
+if settings.DB_READ_REPLICA_URL:
+    pool_metrics["replica"] = PoolMetrics("replica")
+    read_engine = _create_engine(settings.DB_READ_REPLICA_URL, pool_metrics["replica"])
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
 Base = declarative_base()
 
 # Redis Connection
@@ -24,6 +64,15 @@ async def get_db():
             await session.close()
 
 
+async def get_read_db():
+    """Session for read-only queries that tolerate replica lag"""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 async def get_redis():
     return redis_client
 
@@ -31,4 +80,18 @@ async def get_redis():
 async def init_db():
     """Initialize database tables"""
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def warm_pool(connections: int, target=None):
+    """Open ``connections`` pooled connections at once so requests find them ready"""
+    target = target or engine
+    opened = await asyncio.gather(*(target.connect() for _ in range(connections)))
+    try:
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in opened))
+    finally:
+        await asyncio.gather(*(conn.close() for conn in opened))
+
+
+async def ping_redis():
+    await redis_client.ping()
@@ -0,0 +1,112 @@
+import functools
+import inspect
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+# With several uvicorn/gunicorn workers, point PROMETHEUS_MULTIPROC_DIR at an
+# empty directory shared by the workers; each writes its samples there and
+# /metrics aggregates them, whichever worker serves the scrape.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_LATENCY = Histogram(
+    "opsgeniex_http_request_duration_seconds",
+    "Time until response headers are sent, per route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    "opsgeniex_stage_duration_seconds",
+    "Time spent in one stage of request handling (AI, ML, DB)",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+AI_FALLBACKS = Counter(
+    "opsgeniex_ai_fallbacks_total",
+    "Alert analyses answered by the keyword fallback instead of the model",
+    ["reason"],
+)
+CACHE_LOOKUPS = Counter(
+    "opsgeniex_cache_lookups_total",
+    "Cache lookups by cache and outcome",
+    ["cache", "result"],
+)
+
+
+def timed(stage: str):
+    """Record the duration of every call to the decorated (async) function"""
+    # Bound once here so a call costs a clock read and one observe()
+    histogram = STAGE_LATENCY.labels(stage)
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
+
+
+def cache_counters(cache: str, *results: str):
+    """Pre-bound lookup counters for one cache, keyed by result"""
+    return {result: CACHE_LOOKUPS.labels(cache, result) for result in results}
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware timing each request by its route template.
+
+    Templates (``/api/v1/alerts/{alert_id}``) keep label cardinality
+    bounded; unmatched paths share one label. Timing stops when headers
+    are sent, so long-lived streams are measured by time to first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                REQUEST_LATENCY.labels(
+                    scope["method"],
+                    getattr(route, "path", "unmatched"),
+                    str(message["status"]),
+                ).observe(time.perf_counter() - started)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def render_metrics():
+    """(body, content type) for a Prometheus scrape"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
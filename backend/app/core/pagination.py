@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Tuple
+import base64
+import json
+
+from sqlalchemy import func, literal, tuple_
+
+# SQLite stores server-default timestamps as 'YYYY-MM-DD HH:MM:SS' but binds
+# Python datetimes as 'YYYY-MM-DD HH:MM:SS.ffffff', so the strings do not
+# compare like the instants they stand for; strftime puts both sides in
+# one format (millisecond precision)
+SQLITE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%f"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque keyset cursor pointing just past (created_at, id)"""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError for malformed tokens"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+def keyset(dialect_name: str, timestamp_column, id_column, cursor: Tuple[datetime, int]):
+    """(row key, cursor key) to compare for a (timestamp, id) keyset cursor"""
+    timestamp, row_id = cursor
+    if dialect_name == "sqlite":
+        return (
+            tuple_(func.strftime(SQLITE_TIMESTAMP_FORMAT, timestamp_column), id_column),
+            tuple_(func.strftime(SQLITE_TIMESTAMP_FORMAT, literal(timestamp, timestamp_column.type)), row_id),
+        )
+    return tuple_(timestamp_column, id_column), tuple_(timestamp, row_id)
+
+
+def encode_rank_cursor(score: float, row_id: int) -> str:
+    """Opaque keyset cursor for results ordered by (score DESC, id DESC)"""
+    raw = json.dumps([score, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_rank_cursor(token: str) -> Tuple[float, int]:
+    """Inverse of encode_rank_cursor; raises ValueError for malformed tokens"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        score, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(score), int(row_id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
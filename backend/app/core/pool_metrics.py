@@ -0,0 +1,83 @@
+import bisect
+import time
+from typing import Any, Dict, Type
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Upper bounds in seconds of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """Checkout counters and a wait-time histogram for one connection pool.
+
+    Observations are a couple of integer increments, cheap enough to leave
+    on under load; the live gauges are read from the pool on demand.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+        self.max_overflow_seen = 0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def observe_checkout(self, waited: float, timed_out: bool = False):
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_seconds_total += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS, waited)] += 1
+        if self.pool is not None:
+            self.max_overflow_seen = max(self.max_overflow_seen, self.pool.overflow())
+
+    def summary(self) -> Dict[str, Any]:
+        observed = self.checkouts + self.timeouts
+        cumulative = 0
+        histogram = {}
+        for bound, count in zip([*WAIT_BUCKETS, float("inf")], self.wait_buckets):
+            cumulative += count
+            histogram["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        pool = self.pool
+        return {
+            "pool": self.name,
+            "size": pool.size() if pool is not None else 0,
+            "checked_out": pool.checkedout() if pool is not None else 0,
+            "checked_in": pool.checkedin() if pool is not None else 0,
+            "overflow": pool.overflow() if pool is not None else 0,
+            "max_overflow_seen": self.max_overflow_seen,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds": {
+                "mean": round(self.wait_seconds_total / observed, 6) if observed else 0.0,
+                "max": round(self.max_wait_seconds, 6),
+                "histogram": histogram,
+            },
+        }
+
+
+def instrumented_pool_class(metrics: PoolMetrics) -> Type[AsyncAdaptedQueuePool]:
+    """Queue pool that reports every checkout, including time spent waiting"""
+
+    class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            metrics.pool = self
+
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                metrics.observe_checkout(time.perf_counter() - started, timed_out=True)
+                raise
+            metrics.observe_checkout(time.perf_counter() - started)
+            return connection
+
+    return InstrumentedQueuePool
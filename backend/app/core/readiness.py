@@ -0,0 +1,48 @@
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+
+class Readiness:
+    """Startup warmup progress for one worker, reported by ``/ready``.
+
+    Each warmup step is timed. A failing required step aborts startup; an
+    optional one is recorded and the worker still becomes ready, degraded.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self._started = time.perf_counter()
+        self._total: Optional[float] = None
+
+    @asynccontextmanager
+    async def step(self, name: str, required: bool = False):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.steps[name] = {"ok": False, "seconds": round(time.perf_counter() - started, 4), "error": str(e)}
+            if required:
+                raise
+            print(f"Warmup step {name} failed: {e}")
+        else:
+            self.steps[name] = {"ok": True, "seconds": round(time.perf_counter() - started, 4)}
+
+    def mark_ready(self):
+        self._total = time.perf_counter() - self._started
+        self.ready = True
+
+    def mark_stopping(self):
+        self.ready = False
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "degraded": any(not step["ok"] for step in self.steps.values()),
+            "total_seconds": round(self._total, 4) if self._total is not None else None,
+            "steps": self.steps,
+        }
+
+
+readiness = Readiness()
@@ -0,0 +1,33 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson.
+
+    orjson serializes datetimes, enums and UUIDs natively, so rows can be
+    returned as plain dicts without a pydantic pass. UTC datetimes use the
+    "Z" suffix to match the pydantic-rendered responses.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZip for regular responses; event streams pass through untouched.
+
+    Compressing server-sent events would buffer them inside the gzip stream
+    and delay delivery, so requests accepting ``text/event-stream`` skip it.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"accept" and b"text/event-stream" in value:
+                    await self.app(scope, receive, send)
+                    return
+        await super().__call__(scope, receive, send)
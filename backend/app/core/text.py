@@ -0,0 +1,25 @@
+import re
+from typing import Optional
+
+_WHITESPACE = re.compile(r"\s+")
+_VOLATILE_TOKENS = [
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"), "<uuid>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    (re.compile(r"\b\d{1,3}(\.\d{1,3}){3}(:\d+)?\b"), "<ip>"),
+    (re.compile(r"\b(0x)?(?=[0-9a-f]*\d)[0-9a-f]{8,}\b"), "<hex>"),
+    (re.compile(r"\d+(\.\d+)?"), "#"),
+]
+
+
+def normalize_text(text: Optional[str], strip_numbers: bool = False) -> str:
+    """Canonicalize alert text so equivalent alerts compare equal.
+
+    Case and whitespace are always folded. With ``strip_numbers`` host ids,
+    timestamps, addresses and other numbers are replaced with placeholders
+    so templated alerts ("disk 91% on web-07") collapse together.
+    """
+    text = _WHITESPACE.sub(" ", (text or "").strip().lower())
+    if strip_numbers:
+        for pattern, placeholder in _VOLATILE_TOKENS:
+            text = pattern.sub(placeholder, text)
+    return text
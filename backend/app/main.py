@@ -1,20 +1,97 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.core.database import init_db
+from app.core.metrics import RequestMetricsMiddleware, render_metrics
+from app.core.responses import CompressionMiddleware
+from app.core.database import SessionLocal, engine, init_db, ping_redis, read_engine, warm_pool
+from app.core.readiness import readiness
+from app.services.ai_client import ai_client
+from app.services.ai_service import drain_alert_batchers
+from app.services.compliance_index import compliance_index
+from app.services.enrichment import enrichment_backend, pending_sweeper
+from app.services.dedup_service import DedupService, correlation_index
+from app.services.event_stream import event_broker
+from app.services.ml_service import MLService
+from app.services.patch_rollout import rollout_manager
+from app.services.rollup_service import rollups
+from app.services.workflow_engine import workflow_engine
+
+
+def _create_training_worker():
+    if not settings.ML_ONLINE_TRAINING_ENABLED:
+        return None
+    # scikit-learn is optional, so only import the training stack when enabled
+    from app.services.ml_training import OnlineTrainingWorker
+
+    return OnlineTrainingWorker(
+        interval=settings.ML_ONLINE_TRAINING_INTERVAL_SECONDS,
+        batch_size=settings.ML_TRAINING_BATCH_SIZE,
+        lease_seconds=settings.ML_ONLINE_TRAINING_LEASE_SECONDS,
+    )
+
+
+def _warm_ml():
+    """Load the model and run one prediction so the first request pays nothing"""
+    MLService().predict_alert_severity({"title": "warmup", "description": "", "source_system": "warmup"})
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    await init_db()
+    training_worker = _create_training_worker()
+    async with readiness.step("database", required=True):
+        await init_db()
+        await warm_pool(settings.DB_WARMUP_CONNECTIONS)
+    if read_engine is not engine:
+        async with readiness.step("database_replica"):
+            await warm_pool(settings.DB_WARMUP_CONNECTIONS, read_engine)
+    async with readiness.step("redis"):
+        await ping_redis()
+    async with readiness.step("ai_client"):
+        ai_client.start()
+    if settings.LOCAL_ML_ENABLED or settings.AZURE_ML_ENABLED:
+        async with readiness.step("ml_model"):
+            await asyncio.to_thread(_warm_ml)
+    async with readiness.step("correlation_index"):
+        async with SessionLocal() as session:
+            correlation_index.warm(await DedupService(session).get_recent_clustered_alerts())
+    if enrichment_backend is not None:
+        async with readiness.step("enrichment", required=True):
+            await enrichment_backend.start()
+            await pending_sweeper.start(settings.ENRICHMENT_SWEEP_INTERVAL_SECONDS)
+    async with readiness.step("event_stream", required=True):
+        await event_broker.start()
+    if training_worker is not None:
+        async with readiness.step("online_training"):
+            await training_worker.start()
+    async with readiness.step("compliance_index"):
+        await compliance_index.start(settings.COMPLIANCE_INDEX_REFRESH_SECONDS)
+    async with readiness.step("patch_rollouts"):
+        await rollout_manager.resume()
+    async with readiness.step("workflow_engine"):
+        await workflow_engine.start()
+    readiness.mark_ready()
     yield
     # Shutdown
-    pass
+    readiness.mark_stopping()
+    await workflow_engine.stop()
+    await rollout_manager.stop()
+    await compliance_index.stop()
+    await rollups.flush()
+    if training_worker is not None:
+        await training_worker.stop()
+    await event_broker.stop()
+    if enrichment_backend is not None:
+        await pending_sweeper.stop()
+        await enrichment_backend.stop()
+    await drain_alert_batchers()
+    ai_client.close()
 
 
 app = FastAPI(
@@ -31,7 +108,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
+app.add_middleware(RequestMetricsMiddleware)
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
@@ -47,6 +127,19 @@ async def health_check():
     return {"status": "healthy", "service": "OpsGenieX API"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+
+@app.get("/ready")
+async def readiness_check():
+    """200 once this worker has finished warmup, 503 before that and while stopping"""
+    return JSONResponse(readiness.summary(), status_code=200 if readiness.ready else 503)
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, Boolean, ForeignKey, Index, DDL, event
 from sqlalchemy.sql import func
 import enum
 
@@ -30,9 +30,67 @@ class Alert(Base):
     source_system = Column(String(100))
     source_id = Column(String(100))
     assigned_to = Column(String(100))
-    ai_priority_score = Column(Integer, default=0)
+    ai_priority_score = Column(Integer, default=0, nullable=True)  # NULL while enrichment is pending
     ai_classification = Column(String(100))
+    ml_severity = Column(String(20))
+    enriched_at = Column(DateTime(timezone=True))
+    # While pending, the time after which the enrichment sweep may queue it again
+    enrichment_lease_expires_at = Column(DateTime(timezone=True))
     auto_resolved = Column(Boolean, default=False)
+    fingerprint = Column(String(64))
+    occurrence_count = Column(Integer, default=1, nullable=False)
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    cluster_id = Column(Integer, ForeignKey("alert_clusters.id"), index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    resolved_at = Column(DateTime(timezone=True))
\ No newline at end of file
+    resolved_at = Column(DateTime(timezone=True))
+
+
+OPEN_ALERT_STATUSES = (AlertStatus.OPEN, AlertStatus.IN_PROGRESS)
+CLOSED_ALERT_STATUSES = (AlertStatus.RESOLVED, AlertStatus.CLOSED)
+
+# At most one open alert per fingerprint; repeats bump occurrence_count instead
+Index(
+    "uq_alerts_open_fingerprint",
+    Alert.fingerprint,
+    unique=True,
+    postgresql_where=Alert.status.in_(OPEN_ALERT_STATUSES),
+    sqlite_where=Alert.status.in_(OPEN_ALERT_STATUSES),
+)
+
+# Keyset pagination on (created_at, id), alone and behind the list filters
+Index("ix_alerts_created_at_id", Alert.created_at.desc(), Alert.id.desc())
+Index("ix_alerts_status_created_at_id", Alert.status, Alert.created_at.desc(), Alert.id.desc())
+Index("ix_alerts_severity_created_at_id", Alert.severity, Alert.created_at.desc(), Alert.id.desc())
+
+# Online model training tails newly resolved alerts in (resolved_at, id) order
+Index("ix_alerts_resolved_at_id", Alert.resolved_at, Alert.id)
+
+# Full-text search on PostgreSQL: a generated tsvector (title weighted above
+# description) with a GIN index, plus a trigram index for fuzzy title
+# matches. Kept out of the mapped columns so SQLite (which searches with an
+# in-process index instead) can still create the table; migrated databases
+# get the same objects from 0007_alert_search.
+ALERT_SEARCH_CONFIG = "english"
+ALERT_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE alerts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('{ALERT_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{ALERT_SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX ix_alerts_search_vector ON alerts USING gin (search_vector)",
+    "CREATE INDEX ix_alerts_title_trgm ON alerts USING gin (title gin_trgm_ops)",
+)
+for _statement in ALERT_SEARCH_DDL:
+    event.listen(Alert.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+
+class AlertCluster(Base):
+    """Group of similar (not identical) alerts seen within a correlation window"""
+    __tablename__ = "alert_clusters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String(255), nullable=False)
+    alert_count = Column(Integer, default=1, nullable=False)
+    first_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
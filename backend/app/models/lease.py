@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime
+
+from app.core.database import Base
+
+
+class Lease(Base):
+    """Named lease electing the one process that runs a singleton background job"""
+    __tablename__ = "leases"
+
+    name = Column(String(100), primary_key=True)
+    owner = Column(String(100), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
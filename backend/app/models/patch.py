@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, Boolean, JSON, Float, ForeignKey, Index
 from sqlalchemy.sql import func
 import enum
 
@@ -43,4 +43,64 @@ class Patch(Base):
     requires_reboot = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    deployed_at = Column(DateTime(timezone=True))
\ No newline at end of file
+    deployed_at = Column(DateTime(timezone=True))
+
+
+class TargetStatus(str, enum.Enum):
+    PENDING = "pending"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    ROLLED_BACK = "rolled_back"
+
+
+# Deployments in these states still have work left (resumed on startup)
+ACTIVE_DEPLOYMENT_STATUSES = (PatchStatus.SCHEDULED, PatchStatus.IN_PROGRESS)
+
+
+class PatchDeployment(Base):
+    """One wave-based rollout of a patch to its target systems"""
+    __tablename__ = "patch_deployments"
+    # Fetch server defaults (created_at) in the INSERT itself
+    __mapper_args__ = {"eager_defaults": True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    patch_id = Column(Integer, ForeignKey("patches.id"), nullable=False, index=True)
+    status = Column(Enum(PatchStatus), default=PatchStatus.SCHEDULED, nullable=False)
+    executor = Column(String(50), nullable=False)
+    total_targets = Column(Integer, default=0, nullable=False)
+    total_waves = Column(Integer, default=0, nullable=False)
+    current_wave = Column(Integer, default=0, nullable=False)
+    succeeded = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    concurrency = Column(Integer, nullable=False)
+    failure_threshold = Column(Float, nullable=False)
+    error = Column(Text)
+    scheduled_for = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    # Process running the rollout, and until when its claim holds without a heartbeat
+    owner = Column(String(100))
+    lease_expires_at = Column(DateTime(timezone=True))
+
+
+class PatchDeploymentTarget(Base):
+    """Progress of one host within a deployment"""
+    __tablename__ = "patch_deployment_targets"
+
+    id = Column(Integer, primary_key=True)
+    deployment_id = Column(Integer, ForeignKey("patch_deployments.id"), nullable=False)
+    host = Column(String(255), nullable=False)
+    wave = Column(Integer, nullable=False)
+    status = Column(Enum(TargetStatus), default=TargetStatus.PENDING, nullable=False)
+    error = Column(Text)
+    finished_at = Column(DateTime(timezone=True))
+
+
+# A wave's remaining hosts are read by (deployment, wave, status)
+Index(
+    "ix_patch_deployment_targets_wave",
+    PatchDeploymentTarget.deployment_id,
+    PatchDeploymentTarget.wave,
+    PatchDeploymentTarget.status,
+)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Float, UniqueConstraint
+
+from app.core.database import Base
+
+
+class MetricRollup(Base):
+    """Pre-aggregated counter for one metric in one hour or day bucket"""
+    __tablename__ = "metric_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "metric", "bucket_start", name="uq_metric_rollups_bucket"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    granularity = Column(String(10), nullable=False)  # "hour" or "day"
+    metric = Column(String(50), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    count = Column(BigInteger, default=0, nullable=False)
+    total = Column(Float, default=0.0, nullable=False)  # e.g. summed resolution seconds for MTTR
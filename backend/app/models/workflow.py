@@ -0,0 +1,66 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, Boolean, JSON, ForeignKey, Index
+from sqlalchemy.sql import func
+import enum
+
+from app.core.database import Base
+
+
+class WorkflowRunStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class StepState(str, enum.Enum):
+    """Per-step state, stored as one character per step in WorkflowRun.step_states"""
+    PENDING = "P"
+    RUNNING = "R"
+    SUCCEEDED = "S"
+    FAILED = "F"
+    SKIPPED = "K"
+
+
+class Workflow(Base):
+    """A runbook: a DAG of typed steps, optionally triggered by alert classification"""
+    __tablename__ = "workflows"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False)
+    description = Column(Text)
+    # {"steps": [{"id": ..., "type": ..., "params": {...}, "depends_on": [...]}, ...]}
+    definition = Column(JSON, nullable=False)
+    trigger_classification = Column(String(100), index=True)
+    max_concurrency = Column(Integer)  # concurrent steps per run; NULL uses the engine default
+    enabled = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class WorkflowRun(Base):
+    """One execution of a workflow.
+
+    Step progress is a string with one StepState character per step, in
+    definition order ("SSRP"), so a run is a single narrow row however many
+    steps it has.
+    """
+    __tablename__ = "workflow_runs"
+    __mapper_args__ = {"eager_defaults": True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    workflow_id = Column(Integer, ForeignKey("workflows.id"), nullable=False, index=True)
+    alert_id = Column(Integer, ForeignKey("alerts.id"))
+    status = Column(Enum(WorkflowRunStatus), default=WorkflowRunStatus.PENDING, nullable=False)
+    step_states = Column(String(255), nullable=False)
+    context = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    # Engine executing the run, and until when its claim holds without a heartbeat
+    owner = Column(String(100))
+    lease_expires_at = Column(DateTime(timezone=True))
+
+
+# The engine polls for runs to claim by status
+Index("ix_workflow_runs_status_id", WorkflowRun.status, WorkflowRun.id)
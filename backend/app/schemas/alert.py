@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 
 from app.models.alert import AlertSeverity, AlertStatus
@@ -29,12 +29,61 @@ class AlertResponse(AlertBase):
     id: int
     status: AlertStatus
     assigned_to: Optional[str] = None
-    ai_priority_score: int
+    ai_priority_score: Optional[int] = None
     ai_classification: Optional[str] = None
+    ml_severity: Optional[str] = None
+    enriched_at: Optional[datetime] = None
+    occurrence_count: int = 1
+    last_seen_at: Optional[datetime] = None
+    cluster_id: Optional[int] = None
     auto_resolved: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
     resolved_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class AlertClusterResponse(BaseModel):
+    id: int
+    title: str
+    alert_count: int
+    first_seen_at: datetime
+    last_seen_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class BulkAlertCreated(BaseModel):
+    index: int
+    id: int
+    deduplicated: bool = False
+
+
+class BulkAlertError(BaseModel):
+    index: int
+    error: str
+
+
+class BulkAlertResponse(BaseModel):
+    created: List[BulkAlertCreated]
+    errors: List[BulkAlertError]
+
+
+class AlertBulkResolve(BaseModel):
+    """Alerts to resolve: explicit ids, a filter, or both (ANDed)"""
+    ids: Optional[List[int]] = None
+    severity: Optional[AlertSeverity] = None
+    status: Optional[AlertStatus] = None
+    source_system: Optional[str] = None
+    cluster_id: Optional[int] = None
+    created_before: Optional[datetime] = None
+    auto_resolved: bool = False
+    limit: Optional[int] = Field(None, ge=1)
+
+
+class BulkResolveResponse(BaseModel):
+    resolved: int
+    ids: List[int]
@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import datetime
+
+from app.models.patch import PatchStatus
+
+
+class PatchDeployRequest(BaseModel):
+    """Rollout options; anything omitted comes from the patch or settings"""
+    targets: Optional[List[str]] = Field(None, min_length=1)
+    canary_size: Optional[int] = Field(None, ge=0)
+    wave_size: Optional[int] = Field(None, ge=1)
+    concurrency: Optional[int] = Field(None, ge=1)
+    failure_threshold: Optional[float] = Field(None, ge=0.0, le=1.0)
+    scheduled_for: Optional[datetime] = None
+
+
+class PatchDeploymentResponse(BaseModel):
+    id: int
+    patch_id: int
+    status: PatchStatus
+    executor: str
+    total_targets: int
+    total_waves: int
+    current_wave: int
+    succeeded: int
+    failed: int
+    concurrency: int
+    failure_threshold: float
+    error: Optional[str] = None
+    scheduled_for: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    targets: Optional[Dict[str, int]] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,62 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+from app.models.workflow import WorkflowRunStatus
+
+
+class WorkflowStep(BaseModel):
+    id: str = Field(..., min_length=1, max_length=100)
+    type: str
+    params: Dict[str, Any] = {}
+    depends_on: List[str] = []
+    retries: int = Field(0, ge=0, le=10)
+    timeout: Optional[float] = Field(None, gt=0)
+
+
+class WorkflowDefinition(BaseModel):
+    steps: List[WorkflowStep] = Field(..., min_length=1, max_length=255)
+
+
+class WorkflowCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    description: Optional[str] = None
+    definition: WorkflowDefinition
+    trigger_classification: Optional[str] = Field(None, max_length=100)
+    max_concurrency: Optional[int] = Field(None, ge=1)
+    enabled: bool = True
+
+
+class WorkflowResponse(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    definition: Dict[str, Any]
+    trigger_classification: Optional[str] = None
+    max_concurrency: Optional[int] = None
+    enabled: bool
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class WorkflowRunCreate(BaseModel):
+    alert_id: Optional[int] = None
+    context: Dict[str, Any] = {}
+
+
+class WorkflowRunResponse(BaseModel):
+    id: int
+    workflow_id: int
+    alert_id: Optional[int] = None
+    status: WorkflowRunStatus
+    step_states: str
+    steps: Dict[str, str] = {}
+    context: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    live: bool = False
@@ -0,0 +1,67 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+AlertText = Tuple[str, str]
+BatchHandler = Callable[[List[AlertText]], Awaitable[List[Dict[str, Any]]]]
+
+
+class AlertBatcher:
+    """Coalesce concurrent alert analyses into a single model call.
+
+    Alerts submitted within ``max_wait_ms`` of the first pending alert (or
+    until ``max_batch_size`` is reached) are handed to ``handler`` together,
+    and each caller receives the result at its own position.
+    """
+
+    def __init__(self, handler: BatchHandler, max_batch_size: int, max_wait_ms: int):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, title: str, description: str) -> Dict[str, Any]:
+        """Queue an alert for the next batch and wait for its analysis"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((title, description, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, str, asyncio.Future]]):
+        try:
+            results = await self.handler([(title, description) for title, description, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def drain(self):
+        """Flush pending alerts and wait for in-flight batches to finish"""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
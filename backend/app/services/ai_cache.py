@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import hashlib
+import json
+
+from app.core.config import settings
+from app.core.metrics import cache_counters
+from app.core.database import redis_client
+from app.core.text import normalize_text
+
+
+class AnalysisCache:
+    """Two-tier cache for AI analysis results.
+
+    A bounded in-process LRU answers repeats on this worker; Redis is shared
+    by all workers and expires entries after ``ttl`` seconds. Redis errors
+    and undecodable values are counted and otherwise treated as misses.
+    """
+
+    def __init__(
+        self,
+        redis=None,
+        max_entries: int = 10000,
+        ttl: int = 3600,
+        strip_numbers: bool = False,
+        namespace: str = "ai-cache",
+    ):
+        self.redis = redis
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.strip_numbers = strip_numbers
+        self.namespace = namespace
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lookups = cache_counters("ai_analysis", "local_hit", "redis_hit", "miss")
+        self.stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "redis_errors": 0,
+        }
+
+    def key(self, kind: str, *parts: Optional[str]) -> str:
+        """Content-addressed key over model, prompt version and normalized input"""
+        normalized = [normalize_text(part, self.strip_numbers) for part in parts]
+        material = json.dumps(
+            [settings.GEMINI_MODEL, settings.AI_PROMPT_VERSION, kind, normalized],
+            separators=(",", ":"),
+        )
+        return f"{self.namespace}:{kind}:{hashlib.sha256(material.encode()).hexdigest()}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self.stats["local_hits"] += 1
+            self._lookups["local_hit"].inc()
+            return dict(value)
+
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(key)
+            except Exception:
+                self.stats["redis_errors"] += 1
+                raw = None
+            if raw is not None:
+                try:
+                    value = json.loads(raw)
+                except ValueError:
+                    value = None
+                if not isinstance(value, dict):
+                    # Corrupt or foreign value under our key
+                    self.stats["redis_errors"] += 1
+                    raw = None
+            if raw is not None:
+                self._remember(key, value)
+                self.stats["redis_hits"] += 1
+                self._lookups["redis_hit"].inc()
+                return dict(value)
+
+        self.stats["misses"] += 1
+        self._lookups["miss"].inc()
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        self._remember(key, dict(value))
+        if self.redis is not None:
+            try:
+                await self.redis.set(key, json.dumps(value), ex=self.ttl)
+            except Exception:
+                self.stats["redis_errors"] += 1
+
+    def _remember(self, key: str, value: Dict[str, Any]):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        lookups = self.stats["local_hits"] + self.stats["redis_hits"] + self.stats["misses"]
+        hits = lookups - self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _create_cache() -> Optional[AnalysisCache]:
+    if not settings.AI_CACHE_ENABLED:
+        return None
+    return AnalysisCache(
+        redis=redis_client if settings.AI_CACHE_REDIS_ENABLED else None,
+        max_entries=settings.AI_CACHE_MAX_ENTRIES,
+        ttl=settings.AI_CACHE_TTL_SECONDS,
+        strip_numbers=settings.AI_CACHE_NORMALIZE_NUMBERS,
+    )
+
+
+analysis_cache = _create_cache()
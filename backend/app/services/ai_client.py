@@ -0,0 +1,93 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from app.core.config import settings
+
+
+class AIClientTimeout(Exception):
+    """Raised when a model call exceeds GEMINI_TIMEOUT_SECONDS"""
+
+
+class AIClient:
+    """Process-wide Gemini client shared by every AIService instance.
+
+    Calls never block the event loop: the native async API is used when the
+    installed google-generativeai exposes it, otherwise calls run on a bounded
+    thread pool. A semaphore caps in-flight calls and each call is timed out.
+    """
+
+    def __init__(
+        self,
+        model: Any = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.model = model
+        self.max_concurrency = max_concurrency or settings.GEMINI_MAX_CONCURRENCY
+        self.timeout = timeout if timeout is not None else settings.GEMINI_TIMEOUT_SECONDS
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._generation_config = None
+
+    def start(self):
+        """Configure the SDK and build the model once per process"""
+        if self.model is None:
+            import google.generativeai as genai
+
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+            self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+            self._generation_config = genai.types.GenerationConfig(
+                max_output_tokens=settings.GEMINI_MAX_TOKENS,
+                temperature=settings.GEMINI_TEMPERATURE,
+            )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if not hasattr(self.model, "generate_content_async"):
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="gemini",
+            )
+
+    def close(self):
+        """Release the thread pool, if one was created"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._semaphore = None
+
+    @property
+    def started(self) -> bool:
+        return self._semaphore is not None
+
+    async def generate(self, prompt: str) -> str:
+        """Send a prompt to the model and return the response text"""
+        if not self.started:
+            self.start()
+
+        async with self._semaphore:
+            try:
+                return await asyncio.wait_for(self._call(prompt), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                raise AIClientTimeout(f"Model call exceeded {self.timeout}s")
+
+    async def _call(self, prompt: str) -> str:
+        kwargs = {}
+        if self._generation_config is not None:
+            kwargs["generation_config"] = self._generation_config
+
+        if self._executor is None:
+            response = await self.model.generate_content_async(prompt, **kwargs)
+        else:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                self._executor,
+                lambda: self.model.generate_content(prompt, **kwargs),
+            )
+        return response.text
+
+
+ai_client = AIClient()
+
+
+def get_ai_client() -> AIClient:
+    return ai_client
@@ -1,17 +1,53 @@
-import google.generativeai as genai
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 import json
 
 from app.core.config import settings
+from app.core.metrics import AI_FALLBACKS, timed
+from app.services.ai_batcher import AlertBatcher
+from app.services.ai_cache import AnalysisCache, analysis_cache
+from app.services.ai_client import AIClient, AIClientTimeout, get_ai_client
+
+_FALLBACKS = {reason: AI_FALLBACKS.labels(reason) for reason in ("timeout", "parse_error", "error", "missing_item")}
+
+
+def _record_fallback(error: Optional[Exception]):
+    if error is None:
+        reason = "missing_item"
+    elif isinstance(error, AIClientTimeout):
+        reason = "timeout"
+    elif isinstance(error, ValueError):  # includes json.JSONDecodeError
+        reason = "parse_error"
+    else:
+        reason = "error"
+    _FALLBACKS[reason].inc()
 
 
 class AIService:
-    def __init__(self):
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+    def __init__(
+        self,
+        client: Optional[AIClient] = None,
+        batcher: Optional[AlertBatcher] = None,
+        cache: Optional[AnalysisCache] = None,
+    ):
+        self.client = client or get_ai_client()
+        self.cache = cache or analysis_cache
+        if batcher is None and settings.AI_BATCH_ENABLED:
+            batcher = _alert_batcher(self)
+        self.batcher = batcher
 
+    @timed("ai.analyze_alert")
     async def analyze_alert(self, title: str, description: str) -> Dict[str, Any]:
         """Analyze alert using AI for classification and prioritization"""
+        if self.cache is not None:
+            cached = await self.cache.get(self.cache.key("alert", title, description))
+            if cached is not None:
+                return cached
+
+        if self.batcher is not None:
+            return await self.batcher.submit(title, description)
+        return await self._analyze_single_alert(title, description)
+
+    async def _analyze_single_alert(self, title: str, description: str) -> Dict[str, Any]:
         try:
             prompt = f"""
             You are an IT operations expert specializing in alert analysis.
@@ -32,32 +68,96 @@ class AIService:
             }}
             """
 
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=settings.GEMINI_MAX_TOKENS,
-                    temperature=settings.GEMINI_TEMPERATURE,
-                )
-            )
-
-            # Extract JSON from response
-            response_text = response.text.strip()
-            # Remove markdown code blocks if present
-            if response_text.startswith("```json"):
-                response_text = response_text[7:-3]
-            elif response_text.startswith("```"):
-                response_text = response_text[3:-3]
-            
-            result = json.loads(response_text)
+            response_text = await self.client.generate(prompt)
+            result = self._parse_json_response(response_text)
+            await self._cache_result(result, "alert", title, description)
             return result
 
         except Exception as e:
             # Fallback to basic analysis if AI fails
-            return {
-                "priority_score": self._calculate_basic_priority(title, description),
-                "classification": "general",
-                "suggested_action": "Manual review required"
-            }
+            _record_fallback(e)
+            return self._fallback_analysis(title, description)
+
+    async def analyze_alerts(self, alerts: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Analyze several alerts with a single prompt, one result per alert in order"""
+        if len(alerts) == 1:
+            return [await self._analyze_single_alert(*alerts[0])]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(alerts)
+        error: Optional[Exception] = None
+        try:
+            alert_lines = "\n".join(
+                f"""
+            Alert {index}:
+            Title: {title}
+            Description: {description}"""
+                for index, (title, description) in enumerate(alerts)
+            )
+            prompt = f"""
+            You are an IT operations expert specializing in alert analysis.
+
+            Analyze each of the following IT alerts and provide:
+            1. Priority score (0-100, where 100 is most critical)
+            2. Classification category (network, security, performance, hardware, software)
+            3. Suggested action
+            {alert_lines}
+
+            Respond with a JSON array containing one object per alert:
+            [
+                {{
+                    "index": <alert number>,
+                    "priority_score": <number>,
+                    "classification": "<category>",
+                    "suggested_action": "<action>"
+                }}
+            ]
+            """
+
+            response_text = await self.client.generate(prompt)
+            items = self._parse_json_response(response_text)
+
+            for position, item in enumerate(items):
+                if not isinstance(item, dict) or "priority_score" not in item:
+                    continue
+                index = item.pop("index", position)
+                if isinstance(index, int) and 0 <= index < len(alerts) and results[index] is None:
+                    results[index] = item
+                    await self._cache_result(item, "alert", *alerts[index])
+
+        except Exception as e:
+            error = e
+
+        # Fall back per alert for anything the model skipped or mangled
+        for result in results:
+            if result is None:
+                _record_fallback(error)
+        return [
+            result if result is not None else self._fallback_analysis(title, description)
+            for result, (title, description) in zip(results, alerts)
+        ]
+
+    async def _cache_result(self, result: Dict[str, Any], kind: str, *parts: Optional[str]):
+        """Store a successful model result; fallbacks are never cached"""
+        if self.cache is not None:
+            await self.cache.set(self.cache.key(kind, *parts), result)
+
+    def _fallback_analysis(self, title: str, description: str) -> Dict[str, Any]:
+        """Basic analysis used when the AI response is unavailable"""
+        return {
+            "priority_score": self._calculate_basic_priority(title, description),
+            "classification": "general",
+            "suggested_action": "Manual review required"
+        }
+
+    @staticmethod
+    def _parse_json_response(response_text: str) -> Any:
+        """Extract JSON from a model response, removing markdown code blocks if present"""
+        response_text = response_text.strip()
+        if response_text.startswith("```json"):
+            response_text = response_text[7:-3]
+        elif response_text.startswith("```"):
+            response_text = response_text[3:-3]
+        return json.loads(response_text)
 
     def _calculate_basic_priority(self, title: str, description: str) -> int:
         """Basic priority calculation without AI"""
@@ -80,6 +180,12 @@ class AIService:
 
     async def predict_issue_resolution(self, alert_data: Dict[str, Any]) -> Dict[str, Any]:
         """Predict issue resolution time and suggested actions"""
+        cache_input = json.dumps(alert_data, sort_keys=True, default=str)
+        if self.cache is not None:
+            cached = await self.cache.get(self.cache.key("resolution", cache_input))
+            if cached is not None:
+                return cached
+
         try:
             prompt = f"""
             Based on the following alert data, predict the resolution time and provide recommended actions:
@@ -94,21 +200,9 @@ class AIService:
             }}
             """
 
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=settings.GEMINI_MAX_TOKENS,
-                    temperature=settings.GEMINI_TEMPERATURE,
-                )
-            )
-
-            response_text = response.text.strip()
-            if response_text.startswith("```json"):
-                response_text = response_text[7:-3]
-            elif response_text.startswith("```"):
-                response_text = response_text[3:-3]
-            
-            result = json.loads(response_text)
+            response_text = await self.client.generate(prompt)
+            result = self._parse_json_response(response_text)
+            await self._cache_result(result, "resolution", cache_input)
             return result
 
         except Exception:
@@ -116,4 +210,27 @@ class AIService:
                 "estimated_resolution_time": "Unknown",
                 "confidence": 0.0,
                 "recommended_actions": ["Manual investigation required"]
-            }
\ No newline at end of file
+            }
+
+
+# One batcher per client and cache, so batched prompts go through the
+# client and cache the calling service was built with
+_alert_batchers: Dict[Tuple[AIClient, Optional[AnalysisCache]], AlertBatcher] = {}
+
+
+def _alert_batcher(service: AIService) -> AlertBatcher:
+    key = (service.client, service.cache)
+    batcher = _alert_batchers.get(key)
+    if batcher is None:
+        batcher = _alert_batchers[key] = AlertBatcher(
+            service.analyze_alerts,
+            max_batch_size=settings.AI_BATCH_MAX_SIZE,
+            max_wait_ms=settings.AI_BATCH_MAX_WAIT_MS,
+        )
+    return batcher
+
+
+async def drain_alert_batchers():
+    """Flush every batcher and wait for in-flight batches to finish"""
+    for batcher in list(_alert_batchers.values()):
+        await batcher.drain()
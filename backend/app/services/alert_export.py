@@ -0,0 +1,136 @@
+import csv
+import enum
+import importlib.util
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Sequence
+
+import orjson
+
+from app.core.pagination import encode_cursor
+from app.models.alert import Alert
+
+# Export format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Added to every exported row: the export's ``cursor`` parameter value that
+# resumes just past that row
+CURSOR_COLUMN = "cursor"
+
+Batches = AsyncIterator[List[Dict[str, Any]]]
+
+
+def _plain(value: Any) -> Any:
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+async def with_cursors(batches: Batches) -> Batches:
+    """Set each row's resume cursor under CURSOR_COLUMN; rows need created_at and id"""
+    async for rows in batches:
+        for row in rows:
+            row[CURSOR_COLUMN] = encode_cursor(row["created_at"], row["id"])
+        yield rows
+
+
+async def ndjson_chunks(batches: Batches, columns: Sequence[str]) -> AsyncIterator[bytes]:
+    """One JSON object per line, one chunk per batch"""
+    option = orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE
+    async for rows in batches:
+        yield b"".join(orjson.dumps(row, option=option) for row in rows)
+
+
+async def csv_chunks(batches: Batches, columns: Sequence[str]) -> AsyncIterator[bytes]:
+    """Header row, then one chunk per batch; NULLs are empty cells"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in batches:
+        for row in rows:
+            writer.writerow([
+                value.isoformat() if isinstance(value, datetime) else _plain(value)
+                for value in (row[column] for column in columns)
+            ])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to the caller on drain"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _arrow_schema(columns: Sequence[str]):
+    import pyarrow as pa
+
+    types = {int: pa.int64(), bool: pa.bool_(), float: pa.float64(), datetime: pa.timestamp("us", tz="UTC")}
+    fields = []
+    for column in columns:
+        python_type = str if column == CURSOR_COLUMN else getattr(Alert, column).type.python_type
+        fields.append(pa.field(column, types.get(python_type, pa.string())))
+    return pa.schema(fields)
+
+
+def parquet_available() -> bool:
+    """Whether the optional pyarrow dependency is installed"""
+    try:
+        return importlib.util.find_spec("pyarrow.parquet") is not None
+    except ImportError:
+        # pyarrow itself is missing
+        return False
+
+
+async def parquet_chunks(batches: Batches, columns: Sequence[str]) -> AsyncIterator[bytes]:
+    """One Parquet row group per batch, streamed as each group is written.
+
+    pyarrow is optional; check parquet_available() before streaming.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(columns)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for rows in batches:
+            table = pa.Table.from_pylist(
+                [{column: _plain(row[column]) for column in columns} for row in rows],
+                schema=schema
+            )
+            writer.write_table(table)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+EXPORT_WRITERS = {
+    "ndjson": ndjson_chunks,
+    "csv": csv_chunks,
+    "parquet": parquet_chunks,
+}
@@ -0,0 +1,226 @@
+import asyncio
+import math
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import Float, and_, cast, func, literal_column, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import timed
+from app.models.alert import ALERT_SEARCH_CONFIG, Alert, AlertSeverity, AlertStatus
+
+RankCursor = Tuple[float, int]
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Same cut-off as pg_trgm's default similarity_threshold
+MIN_TERM_SIMILARITY = 0.3
+# Title matches outrank description matches, like the 'A'/'B' tsvector weights
+TITLE_WEIGHT = 2.0
+# Rows per server-side cursor fetch while (re)loading the fallback index
+INDEX_LOAD_BATCH_SIZE = 5000
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def trigrams(term: str) -> Set[str]:
+    """pg_trgm-style trigrams: the word padded with two leading and one trailing space"""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AlertSearchIndex:
+    """In-process inverted index standing in for PostgreSQL full-text search.
+
+    Used when the database has no tsvector/pg_trgm support (SQLite test and
+    benchmark runs). Every query term must match, exactly or through a
+    vocabulary term with trigram similarity >= MIN_TERM_SIMILARITY; scores
+    are tf-idf with title terms weighted up. ``refresh`` catches up with
+    inserted and updated alerts before each search and reloads everything
+    when rows were deleted.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._trigram_terms: Dict[str, Set[str]] = defaultdict(set)
+        self._max_id = 0
+        self._updated_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def add(self, alert_id: int, title: Optional[str], description: Optional[str]):
+        self.remove(alert_id)
+        weights: Dict[str, float] = defaultdict(float)
+        for term in tokenize(title):
+            weights[term] += TITLE_WEIGHT
+        for term in tokenize(description):
+            weights[term] += 1.0
+        for term, weight in weights.items():
+            if term not in self._postings:
+                for trigram in trigrams(term):
+                    self._trigram_terms[trigram].add(term)
+            self._postings[term][alert_id] = weight
+        self._doc_terms[alert_id] = tuple(weights)
+
+    def remove(self, alert_id: int):
+        for term in self._doc_terms.pop(alert_id, ()):
+            postings = self._postings[term]
+            postings.pop(alert_id, None)
+            if not postings:
+                del self._postings[term]
+                for trigram in trigrams(term):
+                    self._trigram_terms[trigram].discard(term)
+
+    def clear(self):
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._trigram_terms.clear()
+        self._max_id = 0
+        self._updated_at = None
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Vocabulary terms matching ``term``, with their trigram similarity"""
+        term_trigrams = trigrams(term)
+        shared: Dict[str, int] = defaultdict(int)
+        for trigram in term_trigrams:
+            for candidate in self._trigram_terms.get(trigram, ()):
+                shared[candidate] += 1
+        matches = []
+        for candidate, count in shared.items():
+            similarity = count / (len(term_trigrams) + len(trigrams(candidate)) - count)
+            if candidate == term or similarity >= MIN_TERM_SIMILARITY:
+                matches.append((candidate, 1.0 if candidate == term else similarity))
+        return matches
+
+    def search(self, query: str) -> List[RankCursor]:
+        """(score, alert_id) for every matching alert, best first"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        documents = len(self._doc_terms)
+        scores: Dict[int, float] = defaultdict(float)
+        matched: Dict[int, int] = defaultdict(int)
+        for term in terms:
+            term_scores: Dict[int, float] = defaultdict(float)
+            for candidate, similarity in self._expand(term):
+                postings = self._postings[candidate]
+                idf = math.log(1 + documents / len(postings))
+                for alert_id, weight in postings.items():
+                    term_scores[alert_id] = max(term_scores[alert_id], similarity * weight * idf)
+            for alert_id, score in term_scores.items():
+                scores[alert_id] += score
+                matched[alert_id] += 1
+        return sorted(
+            ((score, alert_id) for alert_id, score in scores.items() if matched[alert_id] == len(terms)),
+            reverse=True
+        )
+
+    async def refresh(self, db: AsyncSession):
+        """Index alerts inserted or updated since the last refresh"""
+        async with self._lock:
+            count = await db.scalar(select(func.count(Alert.id)))
+            changed = [Alert.id > self._max_id]
+            if self._updated_at is None:
+                changed.append(Alert.updated_at.is_not(None))
+            else:
+                # >= so an update in the same clock tick as the last refresh is not missed
+                changed.append(Alert.updated_at >= self._updated_at)
+            await self._load(db, or_(*changed))
+            if len(self._doc_terms) != count:
+                # Rows were deleted: start over
+                self.clear()
+                await self._load(db)
+
+    async def _load(self, db: AsyncSession, condition=None):
+        query = select(Alert.id, Alert.title, Alert.description, Alert.updated_at)
+        if condition is not None:
+            query = query.where(condition)
+        result = await db.stream(query.execution_options(yield_per=INDEX_LOAD_BATCH_SIZE))
+        async for alert_id, title, description, updated_at in result:
+            self.add(alert_id, title, description)
+            self._max_id = max(self._max_id, alert_id)
+            if updated_at is not None and (self._updated_at is None or updated_at > self._updated_at):
+                self._updated_at = updated_at
+
+
+fallback_index = AlertSearchIndex()
+
+
+class AlertSearchService:
+    """Ranked text search over alert titles and descriptions.
+
+    PostgreSQL matches the generated ``search_vector`` (GIN) or a fuzzy
+    trigram match on the title (GIN, gin_trgm_ops) and ranks by
+    ts_rank_cd + title similarity; other databases use the in-process
+    fallback index. Results page by a (score, id) keyset cursor.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @timed("db.alert_search.search")
+    async def search(
+        self,
+        query: str,
+        columns: Sequence[str],
+        limit: int = 20,
+        severity: Optional[AlertSeverity] = None,
+        status: Optional[AlertStatus] = None,
+        after: Optional[RankCursor] = None
+    ) -> List[Dict[str, Any]]:
+        """Matching alerts as dicts of ``columns`` (which must include id) plus "score", best first"""
+        filters = []
+        if severity:
+            filters.append(Alert.severity == severity)
+        if status:
+            filters.append(Alert.status == status)
+        if self.db.bind.dialect.name == "postgresql":
+            return await self._search_postgres(query, columns, limit, filters, after)
+        return await self._search_fallback(query, columns, limit, filters, after)
+
+    async def _search_postgres(self, query: str, columns, limit: int, filters, after: Optional[RankCursor]):
+        tsquery = func.websearch_to_tsquery(cast(ALERT_SEARCH_CONFIG, REGCONFIG), query)
+        vector = literal_column("alerts.search_vector", TSVECTOR)
+        score = cast(func.ts_rank_cd(vector, tsquery) + func.similarity(Alert.title, query), Float)
+
+        ranked = (
+            select(*(getattr(Alert, column) for column in columns), score.label("score"))
+            .where(and_(or_(vector.bool_op("@@")(tsquery), Alert.title.bool_op("%")(query)), *filters))
+            .subquery()
+        )
+        stmt = select(ranked)
+        if after:
+            stmt = stmt.where(tuple_(ranked.c.score, ranked.c.id) < tuple_(*after))
+        stmt = stmt.order_by(ranked.c.score.desc(), ranked.c.id.desc()).limit(limit)
+        result = await self.db.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+
+    async def _search_fallback(self, query: str, columns, limit: int, filters, after: Optional[RankCursor]):
+        await fallback_index.refresh(self.db)
+        ranked = fallback_index.search(query)
+        if after:
+            ranked = [match for match in ranked if match < after]
+
+        rows = []
+        # Fetch candidates in rank order until the page is full, applying filters in SQL
+        for offset in range(0, len(ranked), max(limit * 2, 100)):
+            chunk = ranked[offset:offset + max(limit * 2, 100)]
+            scores = {alert_id: score for score, alert_id in chunk}
+            result = await self.db.execute(
+                select(*(getattr(Alert, column) for column in columns))
+                .where(Alert.id.in_(scores), *filters)
+            )
+            found = {row["id"]: dict(row) for row in result.mappings()}
+            for score, alert_id in chunk:
+                if alert_id in found:
+                    rows.append({**found[alert_id], "score": score})
+                    if len(rows) >= limit:
+                        return rows
+        return rows
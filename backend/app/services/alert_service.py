@@ -1,109 +1,488 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from sqlalchemy import select, insert, update, func, and_, or_, case
+from sqlalchemy.exc import SQLAlchemyError
+from typing import AsyncIterator, List, Optional, Dict, Any, Sequence, Tuple, Union
+from datetime import datetime, timedelta, timezone
 
-from app.models.alert import Alert, AlertSeverity, AlertStatus
+from app.core.config import settings
+from app.core.metrics import timed
+from app.core.pagination import keyset
+from app.models.alert import Alert, AlertSeverity, AlertStatus, CLOSED_ALERT_STATUSES, OPEN_ALERT_STATUSES
 from app.schemas.alert import AlertCreate, AlertUpdate
+from app.services.analytics_cache import alert_counts_cache
+from app.services.event_stream import (
+    ALERT_CREATED,
+    ALERT_RESOLVED,
+    ALERT_UPDATED,
+    build_alert_event,
+    event_broker,
+    publish_alert_events,
+)
+from app.services.rollup_service import rollups
+from app.services.dedup_service import alert_fingerprint, dedup_index
 
 
 class AlertService:
+    # Rows per multi-row INSERT; keeps bind parameters well under driver limits
+    BULK_INSERT_CHUNK_SIZE = 1000
+
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @timed("db.alert_service.get_alerts")
     async def get_alerts(
         self,
         skip: int = 0,
         limit: int = 100,
         severity: Optional[AlertSeverity] = None,
-        status: Optional[AlertStatus] = None
+        status: Optional[AlertStatus] = None,
+        after: Optional[Tuple[datetime, int]] = None
     ) -> List[Alert]:
-        """Get alerts with optional filtering"""
-        query = select(Alert)
-        
+        """Get alerts with optional filtering, newest first.
+
+        ``after`` is a decoded keyset cursor (created_at, id); when given,
+        rows strictly after it in (created_at DESC, id DESC) order are
+        returned and ``skip`` is ignored.
+        """
+        result = await self.db.execute(self._listing(select(Alert), skip, limit, severity, status, after))
+        return result.scalars().all()
+
+    @timed("db.alert_service.get_alert_rows")
+    async def get_alert_rows(
+        self,
+        columns: Sequence[str],
+        skip: int = 0,
+        limit: int = 100,
+        severity: Optional[AlertSeverity] = None,
+        status: Optional[AlertStatus] = None,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Same listing as get_alerts, as plain dicts of only ``columns``.
+
+        Skips ORM hydration and identity-map bookkeeping entirely, which
+        dominates the cost of serving large pages.
+        """
+        query = select(*(getattr(Alert, column) for column in columns))
+        result = await self.db.execute(self._listing(query, skip, limit, severity, status, after))
+        return [dict(row) for row in result.mappings()]
+
+    async def stream_alert_rows(
+        self,
+        columns: Sequence[str],
+        batch_size: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        severities: Sequence[AlertSeverity] = (),
+        statuses: Sequence[AlertStatus] = (),
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Matching alerts oldest first, in batches from a server-side cursor.
+
+        ``start`` is inclusive and ``end`` exclusive on created_at; ``after``
+        is a keyset cursor (created_at, id) to resume just past a row. Only
+        one batch is held in memory at a time, whatever the range.
+        """
+        conditions = []
+        if start:
+            conditions.append(Alert.created_at >= start)
+        if end:
+            conditions.append(Alert.created_at < end)
+        if severities:
+            conditions.append(Alert.severity.in_(severities))
+        if statuses:
+            conditions.append(Alert.status.in_(statuses))
+        if after:
+            row_key, cursor_key = keyset(self.db.bind.dialect.name, Alert.created_at, Alert.id, after)
+            conditions.append(row_key > cursor_key)
+
+        query = select(*(getattr(Alert, column) for column in columns))
+        if conditions:
+            query = query.where(and_(*conditions))
+        query = query.order_by(Alert.created_at, Alert.id).execution_options(yield_per=batch_size)
+
+        result = await self.db.stream(query)
+        async for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
+
+    def _listing(
+        self,
+        query,
+        skip: int,
+        limit: int,
+        severity: Optional[AlertSeverity],
+        status: Optional[AlertStatus],
+        after: Optional[Tuple[datetime, int]]
+    ):
         conditions = []
         if severity:
             conditions.append(Alert.severity == severity)
         if status:
             conditions.append(Alert.status == status)
+        if after:
+            row_key, cursor_key = keyset(self.db.bind.dialect.name, Alert.created_at, Alert.id, after)
+            conditions.append(row_key < cursor_key)
         
         if conditions:
             query = query.where(and_(*conditions))
         
-        query = query.offset(skip).limit(limit).order_by(Alert.created_at.desc())
-        
-        result = await self.db.execute(query)
-        return result.scalars().all()
+        query = query.order_by(Alert.created_at.desc(), Alert.id.desc()).limit(limit)
+        if not after:
+            query = query.offset(skip)
+        return query
 
+    @timed("db.alert_service.get_alert")
     async def get_alert(self, alert_id: int) -> Optional[Alert]:
         """Get a specific alert by ID"""
         result = await self.db.execute(select(Alert).where(Alert.id == alert_id))
         return result.scalar_one_or_none()
 
-    async def create_alert(self, alert_data: AlertCreate, ai_analysis: Dict[str, Any]) -> Alert:
-        """Create a new alert with AI analysis"""
-        alert = Alert(
-            **alert_data.dict(),
-            ai_priority_score=ai_analysis.get("priority_score", 0),
-            ai_classification=ai_analysis.get("classification")
+    @timed("db.alert_service.create_alert")
+    async def create_alert(
+        self,
+        alert_data: AlertCreate,
+        ai_analysis: Optional[Dict[str, Any]] = None,
+        cluster_id: Optional[int] = None
+    ) -> Alert:
+        """Create a new alert with AI analysis, or pending enrichment when none is given"""
+        # INSERT ... RETURNING hands back server defaults without a refresh SELECT
+        alert = await self.db.scalar(
+            insert(Alert).values(**self._alert_values(alert_data, ai_analysis, cluster_id)).returning(Alert)
         )
-        
-        self.db.add(alert)
         await self.db.commit()
-        await self.db.refresh(alert)
+        rollups.record_alerts_created()
+        alert_counts_cache.adjust(new=(alert.status, alert.severity))
+        await publish_alert_events(ALERT_CREATED, [alert])
         return alert
 
+    @timed("db.alert_service.create_alerts")
+    async def create_alerts(
+        self,
+        alerts: List[AlertCreate],
+        ai_analyses: Optional[List[Optional[Dict[str, Any]]]] = None,
+        cluster_ids: Optional[List[Optional[int]]] = None,
+        occurrence_counts: Optional[List[int]] = None,
+        ml_predictions: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> List[Union[Alert, str]]:
+        """Create many alerts with multi-row INSERT ... RETURNING.
+
+        Returns one entry per input, in order: the created Alert, or an error
+        message when that row could not be inserted.
+        """
+        ai_analyses = ai_analyses or [None] * len(alerts)
+        cluster_ids = cluster_ids or [None] * len(alerts)
+        occurrence_counts = occurrence_counts or [1] * len(alerts)
+        ml_predictions = ml_predictions or [None] * len(alerts)
+        rows = [
+            self._alert_values(alert, analysis, cluster_id, occurrences, ml_prediction)
+            for alert, analysis, cluster_id, occurrences, ml_prediction
+            in zip(alerts, ai_analyses, cluster_ids, occurrence_counts, ml_predictions)
+        ]
+
+        results: List[Union[Alert, str]] = []
+        for start in range(0, len(rows), self.BULK_INSERT_CHUNK_SIZE):
+            chunk = rows[start:start + self.BULK_INSERT_CHUNK_SIZE]
+            try:
+                inserted = await self.db.scalars(
+                    insert(Alert).returning(Alert, sort_by_parameter_order=True),
+                    chunk
+                )
+                created = inserted.all()
+                await self.db.commit()
+                rollups.record_alerts_created(len(created))
+                results.extend(created)
+                for alert in created:
+                    alert_counts_cache.adjust(new=(alert.status, alert.severity))
+                await publish_alert_events(ALERT_CREATED, created)
+            except SQLAlchemyError:
+                # Isolate the offending rows so the rest of the chunk still lands
+                await self.db.rollback()
+                results.extend(await self._insert_individually(chunk))
+        return results
+
+    @timed("db.alert_service.insert_individually")
+    async def _insert_individually(self, rows: List[Dict[str, Any]]) -> List[Union[Alert, str]]:
+        results: List[Union[Alert, str]] = []
+        for row in rows:
+            try:
+                async with self.db.begin_nested():
+                    inserted = await self.db.scalars(insert(Alert).returning(Alert), [row])
+                    results.append(inserted.one())
+            except SQLAlchemyError as e:
+                results.append(str(getattr(e, "orig", None) or e))
+        await self.db.commit()
+        inserted = [alert for alert in results if isinstance(alert, Alert)]
+        rollups.record_alerts_created(len(inserted))
+        for alert in inserted:
+            alert_counts_cache.adjust(new=(alert.status, alert.severity))
+        await publish_alert_events(ALERT_CREATED, inserted)
+        return results
+
+    @staticmethod
+    def _alert_values(
+        alert_data: AlertCreate,
+        ai_analysis: Optional[Dict[str, Any]],
+        cluster_id: Optional[int] = None,
+        occurrences: int = 1,
+        ml_prediction: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        values = alert_data.dict()
+        values["fingerprint"] = alert_fingerprint(alert_data.source_system, alert_data.source_id, alert_data.title)
+        values["cluster_id"] = cluster_id
+        values["occurrence_count"] = occurrences
+        values["ml_severity"] = (ml_prediction or {}).get("severity")
+        if ai_analysis is None:
+            # Pending background enrichment, leased to the process queuing it
+            values["ai_priority_score"] = None
+            values["ai_classification"] = None
+            values["enrichment_lease_expires_at"] = (
+                datetime.now(timezone.utc) + timedelta(seconds=settings.ENRICHMENT_LEASE_SECONDS)
+            )
+        else:
+            values["ai_priority_score"] = ai_analysis.get("priority_score", 0)
+            values["ai_classification"] = ai_analysis.get("classification")
+        return values
+
+    @timed("db.alert_service.update_alert")
     async def update_alert(self, alert_id: int, alert_update: AlertUpdate) -> Optional[Alert]:
-        """Update an existing alert"""
-        alert = await self.get_alert(alert_id)
-        if not alert:
+        """Update an existing alert.
+
+        Raises IntegrityError when a reopen or a new title would give the
+        alert the fingerprint of another open alert.
+        """
+        values = alert_update.dict(exclude_unset=True)
+        if values.get("status") == AlertStatus.RESOLVED:
+            values["resolved_at"] = self._resolved_at_now()
+        old_fingerprint = None
+        if values.get("title") is not None:
+            # The fingerprint covers the title, so keep it in step
+            current = (await self.db.execute(
+                select(Alert.source_system, Alert.source_id, Alert.fingerprint).where(Alert.id == alert_id)
+            )).one_or_none()
+            if current is None:
+                return None
+            old_fingerprint = current.fingerprint
+            values["fingerprint"] = alert_fingerprint(current.source_system, current.source_id, values["title"])
+        changed = await self._update_returning(Alert.id == alert_id, values)
+        if not changed:
             return None
-        
-        update_data = alert_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(alert, field, value)
-        
-        alert.updated_at = datetime.utcnow()
-        await self.db.commit()
-        await self.db.refresh(alert)
+
+        alert, (old_status, _) = changed[0]
+        event_type = ALERT_RESOLVED if alert.status == AlertStatus.RESOLVED else ALERT_UPDATED
+        await self._finish_status_changes(changed, event_type)
+        renamed = "fingerprint" in values and old_fingerprint != alert.fingerprint
+        if renamed and old_fingerprint:
+            await dedup_index.discard(old_fingerprint)
+        if alert.fingerprint and alert.status in OPEN_ALERT_STATUSES and (
+            renamed or old_status not in OPEN_ALERT_STATUSES
+        ):
+            # Reopened or renamed: repeats of it are counted against it again
+            await dedup_index.set(alert.fingerprint, alert.id)
         return alert
 
+    @timed("db.alert_service.resolve_alert")
     async def resolve_alert(self, alert_id: int) -> Optional[Alert]:
         """Mark an alert as resolved"""
-        alert = await self.get_alert(alert_id)
-        if not alert:
+        changed = await self._update_returning(
+            Alert.id == alert_id,
+            {"status": AlertStatus.RESOLVED, "resolved_at": self._resolved_at_now()}
+        )
+        if not changed:
             return None
-        
-        alert.status = AlertStatus.RESOLVED
-        alert.resolved_at = datetime.utcnow()
-        alert.updated_at = datetime.utcnow()
-        
+
+        await self._finish_status_changes(changed, ALERT_RESOLVED)
+        return changed[0][0]
+
+    @timed("db.alert_service.resolve_alerts")
+    async def resolve_alerts(
+        self,
+        ids: Optional[List[int]] = None,
+        severity: Optional[AlertSeverity] = None,
+        status: Optional[AlertStatus] = None,
+        source_system: Optional[str] = None,
+        cluster_id: Optional[int] = None,
+        created_before: Optional[datetime] = None,
+        auto_resolved: bool = False,
+        limit: int = 1000
+    ) -> List[Alert]:
+        """Resolve up to ``limit`` open alerts by id and/or filter in one statement"""
+        conditions = [Alert.status.in_(OPEN_ALERT_STATUSES)]
+        if ids is not None:
+            conditions.append(Alert.id.in_(ids))
+        if severity is not None:
+            conditions.append(Alert.severity == severity)
+        if status is not None:
+            conditions.append(Alert.status == status)
+        if source_system is not None:
+            conditions.append(Alert.source_system == source_system)
+        if cluster_id is not None:
+            conditions.append(Alert.cluster_id == cluster_id)
+        if created_before is not None:
+            conditions.append(Alert.created_at < created_before)
+
+        values: Dict[str, Any] = {"status": AlertStatus.RESOLVED, "resolved_at": func.now()}
+        if auto_resolved:
+            values["auto_resolved"] = True
+        changed = await self._update_returning(and_(*conditions), values, limit=limit)
+        await self._finish_status_changes(changed, ALERT_RESOLVED)
+        return [alert for alert, _ in changed]
+
+    @staticmethod
+    def _resolved_at_now():
+        """Keep the original resolution time when an already closed alert is resolved again"""
+        return case((Alert.status.in_(CLOSED_ALERT_STATUSES), Alert.resolved_at), else_=func.now())
+
+    async def _update_returning(
+        self,
+        condition,
+        values: Dict[str, Any],
+        limit: Optional[int] = None
+    ) -> List[Tuple[Alert, Tuple[AlertStatus, AlertSeverity]]]:
+        """Apply ``values`` with one UPDATE ... RETURNING (not committed).
+
+        The matching rows are locked and their old status and severity read
+        in a CTE of the same statement, so callers get (alert, previous)
+        pairs without a SELECT before or a refresh after.
+        """
+        previous = select(
+            Alert.id,
+            Alert.status.label("previous_status"),
+            Alert.severity.label("previous_severity")
+        ).where(condition).order_by(Alert.id)
+        if limit is not None:
+            previous = previous.limit(limit)
+        values = {**values, "updated_at": func.now()}
+
+        if self.db.bind.dialect.name == "sqlite":
+            # SQLite's RETURNING cannot see UPDATE ... FROM tables; read the old values first
+            old = {row.id: (row.previous_status, row.previous_severity) for row in await self.db.execute(previous)}
+            if not old:
+                return []
+            result = await self.db.scalars(
+                update(Alert)
+                .where(Alert.id.in_(old))
+                .values(**values)
+                .returning(Alert)
+                .execution_options(synchronize_session=False)
+            )
+            return [(alert, old[alert.id]) for alert in result.all()]
+
+        previous = previous.with_for_update().cte("previous")
+        result = await self.db.execute(
+            update(Alert)
+            .where(Alert.id == previous.c.id)
+            .values(**values)
+            .returning(Alert, previous.c.previous_status, previous.c.previous_severity)
+            .execution_options(synchronize_session=False)
+        )
+        return [(alert, (old_status, old_severity)) for alert, old_status, old_severity in result.all()]
+
+    async def _finish_status_changes(
+        self,
+        changed: List[Tuple[Alert, Tuple[AlertStatus, AlertSeverity]]],
+        event_type: str
+    ):
+        """Roll up new resolutions, commit, then update caches and the dedup index and notify listeners"""
+        if not changed:
+            return
+        resolutions = [
+            (alert.created_at, alert.resolved_at, bool(alert.auto_resolved))
+            for alert, (old_status, _) in changed
+            if alert.status in CLOSED_ALERT_STATUSES and old_status not in CLOSED_ALERT_STATUSES
+            and alert.created_at is not None and alert.resolved_at is not None
+        ]
         await self.db.commit()
-        await self.db.refresh(alert)
-        return alert
+        rollups.record_alerts_resolved(resolutions)
 
-    async def get_analytics_summary(self) -> Dict[str, Any]:
-        """Get alert analytics summary"""
-        # Total alerts
-        total_result = await self.db.execute(select(func.count(Alert.id)))
-        total_alerts = total_result.scalar()
-        
-        # Alerts by status
-        status_result = await self.db.execute(
-            select(Alert.status, func.count(Alert.id))
-            .group_by(Alert.status)
+        for alert, previous in changed:
+            alert_counts_cache.adjust(previous, (alert.status, alert.severity))
+        # A closed alert no longer absorbs repeats of its fingerprint
+        await dedup_index.discard_many(
+            alert.fingerprint for alert, (old_status, _) in changed
+            if alert.fingerprint and old_status in OPEN_ALERT_STATUSES and alert.status not in OPEN_ALERT_STATUSES
         )
-        alerts_by_status = {status: count for status, count in status_result.all()}
-        
-        # Alerts by severity
-        severity_result = await self.db.execute(
-            select(Alert.severity, func.count(Alert.id))
-            .group_by(Alert.severity)
+        await event_broker.publish(build_alert_event(event_type, alert, previous) for alert, previous in changed)
+
+    @timed("db.alert_service.apply_enrichment")
+    async def apply_enrichment(
+        self,
+        alert_id: int,
+        ai_analysis: Dict[str, Any],
+        ml_prediction: Dict[str, Any]
+    ) -> bool:
+        """Store background classification results on an alert"""
+        result = await self.db.execute(
+            update(Alert)
+            .where(Alert.id == alert_id)
+            .values(
+                ai_priority_score=ai_analysis.get("priority_score", 0),
+                ai_classification=ai_analysis.get("classification"),
+                ml_severity=ml_prediction.get("severity"),
+                enriched_at=func.now()
+            )
+        )
+        await self.db.commit()
+        return result.rowcount > 0
+
+    @staticmethod
+    def _enrichment_claimable(now: datetime):
+        """Alerts waiting for classification that no process has queued within its lease"""
+        return and_(
+            Alert.ai_priority_score.is_(None),
+            or_(Alert.enrichment_lease_expires_at.is_(None), Alert.enrichment_lease_expires_at < now),
+        )
+
+    @timed("db.alert_service.claim_pending_enrichment")
+    async def claim_pending_enrichment(self, limit: int, lease_seconds: float) -> List[Alert]:
+        """Lease up to ``limit`` claimable pending alerts, lowest id first"""
+        now = datetime.now(timezone.utc)
+        claimable = self._enrichment_claimable(now)
+        candidates = select(Alert.id).where(claimable).order_by(Alert.id).limit(limit)
+        result = await self.db.scalars(
+            update(Alert)
+            # Re-checked on the locked rows, so concurrent sweeps never share an alert
+            .where(Alert.id.in_(candidates), claimable)
+            .values(enrichment_lease_expires_at=now + timedelta(seconds=lease_seconds))
+            .returning(Alert)
+            .execution_options(synchronize_session=False)
         )
-        alerts_by_severity = {severity: count for severity, count in severity_result.all()}
+        claimed = sorted(result.all(), key=lambda alert: alert.id)
+        await self.db.commit()
+        return claimed
+
+    async def release_pending_enrichment(self, alert_ids: Sequence[int]):
+        """Drop the leases on alerts that were not queued so the next sweep takes them"""
+        if not alert_ids:
+            return
+        await self.db.execute(
+            update(Alert)
+            .where(Alert.id.in_(alert_ids), Alert.ai_priority_score.is_(None))
+            .values(enrichment_lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+
+    async def get_analytics_summary(self) -> Dict[str, Any]:
+        """Get alert analytics summary, served from a short-lived cache"""
+        counts, age = await alert_counts_cache.get(self._count_by_status_and_severity)
+
+        alerts_by_status: Dict[AlertStatus, int] = {}
+        alerts_by_severity: Dict[AlertSeverity, int] = {}
+        for (status, severity), count in counts.items():
+            alerts_by_status[status] = alerts_by_status.get(status, 0) + count
+            alerts_by_severity[severity] = alerts_by_severity.get(severity, 0) + count
         
         return {
-            "total_alerts": total_alerts,
-            "alerts_by_status": alerts_by_status,
-            "alerts_by_severity": alerts_by_severity
-        }
\ No newline at end of file
+            "total_alerts": sum(counts.values()),
+            "alerts_by_status": {status: count for status, count in alerts_by_status.items() if count},
+            "alerts_by_severity": {severity: count for severity, count in alerts_by_severity.items() if count},
+            "cache_age_seconds": round(age, 3)
+        }
+
+    @timed("db.alert_service.count_by_status_and_severity")
+    async def _count_by_status_and_severity(self) -> Dict[Tuple[AlertStatus, AlertSeverity], int]:
+        """One grouped pass over alerts; totals and per-axis rollups derive from it"""
+        result = await self.db.execute(
+            select(Alert.status, Alert.severity, func.count(Alert.id))
+            .group_by(Alert.status, Alert.severity)
+        )
+        return {(status, severity): count for status, severity, count in result.all()}
\ No newline at end of file
@@ -0,0 +1,56 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import cache_counters
+from app.models.alert import AlertSeverity, AlertStatus
+
+CountKey = Tuple[AlertStatus, AlertSeverity]
+
+
+class AlertCountsCache:
+    """Per-process cache of alert counts by (status, severity).
+
+    The matrix is loaded with one grouped query and then kept current by
+    ``adjust`` as this process creates and updates alerts, so polling costs
+    no DB time until the TTL expires. Writes made by other workers show up
+    on the next refresh; concurrent refreshes are collapsed into one query.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._counts: Optional[Dict[CountKey, int]] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._lookups = cache_counters("alert_counts", "hit", "miss")
+
+    def _fresh(self) -> bool:
+        return self._counts is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    async def get(self, load: Callable[[], Awaitable[Dict[CountKey, int]]]) -> Tuple[Dict[CountKey, int], float]:
+        """Return (counts, age in seconds), calling ``load`` when stale"""
+        refreshed = False
+        if not self._fresh():
+            async with self._lock:
+                if not self._fresh():
+                    self._counts = await load()
+                    self._loaded_at = time.monotonic()
+                    refreshed = True
+        self._lookups["miss" if refreshed else "hit"].inc()
+        return dict(self._counts), time.monotonic() - self._loaded_at
+
+    def adjust(self, old: Optional[CountKey] = None, new: Optional[CountKey] = None):
+        """Move one alert between cells: old=None for inserts, new=None for deletes"""
+        if self._counts is None or old == new:
+            return
+        if old is not None:
+            self._counts[old] = self._counts.get(old, 0) - 1
+        if new is not None:
+            self._counts[new] = self._counts.get(new, 0) + 1
+
+    def invalidate(self):
+        self._counts = None
+
+
+alert_counts_cache = AlertCountsCache(ttl=settings.ANALYTICS_CACHE_TTL_SECONDS)
@@ -0,0 +1,307 @@
+import asyncio
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.core.metrics import timed
+from app.models.patch import (
+    Patch,
+    PatchDeployment,
+    PatchDeploymentTarget,
+    PatchSeverity,
+    PatchStatus,
+    TargetStatus,
+)
+
+# Rows per server-side cursor fetch while rebuilding
+REBUILD_BATCH_SIZE = 5000
+
+HostResult = Tuple[str, TargetStatus]
+
+
+def _iter_bits(bits: int, limit: Optional[int] = None) -> Iterable[int]:
+    """Positions of the set bits, lowest first"""
+    found = 0
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for offset, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield offset * 8 + low.bit_length() - 1
+            found += 1
+            if limit is not None and found >= limit:
+                return
+            byte ^= low
+
+
+class _Bitsets:
+    """Dense host and patch ids with per-patch host bitsets.
+
+    Bitsets are Python ints (bit N = host N), so AND/OR/popcount over the
+    whole fleet run in C; memory is at most hosts / 8 bytes per bitset.
+    Per-patch counts are kept alongside so summaries never touch the bits.
+    """
+
+    def __init__(self):
+        self.host_ids: Dict[str, int] = {}
+        self.hosts: List[str] = []
+        self.patch_ids: Dict[str, int] = {}
+        self.patches: List[str] = []
+        self.severities: List[PatchSeverity] = []
+        self.targeted: List[int] = []
+        self.installed: List[int] = []
+        self.failed: List[int] = []
+        self.targeted_count: List[int] = []
+        self.installed_count: List[int] = []
+        self.failed_count: List[int] = []
+
+    def host(self, name: str) -> int:
+        host_id = self.host_ids.get(name)
+        if host_id is None:
+            host_id = self.host_ids[name] = len(self.hosts)
+            self.hosts.append(name)
+        return host_id
+
+    def patch(self, patch_id: str, severity: Optional[PatchSeverity]) -> int:
+        number = self.patch_ids.get(patch_id)
+        if number is None:
+            number = self.patch_ids[patch_id] = len(self.patches)
+            self.patches.append(patch_id)
+            self.severities.append(severity or PatchSeverity.MODERATE)
+            for bitsets in (self.targeted, self.installed, self.failed):
+                bitsets.append(0)
+            for counts in (self.targeted_count, self.installed_count, self.failed_count):
+                counts.append(0)
+        elif severity is not None:
+            self.severities[number] = severity
+        return number
+
+    def mask(self, hosts: Iterable[str]) -> int:
+        host_ids = [self.host(name) for name in hosts]
+        if not host_ids:
+            return 0
+        # Set bits in a buffer and convert once: OR-ing 1 << id per host would
+        # copy the whole int for every host
+        data = bytearray(max(host_ids) // 8 + 1)
+        for host_id in host_ids:
+            data[host_id >> 3] |= 1 << (host_id & 7)
+        return int.from_bytes(data, "little")
+
+    def apply(self, number: int, succeeded: int = 0, failed: int = 0, rolled_back: int = 0, targeted: int = 0):
+        """OR whole-batch masks into one patch's bitsets, then recount it"""
+        self.targeted[number] |= targeted | succeeded | failed | rolled_back
+        self.installed[number] = (self.installed[number] | succeeded) & ~rolled_back
+        # A later success clears an earlier failure on the same host
+        self.failed[number] = (self.failed[number] | failed) & ~succeeded
+        self.targeted_count[number] = self.targeted[number].bit_count()
+        self.installed_count[number] = (self.installed[number] & self.targeted[number]).bit_count()
+        self.failed_count[number] = self.failed[number].bit_count()
+
+    def record(self, patch_id: str, severity: Optional[PatchSeverity], results: Iterable[HostResult]):
+        masks = {status: [] for status in TargetStatus}
+        for host, status in results:
+            masks[status].append(host)
+        self.apply(
+            self.patch(patch_id, severity),
+            succeeded=self.mask(masks[TargetStatus.SUCCEEDED]),
+            failed=self.mask(masks[TargetStatus.FAILED]),
+            rolled_back=self.mask(masks[TargetStatus.ROLLED_BACK]),
+            targeted=self.mask(masks[TargetStatus.PENDING]),
+        )
+
+
+class ComplianceIndex:
+    """In-memory fleet patch compliance: which hosts have, lack or failed which patches.
+
+    Rebuilt from the patches and deployment tables at startup (and every
+    ``refresh_interval`` seconds, to pick up rollouts run by other
+    processes), and updated incrementally as this process's rollouts flush
+    host results. A patch is installed on a host when its latest
+    deployment there succeeded and was not rolled back; COMPLETED patches
+    with no deployment history count as installed on all their targets.
+    """
+
+    def __init__(self):
+        self._state = _Bitsets()
+        self._rebuilding = False
+        self._replay: List[Tuple[str, Optional[PatchSeverity], List[HostResult]]] = []
+        self._missing_cache: Dict[Any, Tuple[int, int]] = {}
+        self._version = 0
+        self._task: Optional[asyncio.Task] = None
+        self.ready = False
+
+    async def start(self, refresh_interval: float = 0.0):
+        await self.rebuild()
+        if refresh_interval > 0:
+            self._task = asyncio.create_task(self._refresh(refresh_interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresh(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.rebuild()
+            except Exception as e:
+                print(f"Compliance index refresh failed: {e}")
+
+    @timed("compliance_index.rebuild")
+    async def rebuild(self):
+        """Load a fresh index from the database, then swap it in"""
+        self._rebuilding = True
+        try:
+            state = _Bitsets()
+            completed: List[Tuple[int, int]] = []
+            async with SessionLocal() as session:
+                patches = await session.stream(
+                    select(Patch.patch_id, Patch.severity, Patch.status, Patch.target_systems)
+                    .execution_options(yield_per=REBUILD_BATCH_SIZE)
+                )
+                async for patch_id, severity, status, target_systems in patches:
+                    number = state.patch(patch_id, severity)
+                    hosts = [host for host in target_systems or () if isinstance(host, str)]
+                    targeted = state.mask(hosts)
+                    state.apply(number, targeted=targeted)
+                    if status == PatchStatus.COMPLETED:
+                        completed.append((number, targeted))
+
+                # Replay host results deployment by deployment, oldest first
+                deployed: Set[int] = set()
+                results = await session.stream(
+                    select(Patch.patch_id, Patch.severity, PatchDeploymentTarget.host, PatchDeploymentTarget.status)
+                    .join(PatchDeployment, PatchDeployment.id == PatchDeploymentTarget.deployment_id)
+                    .join(Patch, Patch.id == PatchDeployment.patch_id)
+                    .where(PatchDeploymentTarget.status != TargetStatus.PENDING)
+                    .order_by(PatchDeploymentTarget.deployment_id, PatchDeploymentTarget.id)
+                    .execution_options(yield_per=REBUILD_BATCH_SIZE)
+                )
+                async for partition in results.partitions():
+                    by_patch: Dict[Tuple[str, PatchSeverity], List[HostResult]] = {}
+                    for patch_id, severity, host, status in partition:
+                        by_patch.setdefault((patch_id, severity), []).append((host, status))
+                    for (patch_id, severity), batch in by_patch.items():
+                        state.record(patch_id, severity, batch)
+                        deployed.add(state.patch_ids[patch_id])
+
+            for number, targeted in completed:
+                if number not in deployed:
+                    state.apply(number, succeeded=targeted)
+
+            for patch_id, severity, batch in self._replay:
+                state.record(patch_id, severity, batch)
+            self._state = state
+            self._missing_cache.clear()
+            self.ready = True
+        finally:
+            self._rebuilding = False
+            self._replay = []
+
+    def record(self, patch_id: str, severity: Optional[PatchSeverity], results: List[HostResult]):
+        """Apply a batch of host results for one patch (called after they commit)"""
+        if not results:
+            return
+        if self._rebuilding:
+            # Also applied to the index being built, so the swap cannot lose it
+            self._replay.append((patch_id, severity, results))
+        self._state.record(patch_id, severity, results)
+        self._version += 1
+
+    def _selected(self, severity: Optional[PatchSeverity]) -> List[int]:
+        state = self._state
+        return [
+            number for number in range(len(state.patches))
+            if (severity is None or state.severities[number] == severity)
+            and state.installed_count[number] < state.targeted_count[number]
+        ]
+
+    def _missing_bits(self, severity: Optional[PatchSeverity]) -> int:
+        """Hosts targeted by, but lacking, any patch of ``severity``; cached until the next change"""
+        cached = self._missing_cache.get(severity)
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        state = self._state
+        bits = 0
+        for number in self._selected(severity):
+            bits |= state.targeted[number] & ~state.installed[number]
+        self._missing_cache[severity] = (self._version, bits)
+        return bits
+
+    def hosts_missing(self, severity: Optional[PatchSeverity] = None, limit: int = 100) -> Dict[str, Any]:
+        bits = self._missing_bits(severity)
+        return {
+            "severity": severity.value if severity else None,
+            "host_count": bits.bit_count(),
+            "hosts": [self._state.hosts[host_id] for host_id in _iter_bits(bits, limit)],
+        }
+
+    def patches_missing(self, host: str, severity: Optional[PatchSeverity] = None) -> Optional[Dict[str, Any]]:
+        """Patches targeting ``host`` that it lacks; None for an unknown host"""
+        state = self._state
+        host_id = state.host_ids.get(host)
+        if host_id is None:
+            return None
+        missing = []
+        failed = []
+        for number in self._selected(severity):
+            if (state.targeted[number] >> host_id) & 1 and not (state.installed[number] >> host_id) & 1:
+                missing.append(state.patches[number])
+                if (state.failed[number] >> host_id) & 1:
+                    failed.append(state.patches[number])
+        return {"host": host, "missing": missing, "failed": failed}
+
+    def patch_compliance(self, patch_id: str) -> Optional[Dict[str, Any]]:
+        state = self._state
+        number = state.patch_ids.get(patch_id)
+        if number is None:
+            return None
+        targeted = state.targeted_count[number]
+        installed = state.installed_count[number]
+        return {
+            "patch_id": patch_id,
+            "severity": state.severities[number].value,
+            "targeted": targeted,
+            "installed": installed,
+            "failed": state.failed_count[number],
+            "target_compliance": round(installed / targeted * 100, 2) if targeted else 100.0,
+            "fleet_coverage": round(installed / len(state.hosts) * 100, 2) if state.hosts else 0.0,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Compliance percentage per severity: installed over targeted (patch, host) pairs"""
+        state = self._state
+        totals = {severity: [0, 0, 0, 0, 0] for severity in PatchSeverity}
+        for number, severity in enumerate(state.severities):
+            total = totals[severity]
+            total[0] += 1
+            total[1] += state.targeted_count[number]
+            total[2] += state.installed_count[number]
+            total[3] += state.failed_count[number]
+            total[4] += state.installed_count[number] == state.targeted_count[number]
+        bitset_bytes = sum(
+            sys.getsizeof(bits) for bitsets in (state.targeted, state.installed, state.failed) for bits in bitsets
+        )
+        return {
+            "ready": self.ready,
+            "hosts": len(state.hosts),
+            "patches": len(state.patches),
+            "bitset_bytes": bitset_bytes,
+            "severities": {
+                severity.value: {
+                    "patches": patches,
+                    "fully_compliant_patches": compliant_patches,
+                    "targeted": targeted,
+                    "installed": installed,
+                    "failed": failed,
+                    "compliance": round(installed / targeted * 100, 2) if targeted else 100.0,
+                }
+                for severity, (patches, targeted, installed, failed, compliant_patches) in totals.items()
+            },
+        }
+
+
+compliance_index = ComplianceIndex()
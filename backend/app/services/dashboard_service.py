@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.patch import Patch, PatchStatus
+from app.services.alert_service import AlertService
+from app.services.rollup_service import (
+    RollupService,
+    ALERTS_AUTO_RESOLVED,
+    ALERTS_CREATED,
+    ALERTS_RESOLVED,
+    PATCHES_COMPLETED,
+    as_utc,
+    bucket_start,
+)
+
+# Dashboard patch categories: (label, statuses, color)
+PATCH_STATUS_GROUPS = [
+    ("Deployed", (PatchStatus.COMPLETED,), "#10B981"),
+    ("Pending", (PatchStatus.PENDING, PatchStatus.IN_PROGRESS), "#F59E0B"),
+    ("Failed", (PatchStatus.FAILED, PatchStatus.ROLLED_BACK), "#EF4444"),
+    ("Scheduled", (PatchStatus.SCHEDULED,), "#3B82F6"),
+]
+
+
+def humanize_age(value: datetime, now: datetime) -> str:
+    seconds = max(int((now - as_utc(value)).total_seconds()), 0)
+    for unit, size in (("day", 86400), ("hour", 3600), ("minute", 60)):
+        if seconds >= size:
+            amount = seconds // size
+            return f"{amount} {unit}{'s' if amount != 1 else ''} ago"
+    return "just now"
+
+
+class DashboardService:
+    """Dashboard figures read from rollups, so cost is O(buckets) not O(rows)"""
+
+    def __init__(self, db: AsyncSession, window_days: int = 30, chart_days: int = 7):
+        self.db = db
+        self.window_days = window_days
+        self.chart_days = chart_days
+
+    async def get_summary(self) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc)
+        window_start = now - timedelta(days=self.window_days)
+        rollups = RollupService(self.db)
+        alert_analytics = await AlertService(self.db).get_analytics_summary()
+
+        resolved, resolution_seconds = await rollups.totals(ALERTS_RESOLVED, "day", window_start)
+        auto_resolved, _ = await rollups.totals(ALERTS_AUTO_RESOLVED, "day", window_start)
+        patches_deployed, _ = await rollups.totals(PATCHES_COMPLETED, "day", window_start)
+
+        return {
+            "activeAlerts": alert_analytics.get("total_alerts", 0),
+            "cacheAgeSeconds": alert_analytics.get("cache_age_seconds", 0),
+            "patchesDeployed": patches_deployed,
+            "automationRate": round(100 * auto_resolved / resolved) if resolved else 0,
+            "mttr": round(resolution_seconds / resolved / 3600, 1) if resolved else 0,
+            "alertsChart": await self._alerts_chart(rollups, now),
+            "patchStatus": await self._patch_status(),
+            "recentAlerts": await self._recent_alerts(now),
+        }
+
+    async def _alerts_chart(self, rollups: RollupService, now: datetime) -> List[Dict[str, Any]]:
+        first_day = bucket_start(now, "day") - timedelta(days=self.chart_days - 1)
+        counts = await rollups.series(ALERTS_CREATED, "day", first_day)
+        days = [first_day + timedelta(days=offset) for offset in range(self.chart_days)]
+        return [{"name": day.strftime("%a"), "alerts": counts.get(day, (0, 0.0))[0]} for day in days]
+
+    async def _patch_status(self) -> List[Dict[str, Any]]:
+        result = await self.db.execute(select(Patch.status, func.count(Patch.id)).group_by(Patch.status))
+        counts = dict(result.all())
+        return [
+            {"name": label, "value": sum(counts.get(status, 0) for status in statuses), "color": color}
+            for label, statuses, color in PATCH_STATUS_GROUPS
+        ]
+
+    async def _recent_alerts(self, now: datetime, limit: int = 5) -> List[Dict[str, Any]]:
+        alerts = await AlertService(self.db).get_alerts(limit=limit)
+        return [
+            {
+                "id": alert.id,
+                "title": alert.title,
+                "severity": alert.severity.value if alert.severity else None,
+                "status": alert.status.value if alert.status else None,
+                "timestamp": humanize_age(alert.created_at, now),
+                "source": alert.source_system,
+            }
+            for alert in alerts
+        ]
@@ -0,0 +1,324 @@
+from collections import OrderedDict, defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import re
+import time
+
+from sqlalchemy import select, insert, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import cache_counters
+from app.core.database import redis_client
+from app.core.text import normalize_text
+from app.models.alert import Alert, AlertCluster, OPEN_ALERT_STATUSES
+from app.schemas.alert import AlertCreate
+from app.services.event_stream import ALERT_UPDATED, publish_alert_events
+
+_TOKEN = re.compile(r"[a-z0-9<>#_]+")
+
+
+def alert_fingerprint(source_system: Optional[str], source_id: Optional[str], title: str) -> str:
+    """Identity of "the same problem firing again" used for deduplication"""
+    material = "\x1f".join([
+        normalize_text(source_system),
+        normalize_text(source_id),
+        normalize_text(title, strip_numbers=settings.ALERT_DEDUP_NORMALIZE_NUMBERS),
+    ])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class DedupIndex:
+    """Fingerprint -> open alert id, in a bounded local LRU with a Redis hash behind it.
+
+    Entries are hints only: the caller re-checks the row is still open, and
+    the partial unique index on ``alerts.fingerprint`` is the source of truth.
+    """
+
+    redis_key = "alerts:dedup"
+
+    def __init__(self, redis=None, max_entries: int = 100000):
+        self.redis = redis
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._lookups = cache_counters("dedup_index", "local_hit", "redis_hit", "miss")
+
+    async def get(self, fingerprint: str) -> Optional[int]:
+        alert_id = self._entries.get(fingerprint)
+        if alert_id is not None:
+            self._entries.move_to_end(fingerprint)
+            self._lookups["local_hit"].inc()
+            return alert_id
+        raw = None
+        if self.redis is not None:
+            try:
+                raw = await self.redis.hget(self.redis_key, fingerprint)
+            except Exception:
+                raw = None
+        if raw is None:
+            self._lookups["miss"].inc()
+            return None
+        self._lookups["redis_hit"].inc()
+        self._remember(fingerprint, int(raw))
+        return int(raw)
+
+    async def set(self, fingerprint: str, alert_id: int):
+        self._remember(fingerprint, alert_id)
+        if self.redis is not None:
+            try:
+                await self.redis.hset(self.redis_key, fingerprint, alert_id)
+            except Exception:
+                pass
+
+    async def discard(self, fingerprint: str):
+        self._entries.pop(fingerprint, None)
+        if self.redis is not None:
+            try:
+                await self.redis.hdel(self.redis_key, fingerprint)
+            except Exception:
+                pass
+
+    async def discard_many(self, fingerprints: Iterable[str]):
+        """Drop entries for alerts that closed, in one HDEL"""
+        fingerprints = list(fingerprints)
+        if not fingerprints:
+            return
+        for fingerprint in fingerprints:
+            self._entries.pop(fingerprint, None)
+        if self.redis is not None:
+            try:
+                await self.redis.hdel(self.redis_key, *fingerprints)
+            except Exception:
+                pass
+
+    def _remember(self, fingerprint: str, alert_id: int):
+        self._entries[fingerprint] = alert_id
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CorrelationIndex:
+    """MinHash/LSH index of recent alerts for near-duplicate clustering.
+
+    Each alert's title and description are shingled into word bigrams and
+    reduced to a ``num_perm`` MinHash signature split into ``bands``. Alerts
+    sharing a band bucket are candidates; the best candidate whose estimated
+    Jaccard similarity reaches ``threshold`` lends its cluster. Entries older
+    than ``window_seconds`` are ignored and swept lazily, and each bucket
+    keeps only its newest ``bucket_size`` entries so a storm of look-alike
+    alerts cannot make lookups linear. The index is per process and is
+    rebuilt from recent rows by ``warm`` on startup.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.5,
+        window_seconds: int = 1800,
+        bucket_size: int = 64,
+    ):
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Deque[Tuple[float, int, Tuple[int, ...]]]] = defaultdict(
+            lambda: deque(maxlen=bucket_size)
+        )
+        self._inserts = 0
+
+        # XOR with fixed random masks stands in for independent hash functions
+        self._masks = [
+            int.from_bytes(hashlib.blake2b(b"opsgenieX-minhash" + i.to_bytes(2, "big"), digest_size=8).digest(), "big")
+            for i in range(num_perm)
+        ]
+
+    def signature(self, title: str, description: Optional[str]) -> Tuple[int, ...]:
+        tokens = _TOKEN.findall(normalize_text(f"{title} {description or ''}", strip_numbers=True))
+        shingles = {" ".join(tokens[i:i + 2]) for i in range(max(len(tokens) - 1, 1))}
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+            for shingle in shingles
+        ]
+        return tuple(min(h ^ mask for h in hashes) for mask in self._masks)
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def find_cluster(self, signature: Tuple[int, ...], now: Optional[float] = None) -> Optional[int]:
+        now = now or time.time()
+        cutoff = now - self.window_seconds
+        best_cluster, best_score = None, self.threshold
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if not bucket:
+                continue
+            while bucket and bucket[0][0] < cutoff:
+                bucket.popleft()
+            for _, cluster_id, other in bucket:
+                score = sum(1 for x, y in zip(signature, other) if x == y) / self.num_perm
+                if score >= best_score:
+                    best_cluster, best_score = cluster_id, score
+        return best_cluster
+
+    def add(self, signature: Tuple[int, ...], cluster_id: int, seen_at: Optional[float] = None):
+        seen_at = seen_at or time.time()
+        for key in self._band_keys(signature):
+            self._buckets[key].append((seen_at, cluster_id, signature))
+        self._inserts += 1
+        if self._inserts % 1000 == 0:
+            self._sweep(seen_at - self.window_seconds)
+
+    def _sweep(self, cutoff: float):
+        for key in list(self._buckets):
+            bucket = self._buckets[key]
+            while bucket and bucket[0][0] < cutoff:
+                bucket.popleft()
+            if not bucket:
+                del self._buckets[key]
+
+    def warm(self, alerts: List[Alert]):
+        """Rebuild from recent clustered alerts, oldest first"""
+        for alert in alerts:
+            if alert.cluster_id is not None and alert.created_at is not None:
+                self.add(
+                    self.signature(alert.title, alert.description),
+                    alert.cluster_id,
+                    alert.created_at.timestamp(),
+                )
+
+
+dedup_index = DedupIndex(redis=redis_client, max_entries=settings.ALERT_DEDUP_INDEX_SIZE)
+correlation_index = CorrelationIndex(
+    threshold=settings.ALERT_CORRELATION_THRESHOLD,
+    window_seconds=settings.ALERT_CORRELATION_WINDOW_MINUTES * 60,
+)
+
+
+class DedupService:
+    """Ingest-time deduplication and correlation for alerts"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record_duplicate(self, alert_data: AlertCreate, occurrences: int = 1) -> Optional[Alert]:
+        """Count a repeat against the open alert with the same fingerprint.
+
+        Returns the updated alert, or None when no open alert matches and a
+        new row should be inserted.
+        """
+        fingerprint = alert_fingerprint(alert_data.source_system, alert_data.source_id, alert_data.title)
+        alert_id = await dedup_index.get(fingerprint)
+        if alert_id is None:
+            return None
+
+        alert = await self._increment(Alert.id == alert_id, fingerprint, occurrences)
+        if alert is None:
+            # Resolved or closed since it was indexed
+            await dedup_index.discard(fingerprint)
+        return alert
+
+    async def record_duplicate_by_fingerprint(self, alert_data: AlertCreate, occurrences: int = 1) -> Optional[Alert]:
+        """Index-independent variant used after losing an insert race"""
+        fingerprint = alert_fingerprint(alert_data.source_system, alert_data.source_id, alert_data.title)
+        alert = await self._increment(Alert.fingerprint == fingerprint, fingerprint, occurrences)
+        if alert is not None:
+            await dedup_index.set(fingerprint, alert.id)
+        return alert
+
+    async def _increment(self, condition, fingerprint: str, occurrences: int) -> Optional[Alert]:
+        result = await self.db.scalars(
+            update(Alert)
+            .where(
+                condition,
+                Alert.fingerprint == fingerprint,
+                Alert.status.in_(OPEN_ALERT_STATUSES),
+            )
+            .values(
+                occurrence_count=Alert.occurrence_count + occurrences,
+                last_seen_at=func.now(),
+            )
+            .returning(Alert)
+            .execution_options(synchronize_session=False)
+        )
+        alert = result.one_or_none()
+        await self.db.commit()
+        if alert is not None:
+            # Status and severity are unchanged, so the counter delta is empty
+            await publish_alert_events(ALERT_UPDATED, [alert], (alert.status, alert.severity))
+        return alert
+
+    async def assign_cluster(self, alert_data: AlertCreate) -> Tuple[int, Tuple[int, ...]]:
+        """Find or create the correlation cluster for a new alert.
+
+        The cluster change is flushed but not committed, so it lands in the
+        same transaction as the alert insert that follows.
+        """
+        signature = correlation_index.signature(alert_data.title, alert_data.description)
+        cluster_id = correlation_index.find_cluster(signature)
+
+        if cluster_id is not None:
+            await self.db.execute(
+                update(AlertCluster)
+                .where(AlertCluster.id == cluster_id)
+                .values(alert_count=AlertCluster.alert_count + 1, last_seen_at=func.now())
+            )
+        else:
+            cluster_id = await self.db.scalar(
+                insert(AlertCluster).values(title=alert_data.title[:255]).returning(AlertCluster.id)
+            )
+        return cluster_id, signature
+
+    async def release_cluster(self, cluster_id: Optional[int]):
+        """Undo an assign_cluster whose alert was not inserted after all"""
+        if cluster_id is None:
+            return
+        await self.db.execute(
+            update(AlertCluster)
+            .where(AlertCluster.id == cluster_id, AlertCluster.alert_count > 0)
+            .values(alert_count=AlertCluster.alert_count - 1)
+        )
+        await self.db.commit()
+
+    async def remember(self, alert: Alert, signature: Tuple[int, ...]):
+        """Index a newly inserted alert for future dedup and correlation"""
+        await dedup_index.set(alert.fingerprint, alert.id)
+        if alert.cluster_id is not None:
+            correlation_index.add(signature, alert.cluster_id)
+
+    async def get_clusters(self, limit: int = 100, min_alerts: int = 1) -> List[AlertCluster]:
+        """Most recently active correlation clusters"""
+        result = await self.db.execute(
+            select(AlertCluster)
+            .where(AlertCluster.alert_count >= min_alerts)
+            .order_by(AlertCluster.last_seen_at.desc())
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def get_cluster(self, cluster_id: int) -> Optional[AlertCluster]:
+        result = await self.db.execute(select(AlertCluster).where(AlertCluster.id == cluster_id))
+        return result.scalar_one_or_none()
+
+    async def get_cluster_alerts(self, cluster_id: int, limit: int = 100) -> List[Alert]:
+        result = await self.db.execute(
+            select(Alert)
+            .where(Alert.cluster_id == cluster_id)
+            .order_by(Alert.created_at.desc())
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def get_recent_clustered_alerts(self) -> List[Alert]:
+        """Alerts inside the correlation window, used to warm the index"""
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=settings.ALERT_CORRELATION_WINDOW_MINUTES)
+        result = await self.db.execute(
+            select(Alert)
+            .where(Alert.cluster_id.is_not(None), Alert.created_at >= cutoff)
+            .order_by(Alert.created_at)
+        )
+        return result.scalars().all()
@@ -0,0 +1,311 @@
+import asyncio
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import SessionLocal, redis_client
+from app.services.ai_service import AIService
+from app.services.alert_service import AlertService
+from app.services.ml_service import MLService
+from app.services.workflow_engine import workflow_engine
+
+
+class EnrichmentQueueFull(Exception):
+    """Raised when the enrichment backlog is at ENRICHMENT_QUEUE_MAX_SIZE"""
+
+
+def build_job(alert) -> Dict[str, Any]:
+    """Serializable description of the classification work for an alert"""
+    return {
+        "alert_id": alert.id,
+        "title": alert.title,
+        "description": alert.description,
+        "source_system": alert.source_system,
+        "enqueued_at": time.time(),
+    }
+
+
+async def predict_severities(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """ML severity for many alerts in one model pass, off the event loop"""
+    return await asyncio.to_thread(MLService().predict_batch, items)
+
+
+async def enrich_alert(job: Dict[str, Any]) -> bool:
+    """Classify a persisted alert and write the results back to its row"""
+    return (await enrich_alerts([job]))[0]
+
+
+async def enrich_alerts(jobs: List[Dict[str, Any]]) -> List[bool]:
+    """Classify several persisted alerts, sharing one ML prediction pass"""
+    ai_service = AIService()
+    ai_analyses = await asyncio.gather(
+        *(ai_service.analyze_alert(job["title"], job["description"]) for job in jobs)
+    )
+    ml_predictions = await predict_severities(
+        [
+            {"title": job["title"], "description": job["description"] or "", "source_system": job["source_system"]}
+            for job in jobs
+        ]
+    )
+
+    async with SessionLocal() as session:
+        alert_service = AlertService(session)
+        results = [
+            await alert_service.apply_enrichment(job["alert_id"], ai_analysis, ml_prediction)
+            for job, ai_analysis, ml_prediction in zip(jobs, ai_analyses, ml_predictions)
+        ]
+    await trigger_workflows(
+        (job["alert_id"], ai_analysis.get("classification"))
+        for job, ai_analysis, succeeded in zip(jobs, ai_analyses, results)
+        if succeeded
+    )
+    return results
+
+
+async def trigger_workflows(alerts: Iterable[Tuple[int, Optional[str]]]):
+    """Start workflows triggered by newly classified alerts, without failing ingestion"""
+    try:
+        await workflow_engine.trigger_for_alerts(alerts)
+    except Exception as e:
+        print(f"Workflow trigger failed: {e}")
+
+
+class EnrichmentStats:
+    """Counters shared by the enrichment backends"""
+
+    def __init__(self):
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    def record(self, job: Dict[str, Any], succeeded: bool):
+        lag = time.time() - job["enqueued_at"]
+        if succeeded:
+            self.processed += 1
+        else:
+            self.failed += 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.total_lag += lag
+
+    def as_dict(self) -> Dict[str, Any]:
+        completed = self.processed + self.failed
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "lag_seconds": {
+                "last": round(self.last_lag, 4),
+                "max": round(self.max_lag, 4),
+                "mean": round(self.total_lag / completed, 4) if completed else 0.0,
+            },
+        }
+
+
+class AsyncioEnrichmentBackend:
+    """In-process queue drained by a fixed pool of asyncio workers.
+
+    Suitable for single-node deployments and tests; jobs still queued when
+    the process stops are released to the pending sweep of another process.
+    """
+
+    name = "asyncio"
+
+    def __init__(self, max_size: int, workers: int, batch_size: int = 1):
+        self.max_size = max_size
+        self.workers = workers
+        self.batch_size = max(batch_size, 1)
+        self.stats = EnrichmentStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._in_flight = 0
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        unqueued = []
+        while self._queue is not None and not self._queue.empty():
+            unqueued.append(self._queue.get_nowait()["alert_id"])
+        try:
+            async with SessionLocal() as session:
+                await AlertService(session).release_pending_enrichment(unqueued)
+        except Exception as e:
+            print(f"Releasing queued enrichment jobs failed: {e}")
+
+    async def is_full(self) -> bool:
+        return self._queue.full()
+
+    async def submit(self, job: Dict[str, Any]):
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats.rejected += 1
+            raise EnrichmentQueueFull("Enrichment queue is full")
+
+    async def _worker(self):
+        while True:
+            # Take whatever else is already waiting so ML runs once per batch
+            jobs = [await self._queue.get()]
+            while len(jobs) < self.batch_size and not self._queue.empty():
+                jobs.append(self._queue.get_nowait())
+            self._in_flight += len(jobs)
+            try:
+                results = await enrich_alerts(jobs)
+            except Exception as e:
+                print(f"Alert enrichment failed for alerts {[job['alert_id'] for job in jobs]}: {e}")
+                results = [False] * len(jobs)
+            finally:
+                self._in_flight -= len(jobs)
+                for _ in jobs:
+                    self._queue.task_done()
+            for job, succeeded in zip(jobs, results):
+                self.stats.record(job, succeeded)
+
+    async def metrics(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_max_size": self.max_size,
+            "in_flight": self._in_flight,
+            "workers": self.workers,
+            **self.stats.as_dict(),
+        }
+
+
+class CeleryEnrichmentBackend:
+    """Dispatches enrichment to Celery workers through the Redis broker.
+
+    Queue depth is the length of the broker list; worker-side counters are
+    kept in a Redis hash so every API process reports the same numbers.
+    """
+
+    name = "celery"
+    metrics_key = "enrichment:metrics"
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.rejected = 0
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def _depth(self) -> int:
+        return await redis_client.llen(settings.ENRICHMENT_CELERY_QUEUE)
+
+    async def is_full(self) -> bool:
+        return await self._depth() >= self.max_size
+
+    async def submit(self, job: Dict[str, Any]):
+        # Imported here: the task module imports this one
+        from app.tasks.enrichment import enrich_alert_task
+
+        if await self.is_full():
+            self.rejected += 1
+            raise EnrichmentQueueFull("Enrichment queue is full")
+        await asyncio.to_thread(
+            enrich_alert_task.apply_async,
+            args=[job],
+            queue=settings.ENRICHMENT_CELERY_QUEUE,
+        )
+
+    async def metrics(self) -> Dict[str, Any]:
+        raw = await redis_client.hgetall(self.metrics_key)
+        counters = {key.decode(): float(value) for key, value in raw.items()}
+        completed = counters.get("processed", 0) + counters.get("failed", 0)
+        return {
+            "backend": self.name,
+            "queue_depth": await self._depth(),
+            "queue_max_size": self.max_size,
+            "processed": int(counters.get("processed", 0)),
+            "failed": int(counters.get("failed", 0)),
+            "rejected": self.rejected,
+            "lag_seconds": {
+                "last": round(counters.get("last_lag", 0.0), 4),
+                "max": round(counters.get("max_lag", 0.0), 4),
+                "mean": round(counters.get("total_lag", 0.0) / completed, 4) if completed else 0.0,
+            },
+        }
+
+
+def _create_backend():
+    if settings.ALERT_ENRICHMENT_MODE == "asyncio":
+        return AsyncioEnrichmentBackend(
+            max_size=settings.ENRICHMENT_QUEUE_MAX_SIZE,
+            workers=settings.ENRICHMENT_WORKERS,
+            batch_size=settings.ENRICHMENT_BATCH_SIZE,
+        )
+    if settings.ALERT_ENRICHMENT_MODE == "celery":
+        return CeleryEnrichmentBackend(max_size=settings.ENRICHMENT_QUEUE_MAX_SIZE)
+    return None
+
+
+enrichment_backend = _create_backend()
+
+
+async def requeue_pending(page_size: int = 1000) -> int:
+    """Queue pending alerts that no process has queued within the lease.
+
+    That covers alerts rejected by a full backlog after they were stored and
+    alerts queued by a process that exited before enriching them. Alerts
+    are claimed page by page with a lease, so concurrent sweeps in several
+    processes never queue the same alert twice.
+    """
+    if enrichment_backend is None:
+        return 0
+
+    submitted = 0
+    while not await enrichment_backend.is_full():
+        async with SessionLocal() as session:
+            alert_service = AlertService(session)
+            claimed = await alert_service.claim_pending_enrichment(page_size, settings.ENRICHMENT_LEASE_SECONDS)
+            for position, alert in enumerate(claimed):
+                try:
+                    await enrichment_backend.submit(build_job(alert))
+                except EnrichmentQueueFull:
+                    await alert_service.release_pending_enrichment([unqueued.id for unqueued in claimed[position:]])
+                    return submitted
+                submitted += 1
+        if len(claimed) < page_size:
+            break
+    return submitted
+
+
+class PendingEnrichmentSweeper:
+    """Runs ``requeue_pending`` at startup and then every ``interval`` seconds"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, interval: float):
+        await requeue_pending()
+        if interval > 0:
+            self._task = asyncio.create_task(self._sweep(interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _sweep(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await requeue_pending()
+            except Exception as e:
+                print(f"Pending enrichment sweep failed: {e}")
+
+
+pending_sweeper = PendingEnrichmentSweeper()
@@ -0,0 +1,216 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.database import redis_client
+from app.models.alert import Alert
+from app.schemas.alert import AlertResponse
+
+ALERT_CREATED = "alert.created"
+ALERT_UPDATED = "alert.updated"
+ALERT_RESOLVED = "alert.resolved"
+
+# Sent to a subscriber that fell too far behind, or resumed from an event
+# already trimmed from the stream; it should reload and reconnect
+STREAM_RESET = "stream.reset"
+
+
+def _event_key(event_id: str) -> Tuple[int, int]:
+    millis, _, sequence = event_id.partition("-")
+    return int(millis), int(sequence or 0)
+
+
+def _entry_id(raw_id) -> str:
+    return raw_id.decode() if isinstance(raw_id, bytes) else raw_id
+
+
+def build_alert_event(event_type: str, alert: Alert, previous: Optional[Tuple[Any, Any]] = None) -> Dict[str, Any]:
+    """Alert snapshot plus the dashboard counter delta the change implies"""
+    status = alert.status.value if alert.status else None
+    severity = alert.severity.value if alert.severity else None
+    delta: Dict[str, Any] = {"total": 0, "status": {}, "severity": {}}
+
+    if previous is None:
+        delta["total"] = 1
+        delta["status"][status] = 1
+        delta["severity"][severity] = 1
+    else:
+        old_status = previous[0].value if previous[0] else None
+        old_severity = previous[1].value if previous[1] else None
+        if old_status != status:
+            delta["status"] = {old_status: -1, status: 1}
+        if old_severity != severity:
+            delta["severity"] = {old_severity: -1, severity: 1}
+
+    return {
+        "type": event_type,
+        "alert": AlertResponse.model_validate(alert).model_dump(mode="json"),
+        "previous": None if previous is None else {
+            "status": previous[0].value if previous[0] else None,
+            "severity": previous[1].value if previous[1] else None,
+        },
+        "delta": delta,
+    }
+
+
+class Subscription:
+    def __init__(self, severities: Set[str], statuses: Set[str], max_pending: int):
+        self.severities = severities
+        self.statuses = statuses
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.overflowed = False
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        alert = event.get("alert")
+        if alert is None:
+            return True
+        previous = event.get("previous") or {}
+        if self.severities and not {alert["severity"], previous.get("severity")} & self.severities:
+            return False
+        # Match on the old status too, so "status=open" viewers see alerts leave
+        if self.statuses and not {alert["status"], previous.get("status")} & self.statuses:
+            return False
+        return True
+
+    def offer(self, event_id: str, event: Dict[str, Any]):
+        if self.overflowed or not self.matches(event):
+            return
+        try:
+            self.queue.put_nowait((event_id, event))
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class EventBroker:
+    """Fans alert events out to every live-stream client across workers.
+
+    Events are appended to a capped Redis stream. Each process runs one
+    reader that tails the stream and copies events into per-client queues,
+    so Redis sees one blocking read per worker regardless of how many
+    consoles are open. The stream doubles as the replay log for clients
+    reconnecting with Last-Event-ID.
+    """
+
+    def __init__(self, redis, stream_key: str, max_length: int, max_pending: int):
+        self.redis = redis
+        self.stream_key = stream_key
+        self.max_length = max_length
+        self.max_pending = max_pending
+        self._subscribers: Set[Subscription] = set()
+        self._reader: Optional[asyncio.Task] = None
+
+    async def publish(self, events: Iterable[Dict[str, Any]]):
+        """Append events to the shared stream; failures never break the write path"""
+        events = list(events)
+        if not events:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for event in events:
+                pipe.xadd(
+                    self.stream_key,
+                    {"data": json.dumps(event)},
+                    maxlen=self.max_length,
+                    approximate=True,
+                )
+            await pipe.execute()
+        except Exception as e:
+            print(f"Failed to publish alert events: {e}")
+
+    async def start(self):
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def stop(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+
+    async def _read_loop(self):
+        last_id = "$"
+        while True:
+            try:
+                response = await self.redis.xread({self.stream_key: last_id}, block=5000, count=500)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Alert event reader error: {e}")
+                await asyncio.sleep(1)
+                continue
+            for _, entries in response or []:
+                for raw_id, fields in entries:
+                    last_id = _entry_id(raw_id)
+                    event = json.loads(fields[b"data"])
+                    for subscription in list(self._subscribers):
+                        subscription.offer(last_id, event)
+
+    async def _replay(self, after_id: str) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+        """Events after ``after_id``, or None when some of them were trimmed away.
+
+        Trimming drops the oldest entries first, so while ``after_id`` is
+        still in the stream everything after it is too.
+        """
+        entries = await self.redis.xrange(self.stream_key, min=after_id, max="+")
+        if entries and _event_key(_entry_id(entries[0][0])) == _event_key(after_id):
+            entries = entries[1:]
+        else:
+            oldest = await self.redis.xrange(self.stream_key, min="-", max="+", count=1)
+            if not oldest or _event_key(_entry_id(oldest[0][0])) > _event_key(after_id):
+                return None
+        return [(_entry_id(raw_id), json.loads(fields[b"data"])) for raw_id, fields in entries]
+
+    async def subscribe(
+        self,
+        severities: Set[str],
+        statuses: Set[str],
+        last_event_id: Optional[str] = None,
+    ) -> AsyncIterator[Optional[Tuple[str, Dict[str, Any]]]]:
+        """Yield (event_id, event) pairs, or None every heartbeat interval.
+
+        With ``last_event_id`` the events missed since then are replayed
+        first; live events already covered by the replay are skipped. If
+        the stream no longer reaches back that far, a reset is sent instead.
+        """
+        subscription = Subscription(severities, statuses, self.max_pending)
+        self._subscribers.add(subscription)
+        try:
+            replayed_up_to = None
+            if last_event_id:
+                replay = await self._replay(last_event_id)
+                if replay is None:
+                    yield None, {"type": STREAM_RESET}
+                    return
+                for event_id, event in replay:
+                    replayed_up_to = event_id
+                    if subscription.matches(event):
+                        yield event_id, event
+
+            while True:
+                if subscription.overflowed:
+                    yield None, {"type": STREAM_RESET}
+                    return
+                try:
+                    event_id, event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=settings.EVENT_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if replayed_up_to and _event_key(event_id) <= _event_key(replayed_up_to):
+                    continue
+                yield event_id, event
+        finally:
+            self._subscribers.discard(subscription)
+
+
+event_broker = EventBroker(
+    redis_client,
+    stream_key=settings.EVENT_STREAM_KEY,
+    max_length=settings.EVENT_STREAM_MAX_LENGTH,
+    max_pending=settings.EVENT_STREAM_CLIENT_BUFFER,
+)
+
+
+async def publish_alert_events(event_type: str, alerts: Iterable[Alert], previous: Optional[Tuple[Any, Any]] = None):
+    await event_broker.publish(build_alert_event(event_type, alert, previous) for alert in alerts)
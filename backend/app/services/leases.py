@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.lease import Lease
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class LeaseService:
+    """Named leases for background work only one process should run"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def acquire(self, name: str, owner: str, lease_seconds: float) -> bool:
+        """Take or renew the lease; False while another live process holds it"""
+        now = _now()
+        expires_at = now + timedelta(seconds=lease_seconds)
+        result = await self.db.execute(
+            update(Lease)
+            .where(Lease.name == name, or_(Lease.owner == owner, Lease.expires_at < now))
+            .values(owner=owner, expires_at=expires_at)
+            .returning(Lease.name)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
+            # Never taken before, or held by someone else: the primary key decides
+            try:
+                await self.db.execute(insert(Lease).values(name=name, owner=owner, expires_at=expires_at))
+            except IntegrityError:
+                await self.db.rollback()
+                return False
+        await self.db.commit()
+        return True
+
+    async def release(self, name: str, owner: str):
+        """Give the lease up so another process can take it at once"""
+        await self.db.execute(delete(Lease).where(Lease.name == name, Lease.owner == owner))
+        await self.db.commit()
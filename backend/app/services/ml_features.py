@@ -0,0 +1,48 @@
+from typing import Any, Dict, List
+
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import FeatureUnion, Pipeline, make_pipeline
+from sklearn.preprocessing import FunctionTransformer
+
+SEVERITIES = ["low", "medium", "high", "critical"]
+
+
+def alert_text(alerts: List[Dict[str, Any]]) -> List[str]:
+    """Title and description as one document per alert"""
+    return [f"{alert.get('title') or ''}\n{alert.get('description') or ''}" for alert in alerts]
+
+
+def alert_source(alerts: List[Dict[str, Any]]) -> List[str]:
+    """Source system as a single categorical token"""
+    return [f"source={(alert.get('source_system') or 'unknown').strip().lower()}" for alert in alerts]
+
+
+def build_feature_union(n_features: int) -> FeatureUnion:
+    """Stateless hashed features: word 1-2 grams, char 3-5 grams and source system.
+
+    Hashing keeps the feature space at a fixed width, so memory does not
+    grow with the vocabulary and nothing needs fitting before transform.
+    """
+    return FeatureUnion([
+        ("words", make_pipeline(
+            FunctionTransformer(alert_text),
+            HashingVectorizer(ngram_range=(1, 2), n_features=n_features, alternate_sign=False),
+        )),
+        ("chars", make_pipeline(
+            FunctionTransformer(alert_text),
+            HashingVectorizer(analyzer="char_wb", ngram_range=(3, 5), n_features=n_features, alternate_sign=False),
+        )),
+        ("source", make_pipeline(
+            FunctionTransformer(alert_source),
+            HashingVectorizer(token_pattern=r"\S+", lowercase=False, n_features=1024, norm=None, alternate_sign=False),
+        )),
+    ])
+
+
+def build_pipeline(n_features: int) -> Pipeline:
+    """Hashed features feeding a logistic-loss linear model over the severities"""
+    return Pipeline([
+        ("features", build_feature_union(n_features)),
+        ("classifier", SGDClassifier(loss="log_loss", alpha=1e-5, max_iter=20, tol=1e-3, random_state=42)),
+    ])
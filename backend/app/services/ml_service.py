@@ -1,42 +1,118 @@
-from typing import Dict, Any, Optional
-import joblib
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
+from typing import Dict, Any, List, Optional
+import threading
 import os
 
 from app.core.config import settings
+from app.core.metrics import timed
 
+# numpy, joblib and scikit-learn are imported on first use: they are optional
+# and slow to import, and most processes importing this module never predict
+
+SEVERITY_LABELS = {0: "low", 1: "medium", 2: "high", 3: "critical"}
+FALLBACK_PREDICTION = {"severity": "medium", "confidence": 0.5, "method": "fallback"}
+
+PIPELINE_FILE = "alert_pipeline.joblib"
+LEGACY_MODEL_FILE = "alert_classifier.joblib"
+LEGACY_SCALER_FILE = "scaler.joblib"
+
+
+class _ModelState:
+    """Model shared by every MLService in the process"""
 
-class MLService:
-    """Machine Learning service with multiple backend options"""
-    
     def __init__(self):
+        self.pipeline = None
+        # RandomForest + scaler artifacts written before the hashed pipeline existed
         self.model = None
         self.scaler = None
         self.is_trained = False
-        
-        if settings.LOCAL_ML_ENABLED:
-            self._init_local_ml()
-        elif settings.AZURE_ML_ENABLED:
-            self._init_azure_ml()
+        self.initialized = False
+        # st_mtime_ns of the pipeline artifact being served
+        self.artifact_mtime: Optional[int] = None
+        self.lock = threading.Lock()
+
+
+_state = _ModelState()
+
+
+class MLService:
+    """Machine Learning service with multiple backend options.
+    
+    Instances are cheap: the model is loaded once per process, on the first
+    prediction, and shared. Artifacts are memory-mapped so workers on one
+    host share the model's pages instead of each holding a copy.
+    """
+    
+    def load(self):
+        """Load the model on first use; later calls return immediately"""
+        if _state.initialized:
+            return
+        with _state.lock:
+            if _state.initialized:
+                return
+            if settings.LOCAL_ML_ENABLED:
+                self._init_local_ml()
+            elif settings.AZURE_ML_ENABLED:
+                self._init_azure_ml()
+            _state.initialized = True
+    
+    @property
+    def pipeline(self):
+        return _state.pipeline
+    
+    @pipeline.setter
+    def pipeline(self, value):
+        _state.pipeline = value
+    
+    @property
+    def model(self):
+        return _state.model
+    
+    @model.setter
+    def model(self, value):
+        _state.model = value
+    
+    @property
+    def scaler(self):
+        return _state.scaler
+    
+    @scaler.setter
+    def scaler(self, value):
+        _state.scaler = value
+    
+    @property
+    def is_trained(self) -> bool:
+        return _state.is_trained
+    
+    @is_trained.setter
+    def is_trained(self, value: bool):
+        _state.is_trained = value
     
     def _init_local_ml(self):
         """Initialize local ML models"""
         try:
-            model_path = os.path.join(settings.ML_MODEL_PATH, "alert_classifier.joblib")
-            scaler_path = os.path.join(settings.ML_MODEL_PATH, "scaler.joblib")
+            import joblib
+            
+            pipeline_path = os.path.join(settings.ML_MODEL_PATH, PIPELINE_FILE)
+            model_path = os.path.join(settings.ML_MODEL_PATH, LEGACY_MODEL_FILE)
+            scaler_path = os.path.join(settings.ML_MODEL_PATH, LEGACY_SCALER_FILE)
+            mmap_mode = "r" if settings.ML_MODEL_MMAP else None
             
-            if os.path.exists(model_path) and os.path.exists(scaler_path):
-                self.model = joblib.load(model_path)
-                self.scaler = joblib.load(scaler_path)
+            if os.path.exists(pipeline_path):
+                _state.artifact_mtime = os.stat(pipeline_path).st_mtime_ns
+                self.pipeline = joblib.load(pipeline_path, mmap_mode=mmap_mode)
+                self.is_trained = True
+            elif os.path.exists(model_path) and os.path.exists(scaler_path):
+                self.model = joblib.load(model_path, mmap_mode=mmap_mode)
+                self.scaler = joblib.load(scaler_path, mmap_mode=mmap_mode)
                 self.is_trained = True
             else:
-                # Create and train a basic model
-                self._create_basic_model()
+                # Never train on the serving path; predictions fall back until a model exists
+                print(
+                    f"No ML model in {settings.ML_MODEL_PATH}; "
+                    "train one with python -m app.commands.train_model"
+                )
         except Exception as e:
             print(f"Failed to initialize local ML: {e}")
-            self._create_basic_model()
     
     def _init_azure_ml(self):
         """Initialize Azure ML (optional)"""
@@ -49,65 +125,64 @@ class MLService:
             print(f"Failed to initialize Azure ML: {e}")
             self._init_local_ml()
     
-    def _create_basic_model(self):
-        """Create a basic trained model for demonstration"""
-        # Create a simple model with dummy training data
-        self.model = RandomForestClassifier(n_estimators=10, random_state=42)
-        self.scaler = StandardScaler()
-        
-        # Dummy training data (in production, this would come from historical alerts)
-        X_dummy = np.random.rand(100, 5)  # 5 features
-        y_dummy = np.random.randint(0, 4, 100)  # 4 severity classes
-        
-        X_scaled = self.scaler.fit_transform(X_dummy)
-        self.model.fit(X_scaled, y_dummy)
-        self.is_trained = True
-        
-        # Save the model
-        os.makedirs(settings.ML_MODEL_PATH, exist_ok=True)
-        joblib.dump(self.model, os.path.join(settings.ML_MODEL_PATH, "alert_classifier.joblib"))
-        joblib.dump(self.scaler, os.path.join(settings.ML_MODEL_PATH, "scaler.joblib"))
-    
+    @timed("ml.predict_alert_severity")
     def predict_alert_severity(self, alert_features: Dict[str, Any]) -> Dict[str, Any]:
         """Predict alert severity using ML model"""
+        return self.predict_batch([alert_features])[0]
+    
+    @timed("ml.predict_batch")
+    def predict_batch(self, alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Predict severities for many alerts with a single model pass"""
+        if not alerts:
+            return []
+        self.load()
         if not self.is_trained:
-            return {"severity": "medium", "confidence": 0.5, "method": "fallback"}
+            return [dict(FALLBACK_PREDICTION) for _ in alerts]
         
         try:
-            # Extract features from alert data
-            features = self._extract_features(alert_features)
-            features_scaled = self.scaler.transform([features])
+            import numpy as np
             
-            # Make prediction
-            prediction = self.model.predict(features_scaled)[0]
-            probabilities = self.model.predict_proba(features_scaled)[0]
-            confidence = max(probabilities)
+            pipeline = self.pipeline
+            if pipeline is not None:
+                probabilities = pipeline.predict_proba(alerts)
+                classes = [str(label) for label in pipeline.classes_]
+            else:
+                probabilities = self.model.predict_proba(self.scaler.transform(self._extract_feature_matrix(alerts)))
+                classes = [SEVERITY_LABELS.get(int(label), "medium") for label in self.model.classes_]
             
-            severity_map = {0: "low", 1: "medium", 2: "high", 3: "critical"}
+            # The label is the most probable class, so the model runs once
+            best = probabilities.argmax(axis=1)
+            confidences = probabilities[np.arange(len(alerts)), best]
             
-            return {
-                "severity": severity_map.get(prediction, "medium"),
-                "confidence": float(confidence),
-                "method": "ml_model"
-            }
+            return [
+                {
+                    "severity": classes[index],
+                    "confidence": float(confidence),
+                    "method": "ml_model"
+                }
+                for index, confidence in zip(best, confidences)
+            ]
         
         except Exception as e:
             print(f"ML prediction failed: {e}")
-            return {"severity": "medium", "confidence": 0.5, "method": "fallback"}
+            return [dict(FALLBACK_PREDICTION) for _ in alerts]
     
     def _extract_features(self, alert_data: Dict[str, Any]) -> list:
-        """Extract numerical features from alert data"""
-        # Simple feature extraction (in production, this would be more sophisticated)
-        title = alert_data.get("title", "")
-        description = alert_data.get("description", "")
+        """Extract numerical features from alert data (legacy model only)"""
+        return self._extract_feature_matrix([alert_data])[0].tolist()
+    
+    def _extract_feature_matrix(self, alerts: List[Dict[str, Any]]):
+        """Feature matrix with one row per alert (same columns as _extract_features)"""
+        import numpy as np
         
-        features = [
-            len(title),  # Title length
-            len(description),  # Description length
-            1 if "critical" in title.lower() else 0,  # Critical keyword
-            1 if "error" in title.lower() else 0,  # Error keyword
-            1 if "down" in title.lower() else 0,  # Down keyword
-        ]
+        titles = [(alert.get("title") or "").lower() for alert in alerts]
+        
+        features = np.empty((len(alerts), 5), dtype=np.float64)
+        features[:, 0] = [len(title) for title in titles]  # Title length
+        features[:, 1] = [len(alert.get("description") or "") for alert in alerts]  # Description length
+        features[:, 2] = ["critical" in title for title in titles]  # Critical keyword
+        features[:, 3] = ["error" in title for title in titles]  # Error keyword
+        features[:, 4] = ["down" in title for title in titles]  # Down keyword
         
         return features
     
@@ -117,32 +192,55 @@ class MLService:
             if not training_data:
                 return {"success": False, "message": "No training data provided"}
             
-            # Extract features and labels from training data
-            X = []
-            y = []
-            
-            for item in training_data:
-                features = self._extract_features(item)
-                severity_map = {"low": 0, "medium": 1, "high": 2, "critical": 3}
-                label = severity_map.get(item.get("severity", "medium"), 1)
-                
-                X.append(features)
-                y.append(label)
-            
-            X = np.array(X)
-            y = np.array(y)
+            labels = [str(item.get("severity") or "medium").lower() for item in training_data]
+            if len(set(labels)) < 2:
+                return {"success": False, "message": "Training data needs at least two severities"}
             
-            # Train the model
-            X_scaled = self.scaler.fit_transform(X)
-            self.model.fit(X_scaled, y)
-            self.is_trained = True
+            from app.services.ml_features import build_pipeline
             
-            # Save the updated model
-            os.makedirs(settings.ML_MODEL_PATH, exist_ok=True)
-            joblib.dump(self.model, os.path.join(settings.ML_MODEL_PATH, "alert_classifier.joblib"))
-            joblib.dump(self.scaler, os.path.join(settings.ML_MODEL_PATH, "scaler.joblib"))
+            # Train a fresh pipeline, then swap it in whole for serving threads
+            pipeline = build_pipeline(settings.ML_HASH_FEATURES)
+            pipeline.fit(training_data, labels)
+            self.save_pipeline(pipeline)
+            self.swap_pipeline(pipeline)
             
             return {"success": True, "message": f"Model trained with {len(training_data)} samples"}
         
         except Exception as e:
-            return {"success": False, "message": f"Training failed: {str(e)}"}
\ No newline at end of file
+            return {"success": False, "message": f"Training failed: {str(e)}"}
+    
+    def swap_pipeline(self, pipeline):
+        """Atomically replace the serving model for every MLService in the process"""
+        # One reference assignment: in-flight predictions keep the model they started with
+        _state.pipeline = pipeline
+        _state.is_trained = True
+        _state.initialized = True
+        _state.model = None
+        _state.scaler = None
+    
+    def save_pipeline(self, pipeline):
+        """Persist the pipeline artifact, replacing the old one atomically"""
+        import joblib
+        
+        # Uncompressed, so the arrays can be memory-mapped on load
+        os.makedirs(settings.ML_MODEL_PATH, exist_ok=True)
+        path = os.path.join(settings.ML_MODEL_PATH, PIPELINE_FILE)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(pipeline, temp_path)
+        os.replace(temp_path, path)
+        _state.artifact_mtime = os.stat(path).st_mtime_ns
+
+    def reload_if_changed(self) -> bool:
+        """Serve the pipeline artifact again if another process has replaced it"""
+        import joblib
+
+        path = os.path.join(settings.ML_MODEL_PATH, PIPELINE_FILE)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == _state.artifact_mtime:
+            return False
+        self.swap_pipeline(joblib.load(path, mmap_mode="r" if settings.ML_MODEL_MMAP else None))
+        _state.artifact_mtime = mtime
+        return True
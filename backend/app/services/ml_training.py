@@ -0,0 +1,214 @@
+import asyncio
+import copy
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.pagination import keyset
+from app.models.alert import Alert, CLOSED_ALERT_STATUSES
+from app.services.leases import LeaseService
+from app.services.ml_features import SEVERITIES, build_pipeline
+from app.services.ml_service import MLService
+
+Watermark = Tuple[datetime, int]
+
+_TRAINING_COLUMNS = (
+    Alert.id,
+    Alert.resolved_at,
+    Alert.title,
+    Alert.description,
+    Alert.source_system,
+    Alert.severity,
+)
+
+
+def _training_sample(row) -> Dict[str, Any]:
+    return {
+        "title": row.title,
+        "description": row.description or "",
+        "source_system": row.source_system,
+        "severity": row.severity.value if row.severity else "medium",
+    }
+
+
+class TrainingService:
+    """Reads resolved alerts, labelled with their final severity, for training"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _resolved(self):
+        return (
+            select(*_TRAINING_COLUMNS)
+            .where(Alert.status.in_(CLOSED_ALERT_STATUSES), Alert.resolved_at.is_not(None))
+            .order_by(Alert.resolved_at, Alert.id)
+        )
+
+    async def get_latest_watermark(self) -> Optional[Watermark]:
+        result = await self.db.execute(
+            select(Alert.resolved_at, Alert.id)
+            .where(Alert.status.in_(CLOSED_ALERT_STATUSES), Alert.resolved_at.is_not(None))
+            .order_by(Alert.resolved_at.desc(), Alert.id.desc())
+            .limit(1)
+        )
+        row = result.first()
+        return (row.resolved_at, row.id) if row else None
+
+    async def get_resolved_after(
+        self, after: Optional[Watermark], limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[Watermark]]:
+        """Next page of resolved alerts past ``after`` and the new watermark"""
+        query = self._resolved()
+        if after is not None:
+            row_key, cursor_key = keyset(self.db.bind.dialect.name, Alert.resolved_at, Alert.id, after)
+            query = query.where(row_key > cursor_key)
+        result = await self.db.execute(query.limit(limit))
+        rows = result.all()
+        if not rows:
+            return [], after
+        return [_training_sample(row) for row in rows], (rows[-1].resolved_at, rows[-1].id)
+
+    async def stream_resolved(self, batch_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Every resolved alert in mini-batches, from a server-side cursor"""
+        result = await self.db.stream(self._resolved().execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield [_training_sample(row) for row in partition]
+
+
+class OnlineTrainer:
+    """Learns from labelled alerts in mini-batches with ``partial_fit``.
+
+    Training happens on a private copy of the pipeline. ``publish`` hands a
+    snapshot to the serving MLService with a single reference swap, so
+    predictions never observe a half-updated model.
+    """
+
+    def __init__(self, ml_service: Optional[MLService] = None, fresh: bool = False):
+        self.ml_service = ml_service or MLService()
+        self.pipeline = build_pipeline(settings.ML_HASH_FEATURES) if fresh else self._initial_pipeline()
+        self.samples = 0
+        self.batches = 0
+
+    def _initial_pipeline(self):
+        self.ml_service.load()
+        serving = self.ml_service.pipeline
+        if serving is not None and set(getattr(serving, "classes_", ())) == set(SEVERITIES):
+            pipeline = copy.deepcopy(serving)
+            # The serving weights may be read-only memory maps; train on private arrays
+            classifier = pipeline.named_steps["classifier"]
+            classifier.coef_ = np.array(classifier.coef_)
+            classifier.intercept_ = np.array(classifier.intercept_)
+            return pipeline
+        # Nothing incremental to continue from (legacy forest or partial classes)
+        return build_pipeline(settings.ML_HASH_FEATURES)
+
+    def partial_fit(self, alerts: List[Dict[str, Any]]) -> int:
+        if not alerts:
+            return 0
+        labels = [str(alert.get("severity") or "medium").lower() for alert in alerts]
+        # The hashers are stateless, so fitting them learns nothing
+        features = self.pipeline.named_steps["features"].fit_transform(alerts)
+        self.pipeline.named_steps["classifier"].partial_fit(features, labels, classes=SEVERITIES)
+        self.samples += len(alerts)
+        self.batches += 1
+        return len(alerts)
+
+    def publish(self, save: bool = True):
+        snapshot = copy.deepcopy(self.pipeline)
+        if save:
+            self.ml_service.save_pipeline(snapshot)
+        self.ml_service.swap_pipeline(snapshot)
+
+
+class OnlineTrainingWorker:
+    """Background task feeding newly resolved alerts to an OnlineTrainer.
+
+    Every process runs one, but only the holder of the ``lease_name`` lease
+    trains and publishes the shared artifact; the others reload it when it
+    changes. The trainer polls every ``interval`` seconds past a
+    (resolved_at, id) watermark that starts at the newest resolution when
+    it takes the lease; history is covered by
+    ``python -m app.commands.train_model``. Model fitting runs in a thread
+    so the event loop keeps serving requests.
+    """
+
+    lease_name = "ml_online_training"
+
+    def __init__(self, interval: float, batch_size: int, lease_seconds: float):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.trainer: Optional[OnlineTrainer] = None
+        self.watermark: Optional[Watermark] = None
+        self.last_published_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.trainer is not None:
+            self.trainer = None
+            try:
+                async with SessionLocal() as session:
+                    await LeaseService(session).release(self.lease_name, self.owner)
+            except Exception as e:
+                print(f"Releasing the online training lease failed: {e}")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                print(f"Online model training failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def tick(self) -> int:
+        """Train if this process holds the lease, otherwise pick up the trainer's model"""
+        async with SessionLocal() as session:
+            leading = await LeaseService(session).acquire(self.lease_name, self.owner, self.lease_seconds)
+        if not leading:
+            if self.trainer is not None:
+                print("Online training lease lost; following the new trainer")
+                self.trainer = None
+            await asyncio.to_thread(MLService().reload_if_changed)
+            return 0
+        if self.trainer is None:
+            # Continue from whatever the previous trainer published
+            await asyncio.to_thread(MLService().reload_if_changed)
+            self.trainer = await asyncio.to_thread(OnlineTrainer)
+            async with SessionLocal() as session:
+                self.watermark = await TrainingService(session).get_latest_watermark()
+        return await self.train_pending()
+
+    async def train_pending(self) -> int:
+        """Train on everything resolved since the watermark, then publish once"""
+        trained = 0
+        while True:
+            async with SessionLocal() as session:
+                samples, watermark = await TrainingService(session).get_resolved_after(
+                    self.watermark, self.batch_size
+                )
+            if samples:
+                trained += await asyncio.to_thread(self.trainer.partial_fit, samples)
+            self.watermark = watermark
+            if len(samples) < self.batch_size:
+                break
+        if trained:
+            await asyncio.to_thread(self.trainer.publish)
+            self.last_published_at = time.time()
+        return trained
@@ -0,0 +1,76 @@
+import asyncio
+import importlib
+import random
+from typing import Optional
+
+from app.core.config import settings
+
+
+class PatchExecutionError(Exception):
+    """Raised by an executor when installing or rolling back on a host fails"""
+
+
+class PatchExecutor:
+    """Installs a patch on one host at a time; the rollout engine fans out.
+
+    Implementations must be safe to call concurrently from many coroutines
+    and raise PatchExecutionError (or any exception) when a host fails.
+    """
+
+    name = "base"
+
+    async def install(self, patch, host: str):
+        raise NotImplementedError
+
+    async def rollback(self, patch, host: str):
+        raise NotImplementedError
+
+
+class SimulatedPatchExecutor(PatchExecutor):
+    """Pretends to patch hosts with configurable latency and failure rate.
+
+    Lets rollouts of thousands of hosts run (and be benchmarked) without a
+    real deployment backend. Patches that require a reboot add
+    ``reboot_seconds`` per host.
+    """
+
+    name = "simulated"
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.05,
+        failure_rate: float = 0.0,
+        reboot_seconds: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.latency_seconds = latency_seconds
+        self.failure_rate = failure_rate
+        self.reboot_seconds = reboot_seconds
+        self._random = random.Random(seed)
+
+    async def install(self, patch, host: str):
+        # +/-50% jitter so hosts in a wave do not finish in lockstep
+        delay = self.latency_seconds * (0.5 + self._random.random())
+        if patch.requires_reboot:
+            delay += self.reboot_seconds
+        await asyncio.sleep(delay)
+        if self._random.random() < self.failure_rate:
+            raise PatchExecutionError(f"Simulated install failure on {host}")
+
+    async def rollback(self, patch, host: str):
+        await asyncio.sleep(self.latency_seconds * (0.5 + self._random.random()))
+
+
+def create_patch_executor(name: Optional[str] = None) -> PatchExecutor:
+    """Executor named by PATCH_EXECUTOR: "simulated" or "package.module:ClassName" """
+    name = name or settings.PATCH_EXECUTOR
+    if name == "simulated":
+        return SimulatedPatchExecutor(
+            latency_seconds=settings.PATCH_SIMULATED_LATENCY_SECONDS,
+            failure_rate=settings.PATCH_SIMULATED_FAILURE_RATE,
+            reboot_seconds=settings.PATCH_SIMULATED_REBOOT_SECONDS,
+        )
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown PATCH_EXECUTOR: {name}")
+    return getattr(importlib.import_module(module_name), class_name)()
@@ -0,0 +1,241 @@
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import cache_counters, timed
+from app.models.patch import Patch, PatchStatus
+
+PlanKey = Tuple[Any, ...]
+
+
+def _strongly_connected(nodes: Iterable[int], edges: List[List[int]]) -> List[List[int]]:
+    """Tarjan's SCCs over ``nodes``, iteratively so deep chains cannot overflow the stack"""
+    nodes = list(nodes)
+    members = set(nodes)
+    index: Dict[int, int] = {}
+    lowlink: Dict[int, int] = {}
+    on_stack: Set[int] = set()
+    stack: List[int] = []
+    components = []
+    counter = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, child = work.pop()
+            if child == 0:
+                index[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack.add(node)
+            recurse = False
+            neighbours = edges[node]
+            while child < len(neighbours):
+                target = neighbours[child]
+                child += 1
+                if target not in members:
+                    continue
+                if target not in index:
+                    work.append((node, child))
+                    work.append((target, 0))
+                    recurse = True
+                    break
+                if target in on_stack:
+                    lowlink[node] = min(lowlink[node], index[target])
+            if recurse:
+                continue
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+    return components
+
+
+class PatchPlan:
+    """Install order for pending patches, as layers of mutually independent patches.
+
+    Every patch in layer N only requires patches in earlier layers (or ones
+    already deployed), so a layer can be installed in parallel. Patches in a
+    prerequisite cycle, requiring an unknown patch, or depending on either
+    cannot be scheduled and are reported instead of placed.
+    """
+
+    def __init__(
+        self,
+        layers: List[List[str]],
+        prerequisites: Dict[str, List[str]],
+        cycles: List[List[str]],
+        blocked: List[str],
+        missing: Dict[str, List[str]]
+    ):
+        self.layers = layers
+        self.prerequisites = prerequisites
+        self.cycles = cycles
+        self.blocked = blocked
+        self.missing = missing
+        self.generated_at = datetime.now(timezone.utc)
+        self._layer_of = {patch_id: number for number, layer in enumerate(layers) for patch_id in layer}
+
+    @property
+    def patch_count(self) -> int:
+        return len(self._layer_of)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "generated_at": self.generated_at,
+            "patch_count": self.patch_count,
+            "layers": self.layers,
+            "cycles": self.cycles,
+            "blocked": self.blocked,
+            "missing": self.missing,
+        }
+
+    def for_patches(self, patch_ids: Sequence[str]) -> Dict[str, Any]:
+        """The plan restricted to ``patch_ids`` and their transitive prerequisites"""
+        selected: Set[str] = set()
+        queue = deque(patch_id for patch_id in patch_ids if patch_id in self._layer_of)
+        while queue:
+            patch_id = queue.popleft()
+            if patch_id in selected:
+                continue
+            selected.add(patch_id)
+            queue.extend(self.prerequisites.get(patch_id, ()))
+
+        # Layer numbers from the full plan stay a valid order for any subset
+        layers = [[patch_id for patch_id in layer if patch_id in selected] for layer in self.layers]
+        requested = set(patch_ids)
+        return {
+            "generated_at": self.generated_at,
+            "patch_count": len(selected),
+            "layers": [layer for layer in layers if layer],
+            "cycles": [cycle for cycle in self.cycles if requested.intersection(cycle)],
+            "blocked": [patch_id for patch_id in self.blocked if patch_id in requested],
+            "missing": {patch_id: refs for patch_id, refs in self.missing.items() if patch_id in requested},
+            "not_planned": sorted(requested - selected),
+        }
+
+
+def build_plan(patches: Sequence[Tuple[str, Optional[Sequence[Any]]]], satisfied: Set[str]) -> PatchPlan:
+    """Layered topological order of ``(patch_id, prerequisites)`` pairs.
+
+    Prerequisites in ``satisfied`` (already deployed) impose no ordering.
+    Kahn's algorithm over integer node ids keeps this O(patches + edges).
+    """
+    patch_ids = [patch_id for patch_id, _ in patches]
+    position = {patch_id: number for number, patch_id in enumerate(patch_ids)}
+    dependents: List[List[int]] = [[] for _ in patch_ids]
+    indegree = [0] * len(patch_ids)
+    prerequisites: Dict[str, List[str]] = {}
+    missing: Dict[str, List[str]] = {}
+
+    for node, (patch_id, required) in enumerate(patches):
+        for prerequisite in required or ():
+            prerequisite = str(prerequisite)
+            if prerequisite in satisfied:
+                continue
+            source = position.get(prerequisite)
+            if source is None:
+                missing.setdefault(patch_id, []).append(prerequisite)
+                continue
+            dependents[source].append(node)
+            indegree[node] += 1
+            prerequisites.setdefault(patch_id, []).append(prerequisite)
+
+    layers = []
+    layer = [node for node in range(len(patch_ids)) if indegree[node] == 0 and patch_ids[node] not in missing]
+    placed = 0
+    while layer:
+        placed += len(layer)
+        layers.append(sorted(patch_ids[node] for node in layer))
+        following = []
+        for node in layer:
+            for dependent in dependents[node]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0 and patch_ids[dependent] not in missing:
+                    following.append(dependent)
+        layer = following
+
+    cycles: List[List[str]] = []
+    blocked: List[str] = []
+    if placed < len(patch_ids):
+        unplaced = [node for node in range(len(patch_ids)) if indegree[node] > 0 or patch_ids[node] in missing]
+        # Edges run prerequisite -> dependent; cycles are SCCs of size > 1 or self-loops
+        for component in _strongly_connected(unplaced, dependents):
+            if len(component) > 1 or component[0] in dependents[component[0]]:
+                cycles.append(sorted(patch_ids[node] for node in component))
+            else:
+                blocked.append(patch_ids[component[0]])
+        cycles.sort()
+        blocked.sort()
+
+    return PatchPlan(layers, prerequisites, cycles, blocked, missing)
+
+
+class PatchPlanCache:
+    """Per-process cache of the plan, keyed on a version stamp of the patches table.
+
+    The stamp (row count, highest id, latest created/updated time) is one
+    aggregate query and changes whenever a patch is added, removed or
+    edited, from any process. ``invalidate`` drops the plan immediately for
+    writers in this process.
+    """
+
+    def __init__(self):
+        self._key: Optional[PlanKey] = None
+        self._plan: Optional[PatchPlan] = None
+        self._lock = asyncio.Lock()
+        self._lookups = cache_counters("patch_plan", "hit", "miss")
+
+    async def get(self, db: AsyncSession) -> Tuple[PatchPlan, bool]:
+        """Return (plan, whether it came from the cache)"""
+        key = await self._stamp(db)
+        if self._plan is not None and self._key == key:
+            self._lookups["hit"].inc()
+            return self._plan, True
+        async with self._lock:
+            if self._plan is None or self._key != key:
+                self._plan = await self._build(db)
+                self._key = key
+                self._lookups["miss"].inc()
+                return self._plan, False
+        self._lookups["hit"].inc()
+        return self._plan, True
+
+    def invalidate(self):
+        self._plan = None
+
+    async def _stamp(self, db: AsyncSession) -> PlanKey:
+        result = await db.execute(
+            select(func.count(Patch.id), func.max(Patch.id), func.max(Patch.created_at), func.max(Patch.updated_at))
+        )
+        return tuple(result.one())
+
+    @timed("patch_plan.build")
+    async def _build(self, db: AsyncSession) -> PatchPlan:
+        result = await db.execute(select(Patch.patch_id, Patch.prerequisites, Patch.status))
+        pending = []
+        satisfied = set()
+        for patch_id, prerequisites, status in result.all():
+            if status == PatchStatus.COMPLETED:
+                satisfied.add(patch_id)
+            else:
+                pending.append((patch_id, prerequisites if isinstance(prerequisites, list) else None))
+        # CPU-bound for large fleets; keep the event loop responsive
+        return await asyncio.to_thread(build_plan, pending, satisfied)
+
+
+plan_cache = PatchPlanCache()
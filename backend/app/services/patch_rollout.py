@@ -0,0 +1,482 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import timed
+from app.models.patch import (
+    ACTIVE_DEPLOYMENT_STATUSES,
+    Patch,
+    PatchDeployment,
+    PatchDeploymentTarget,
+    PatchStatus,
+    TargetStatus,
+)
+from app.services.compliance_index import compliance_index
+from app.services.patch_executors import PatchExecutor, create_patch_executor
+from app.services.patch_plan import plan_cache
+from app.services.rollup_service import as_utc, rollups
+
+# Rows per multi-row INSERT of deployment targets
+TARGET_INSERT_CHUNK_SIZE = 1000
+
+
+def plan_waves(hosts: Sequence[str], canary_size: int, wave_size: int) -> List[List[str]]:
+    """Split hosts into a canary wave followed by waves of ``wave_size``"""
+    waves = []
+    if canary_size > 0:
+        waves.append(list(hosts[:canary_size]))
+        hosts = hosts[canary_size:]
+    waves.extend(list(hosts[i:i + wave_size]) for i in range(0, len(hosts), wave_size))
+    return [wave for wave in waves if wave]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class PatchRolloutService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_patch(self, patch_id: int) -> Optional[Patch]:
+        result = await self.db.execute(select(Patch).where(Patch.id == patch_id))
+        return result.scalar_one_or_none()
+
+    async def get_deployment(self, deployment_id: int) -> Optional[PatchDeployment]:
+        result = await self.db.execute(select(PatchDeployment).where(PatchDeployment.id == deployment_id))
+        return result.scalar_one_or_none()
+
+    async def get_active_deployment(self, patch_id: int) -> Optional[PatchDeployment]:
+        result = await self.db.execute(
+            select(PatchDeployment)
+            .where(PatchDeployment.patch_id == patch_id, PatchDeployment.status.in_(ACTIVE_DEPLOYMENT_STATUSES))
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def _claimable(now: datetime):
+        """Active deployments no live process holds a lease on"""
+        return and_(
+            PatchDeployment.status.in_(ACTIVE_DEPLOYMENT_STATUSES),
+            or_(PatchDeployment.lease_expires_at.is_(None), PatchDeployment.lease_expires_at < now),
+        )
+
+    async def get_claimable_deployments(self) -> List[Tuple[int, str]]:
+        """(id, executor) of active deployments that are unowned or whose owner's lease expired"""
+        result = await self.db.execute(
+            select(PatchDeployment.id, PatchDeployment.executor).where(self._claimable(_now()))
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def claim_deployment(self, deployment_id: int, owner: str, lease_seconds: float) -> bool:
+        """Take the lease on a deployment; False when another live process holds it or it has ended"""
+        now = _now()
+        result = await self.db.execute(
+            update(PatchDeployment)
+            .where(PatchDeployment.id == deployment_id, self._claimable(now))
+            .values(owner=owner, lease_expires_at=now + timedelta(seconds=lease_seconds))
+            .returning(PatchDeployment.id)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = result.scalar_one_or_none() is not None
+        await self.db.commit()
+        return claimed
+
+    async def renew_leases(self, owner: str, lease_seconds: float) -> Set[int]:
+        """Extend ``owner``'s leases on active deployments; returns the ids still held"""
+        result = await self.db.execute(
+            update(PatchDeployment)
+            .where(PatchDeployment.owner == owner, PatchDeployment.status.in_(ACTIVE_DEPLOYMENT_STATUSES))
+            .values(lease_expires_at=_now() + timedelta(seconds=lease_seconds))
+            .returning(PatchDeployment.id)
+            .execution_options(synchronize_session=False)
+        )
+        renewed = set(result.scalars().all())
+        await self.db.commit()
+        return renewed
+
+    async def release_deployments(self, owner: str):
+        """Drop ``owner``'s leases so another process can resume its deployments at once"""
+        await self.db.execute(
+            update(PatchDeployment)
+            .where(PatchDeployment.owner == owner, PatchDeployment.status.in_(ACTIVE_DEPLOYMENT_STATUSES))
+            .values(owner=None, lease_expires_at=None)
+        )
+        await self.db.commit()
+
+    async def get_target_counts(self, deployment_id: int) -> Dict[str, int]:
+        result = await self.db.execute(
+            select(PatchDeploymentTarget.status, func.count())
+            .where(PatchDeploymentTarget.deployment_id == deployment_id)
+            .group_by(PatchDeploymentTarget.status)
+        )
+        counts = {status.value: 0 for status in TargetStatus}
+        counts.update({status.value: count for status, count in result.all()})
+        return counts
+
+    @timed("db.patch_rollout.create_deployment")
+    async def create_deployment(
+        self,
+        patch: Patch,
+        hosts: Sequence[str],
+        executor: str,
+        canary_size: int,
+        wave_size: int,
+        concurrency: int,
+        failure_threshold: float,
+        scheduled_for: Optional[datetime] = None
+    ) -> PatchDeployment:
+        """Persist a deployment with every host queued in its wave, and schedule the patch"""
+        waves = plan_waves(hosts, canary_size, wave_size)
+        deployment = PatchDeployment(
+            patch_id=patch.id,
+            status=PatchStatus.SCHEDULED,
+            executor=executor,
+            total_targets=len(hosts),
+            total_waves=len(waves),
+            current_wave=0,
+            succeeded=0,
+            failed=0,
+            concurrency=concurrency,
+            failure_threshold=failure_threshold,
+            scheduled_for=scheduled_for,
+        )
+        self.db.add(deployment)
+        await self.db.flush()
+
+        rows = [
+            {"deployment_id": deployment.id, "host": host, "wave": number, "status": TargetStatus.PENDING}
+            for number, wave in enumerate(waves)
+            for host in wave
+        ]
+        for offset in range(0, len(rows), TARGET_INSERT_CHUNK_SIZE):
+            await self.db.execute(insert(PatchDeploymentTarget), rows[offset:offset + TARGET_INSERT_CHUNK_SIZE])
+
+        await self.db.execute(update(Patch).where(Patch.id == patch.id).values(status=PatchStatus.SCHEDULED))
+        await self.db.commit()
+        return deployment
+
+
+class ProgressWriter:
+    """Buffers per-host results and writes them in batches.
+
+    Each flush is one executemany UPDATE of the target rows plus one counter
+    UPDATE of the deployment, in a single commit, instead of a commit per
+    host. Committed results for ``patch`` also update the compliance index.
+    Results still buffered when the process dies are lost; those hosts
+    stay pending and are patched again on resume, so installs must be
+    idempotent.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        deployment_id: int,
+        flush_size: int,
+        count_results: bool = True,
+        patch: Optional[Patch] = None
+    ):
+        self.db = db
+        self.deployment_id = deployment_id
+        self.flush_size = max(flush_size, 1)
+        self.count_results = count_results
+        self.patch = patch
+        self.flushes = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._hosts: List[Tuple[str, TargetStatus]] = []
+        self._lock = asyncio.Lock()
+
+    async def add(self, target_id: int, status: TargetStatus, error: Optional[str] = None, host: Optional[str] = None):
+        self._pending.append({"id": target_id, "status": status, "error": error, "finished_at": _now()})
+        if host is not None:
+            self._hosts.append((host, status))
+        if len(self._pending) >= self.flush_size:
+            await self.flush()
+
+    @timed("db.patch_rollout.flush_progress")
+    async def flush(self):
+        async with self._lock:
+            rows, self._pending = self._pending, []
+            hosts, self._hosts = self._hosts, []
+            if not rows:
+                return
+            await self.db.execute(update(PatchDeploymentTarget), rows)
+            if self.count_results:
+                succeeded = sum(1 for row in rows if row["status"] == TargetStatus.SUCCEEDED)
+                await self.db.execute(
+                    update(PatchDeployment)
+                    .where(PatchDeployment.id == self.deployment_id)
+                    .values(
+                        succeeded=PatchDeployment.succeeded + succeeded,
+                        failed=PatchDeployment.failed + (len(rows) - succeeded),
+                    )
+                )
+            await self.db.commit()
+            self.flushes += 1
+            if self.patch is not None:
+                compliance_index.record(self.patch.patch_id, self.patch.severity, hosts)
+
+
+class RolloutEngine:
+    """Drives one deployment wave by wave through a PatchExecutor.
+
+    Within a wave at most ``deployment.concurrency`` hosts are in flight.
+    After each wave the failure ratio is checked against the deployment's
+    threshold; exceeding it (which also stops the wave early) rolls back
+    every host patched so far and ends the deployment as ROLLED_BACK.
+    Rollouts resume from the first unfinished wave after a restart.
+    """
+
+    def __init__(self, db: AsyncSession, executor: PatchExecutor, flush_size: Optional[int] = None):
+        self.db = db
+        self.executor = executor
+        self.flush_size = flush_size or settings.PATCH_ROLLOUT_FLUSH_SIZE
+        self.flushes = 0
+
+    async def run(self, deployment_id: int) -> PatchStatus:
+        service = PatchRolloutService(self.db)
+        deployment = await service.get_deployment(deployment_id)
+        patch = await service.get_patch(deployment.patch_id)
+
+        if deployment.status == PatchStatus.SCHEDULED and deployment.scheduled_for:
+            delay = (as_utc(deployment.scheduled_for) - _now()).total_seconds()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        await self._set_status(deployment, patch, PatchStatus.IN_PROGRESS, started_at=deployment.started_at or _now())
+        await self.db.commit()
+        try:
+            for wave in range(deployment.current_wave, deployment.total_waves):
+                if not await self._run_wave(deployment, patch, wave):
+                    await self._rollback(deployment, patch)
+                    await self._finish(
+                        deployment, patch, PatchStatus.ROLLED_BACK,
+                        error=f"Wave {wave} exceeded the failure threshold of {deployment.failure_threshold:.0%}"
+                    )
+                    return PatchStatus.ROLLED_BACK
+                await self.db.execute(
+                    update(PatchDeployment).where(PatchDeployment.id == deployment.id).values(current_wave=wave + 1)
+                )
+                await self.db.commit()
+        except Exception as e:
+            # Cancellation (shutdown) is not caught: finished waves and flushed
+            # hosts are kept and resume picks up the rest
+            await self.db.rollback()
+            print(f"Patch deployment {deployment.id} failed: {e}")
+            await self._finish(deployment, patch, PatchStatus.FAILED, error=str(e))
+            return PatchStatus.FAILED
+
+        await self._finish(deployment, patch, PatchStatus.COMPLETED)
+        return PatchStatus.COMPLETED
+
+    async def _pending_targets(self, deployment_id: int, wave: int) -> List[Tuple[int, str]]:
+        result = await self.db.execute(
+            select(PatchDeploymentTarget.id, PatchDeploymentTarget.host).where(
+                PatchDeploymentTarget.deployment_id == deployment_id,
+                PatchDeploymentTarget.wave == wave,
+                PatchDeploymentTarget.status == TargetStatus.PENDING,
+            )
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def _fan_out(self, targets: Iterable[Tuple[int, str]], concurrency: int, handle):
+        """Run ``handle(target_id, host)`` over targets with bounded concurrency until it returns False"""
+        # One shared iterator: each worker pulls the next host when it frees up
+        remaining = iter(targets)
+        stop = False
+
+        async def worker():
+            nonlocal stop
+            for target_id, host in remaining:
+                if stop:
+                    return
+                if await handle(target_id, host) is False:
+                    stop = True
+
+        await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+
+    async def _run_wave(self, deployment: PatchDeployment, patch: Patch, wave: int) -> bool:
+        """Patch the wave's pending hosts; False when its failure ratio exceeds the threshold"""
+        targets = await self._pending_targets(deployment.id, wave)
+        writer = ProgressWriter(self.db, deployment.id, self.flush_size, patch=patch)
+        # Counted over the whole wave, including hosts finished before a restart
+        wave_size = await self.db.scalar(
+            select(func.count()).where(
+                PatchDeploymentTarget.deployment_id == deployment.id,
+                PatchDeploymentTarget.wave == wave,
+            )
+        )
+        failed = await self.db.scalar(
+            select(func.count()).where(
+                PatchDeploymentTarget.deployment_id == deployment.id,
+                PatchDeploymentTarget.wave == wave,
+                PatchDeploymentTarget.status == TargetStatus.FAILED,
+            )
+        )
+        allowed = deployment.failure_threshold * wave_size
+
+        async def install(target_id: int, host: str) -> bool:
+            nonlocal failed
+            try:
+                await self.executor.install(patch, host)
+            except Exception as e:
+                failed += 1
+                await writer.add(target_id, TargetStatus.FAILED, str(e) or type(e).__name__, host)
+                return failed <= allowed
+            await writer.add(target_id, TargetStatus.SUCCEEDED, host=host)
+            return True
+
+        try:
+            await self._fan_out(targets, deployment.concurrency, install)
+        finally:
+            await writer.flush()
+            self.flushes += writer.flushes
+        return failed <= allowed
+
+    async def _rollback(self, deployment: PatchDeployment, patch: Patch):
+        result = await self.db.execute(
+            select(PatchDeploymentTarget.id, PatchDeploymentTarget.host).where(
+                PatchDeploymentTarget.deployment_id == deployment.id,
+                PatchDeploymentTarget.status == TargetStatus.SUCCEEDED,
+            )
+        )
+        targets = [tuple(row) for row in result.all()]
+        writer = ProgressWriter(self.db, deployment.id, self.flush_size, count_results=False, patch=patch)
+
+        async def roll_back(target_id: int, host: str):
+            try:
+                await self.executor.rollback(patch, host)
+            except Exception as e:
+                # Left SUCCEEDED (the patch is still installed) with the reason
+                await writer.add(target_id, TargetStatus.SUCCEEDED, f"Rollback failed: {e}")
+                return
+            await writer.add(target_id, TargetStatus.ROLLED_BACK, host=host)
+
+        try:
+            await self._fan_out(targets, deployment.concurrency, roll_back)
+        finally:
+            await writer.flush()
+            self.flushes += writer.flushes
+
+    async def _set_status(self, deployment: PatchDeployment, patch: Patch, status: PatchStatus, **values):
+        await self.db.execute(
+            update(PatchDeployment).where(PatchDeployment.id == deployment.id).values(status=status, **values)
+        )
+        patch_values = {"deployed_at": values["finished_at"]} if status == PatchStatus.COMPLETED else {}
+        await self.db.execute(update(Patch).where(Patch.id == patch.id).values(status=status, **patch_values))
+
+    async def _finish(self, deployment: PatchDeployment, patch: Patch, status: PatchStatus, error: Optional[str] = None):
+        finished_at = _now()
+        await self._set_status(deployment, patch, status, finished_at=finished_at, error=error)
+        await self.db.commit()
+        rollups.record_patch_finished(status == PatchStatus.COMPLETED, finished_at)
+        if status == PatchStatus.COMPLETED:
+            # A deployed patch now satisfies its dependents' prerequisites
+            plan_cache.invalidate()
+
+
+class RolloutManager:
+    """Runs deployments as background tasks in this process.
+
+    Executors are created once per PATCH_EXECUTOR name and shared by
+    every rollout using them. A rollout only runs after claiming the
+    deployment's lease, renewed every third of PATCH_ROLLOUT_LEASE_SECONDS,
+    so with several workers each deployment runs in exactly one of them.
+    The same loop takes over deployments whose owner's lease expired.
+    ``stop`` cancels running rollouts and releases their leases; their
+    persisted progress lets another process (or the next startup) resume.
+    """
+
+    def __init__(self):
+        self._executors: Dict[str, PatchExecutor] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._claimed: Set[int] = set()
+        self._heartbeat: Optional[asyncio.Task] = None
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def executor(self, name: str) -> PatchExecutor:
+        if name not in self._executors:
+            self._executors[name] = create_patch_executor(name)
+        return self._executors[name]
+
+    def start(self, deployment_id: int, executor: str):
+        """Run a deployment here if its lease can be claimed"""
+        if deployment_id in self._tasks:
+            return
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop(settings.PATCH_ROLLOUT_LEASE_SECONDS / 3))
+        task = asyncio.create_task(self._run(deployment_id, self.executor(executor)))
+        self._tasks[deployment_id] = task
+        task.add_done_callback(lambda _: self._done(deployment_id))
+
+    def _done(self, deployment_id: int):
+        self._tasks.pop(deployment_id, None)
+        self._claimed.discard(deployment_id)
+
+    async def _run(self, deployment_id: int, executor: PatchExecutor):
+        try:
+            async with SessionLocal() as session:
+                service = PatchRolloutService(session)
+                if not await service.claim_deployment(deployment_id, self.owner, settings.PATCH_ROLLOUT_LEASE_SECONDS):
+                    return
+                self._claimed.add(deployment_id)
+                await RolloutEngine(session, executor).run(deployment_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Patch deployment {deployment_id} crashed: {e}")
+
+    async def resume(self) -> int:
+        """Start deployments left scheduled or in progress that no live process holds"""
+        async with SessionLocal() as session:
+            deployments = await PatchRolloutService(session).get_claimable_deployments()
+        for deployment_id, executor in deployments:
+            self.start(deployment_id, executor)
+        return len(deployments)
+
+    async def _heartbeat_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.heartbeat()
+                await self.resume()
+            except Exception as e:
+                print(f"Patch deployment lease renewal failed: {e}")
+
+    async def heartbeat(self):
+        """Renew this process's leases; stop rollouts another process has taken over"""
+        claimed = set(self._claimed)
+        async with SessionLocal() as session:
+            renewed = await PatchRolloutService(session).renew_leases(self.owner, settings.PATCH_ROLLOUT_LEASE_SECONDS)
+        for deployment_id in claimed - renewed:
+            task = self._tasks.get(deployment_id)
+            if task is not None and deployment_id in self._claimed:
+                print(f"Patch deployment {deployment_id} lost its lease; leaving it to its new owner")
+                task.cancel()
+
+    async def stop(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        async with SessionLocal() as session:
+            await PatchRolloutService(session).release_deployments(self.owner)
+
+    def running(self) -> List[int]:
+        return sorted(self._tasks)
+
+
+rollout_manager = RolloutManager()
@@ -0,0 +1,218 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.alert import Alert, CLOSED_ALERT_STATUSES
+from app.models.patch import Patch, PatchStatus
+from app.models.rollup import MetricRollup
+
+GRANULARITIES = ("hour", "day")
+
+ALERTS_CREATED = "alerts_created"
+ALERTS_RESOLVED = "alerts_resolved"  # total = summed seconds from creation to resolution
+ALERTS_AUTO_RESOLVED = "alerts_auto_resolved"
+PATCHES_COMPLETED = "patches_completed"
+PATCHES_FAILED = "patches_failed"
+
+BucketKey = Tuple[str, str, datetime]
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes (SQLite) as UTC"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    value = as_utc(value).replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        value = value.replace(hour=0)
+    return value
+
+
+def _merge(buckets: Dict[BucketKey, List[float]], entries: Iterable[Tuple[str, datetime, int, float]]):
+    for metric, at, count, total in entries:
+        for granularity in GRANULARITIES:
+            bucket = buckets[(granularity, metric, bucket_start(at, granularity))]
+            bucket[0] += count
+            bucket[1] += total
+
+
+class RollupBuffer:
+    """Rollup deltas merged in memory and upserted together.
+
+    Writers record after their row change commits, so a counter only moves
+    for committed changes. Deltas for the same bucket collapse into one row,
+    and a single upsert per ``interval`` per process writes them. Writers
+    never wait on the current hour/day rollup row locks. Deltas not yet
+    flushed when a process dies are lost; backfill_rollups recomputes
+    everything from the raw tables.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.flushes = 0
+        self._buckets: Dict[BucketKey, List[float]] = defaultdict(lambda: [0, 0.0])
+        self._task: Optional[asyncio.Task] = None
+
+    def record_many(self, entries: Iterable[Tuple[str, datetime, int, float]]):
+        """Add (metric, at, count, total) entries to the hour and day buckets containing ``at``"""
+        _merge(self._buckets, entries)
+        if self._buckets and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._flush_later())
+
+    def record(self, metric: str, at: datetime, count: int = 1, total: float = 0.0):
+        self.record_many([(metric, at, count, total)])
+
+    def record_alerts_created(self, count: int = 1, at: Optional[datetime] = None):
+        if count:
+            self.record(ALERTS_CREATED, at or datetime.now(timezone.utc), count)
+
+    def record_alerts_resolved(self, resolutions: Iterable[Tuple[datetime, datetime, bool]]):
+        """Record (created_at, resolved_at, auto_resolved) resolutions"""
+        entries = []
+        for created_at, resolved_at, auto_resolved in resolutions:
+            seconds = max((as_utc(resolved_at) - as_utc(created_at)).total_seconds(), 0.0)
+            entries.append((ALERTS_RESOLVED, resolved_at, 1, seconds))
+            if auto_resolved:
+                entries.append((ALERTS_AUTO_RESOLVED, resolved_at, 1, 0.0))
+        self.record_many(entries)
+
+    def record_patch_finished(self, succeeded: bool, at: Optional[datetime] = None):
+        self.record(PATCHES_COMPLETED if succeeded else PATCHES_FAILED, at or datetime.now(timezone.utc))
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"Rollup flush failed: {e}")
+
+    async def flush(self):
+        """Upsert every buffered delta in one statement and commit"""
+        if not self._buckets:
+            return
+        buckets, self._buckets = self._buckets, defaultdict(lambda: [0, 0.0])
+        try:
+            async with SessionLocal() as session:
+                await RollupService(session).upsert(buckets)
+                await session.commit()
+        except BaseException:
+            # Keep the deltas for the next flush
+            for key, (count, total) in buckets.items():
+                self._buckets[key][0] += count
+                self._buckets[key][1] += total
+            raise
+        self.flushes += 1
+
+
+class RollupService:
+    """Hourly/daily counters behind the dashboard.
+
+    Writers record into the ``rollups`` buffer, which upserts merged deltas
+    periodically. Readers touch one row per bucket instead of scanning
+    alerts or patches. ``rebuild`` recomputes all rollups from the raw tables.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _insert(self):
+        if self.db.bind.dialect.name == "sqlite":
+            return sqlite.insert(MetricRollup)
+        return postgresql.insert(MetricRollup)
+
+    async def upsert(self, buckets: Dict[BucketKey, List[float]]):
+        """Add merged (count, total) deltas to their rows with a single upsert (not committed)"""
+        if not buckets:
+            return
+        rows = [
+            {"granularity": granularity, "metric": metric, "bucket_start": start, "count": count, "total": total}
+            for (granularity, metric, start), (count, total) in buckets.items()
+        ]
+        stmt = self._insert().values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["granularity", "metric", "bucket_start"],
+            set_={
+                "count": MetricRollup.count + stmt.excluded.count,
+                "total": MetricRollup.total + stmt.excluded.total,
+            },
+        )
+        await self.db.execute(stmt)
+
+    async def series(self, metric: str, granularity: str, since: datetime) -> Dict[datetime, Tuple[int, float]]:
+        """(count, total) per bucket from ``since`` onwards; missing buckets are zero"""
+        result = await self.db.execute(
+            select(MetricRollup.bucket_start, MetricRollup.count, MetricRollup.total)
+            .where(
+                MetricRollup.granularity == granularity,
+                MetricRollup.metric == metric,
+                MetricRollup.bucket_start >= bucket_start(since, granularity),
+            )
+        )
+        return {as_utc(start): (count, total) for start, count, total in result.all()}
+
+    async def totals(self, metric: str, granularity: str, since: datetime) -> Tuple[int, float]:
+        result = await self.db.execute(
+            select(func.coalesce(func.sum(MetricRollup.count), 0), func.coalesce(func.sum(MetricRollup.total), 0.0))
+            .where(
+                MetricRollup.granularity == granularity,
+                MetricRollup.metric == metric,
+                MetricRollup.bucket_start >= bucket_start(since, granularity),
+            )
+        )
+        count, total = result.one()
+        return int(count), float(total)
+
+    async def rebuild(self, batch_size: int = 10000) -> int:
+        """Recompute every rollup from the alerts and patches tables.
+
+        Rows are streamed with a server-side cursor, so memory is bounded by
+        the number of buckets rather than rows. Returns the bucket count.
+        """
+        buckets: Dict[BucketKey, List[float]] = defaultdict(lambda: [0, 0.0])
+
+        def add(metric: str, at: datetime, total: float = 0.0):
+            _merge(buckets, [(metric, at, 1, total)])
+
+        alerts = await self.db.stream(
+            select(Alert.created_at, Alert.resolved_at, Alert.status, Alert.auto_resolved)
+            .execution_options(yield_per=batch_size)
+        )
+        async for created_at, resolved_at, status, auto_resolved in alerts:
+            if created_at is None:
+                continue
+            add(ALERTS_CREATED, created_at)
+            if status in CLOSED_ALERT_STATUSES and resolved_at is not None:
+                add(ALERTS_RESOLVED, resolved_at, max((as_utc(resolved_at) - as_utc(created_at)).total_seconds(), 0.0))
+                if auto_resolved:
+                    add(ALERTS_AUTO_RESOLVED, resolved_at)
+
+        patches = await self.db.stream(
+            select(Patch.status, Patch.deployed_at, Patch.updated_at)
+            .where(Patch.status.in_([PatchStatus.COMPLETED, PatchStatus.FAILED, PatchStatus.ROLLED_BACK]))
+            .execution_options(yield_per=batch_size)
+        )
+        async for status, deployed_at, updated_at in patches:
+            finished_at = deployed_at or updated_at
+            if finished_at is not None:
+                add(PATCHES_COMPLETED if status == PatchStatus.COMPLETED else PATCHES_FAILED, finished_at)
+
+        await self.db.execute(delete(MetricRollup))
+        rows = [
+            {"granularity": granularity, "metric": metric, "bucket_start": start, "count": count, "total": total}
+            for (granularity, metric, start), (count, total) in buckets.items()
+        ]
+        for offset in range(0, len(rows), batch_size):
+            await self.db.execute(self._insert(), rows[offset:offset + batch_size])
+        await self.db.commit()
+        return len(rows)
+
+
+rollups = RollupBuffer(settings.ROLLUP_FLUSH_INTERVAL_SECONDS)
@@ -0,0 +1,682 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import STAGE_LATENCY, timed
+from app.models.workflow import StepState, Workflow, WorkflowRun, WorkflowRunStatus
+from app.services.workflow_steps import STEP_TYPES, StepContext
+
+# step_states is a String(255): one character per step
+MAX_WORKFLOW_STEPS = 255
+# Rows per multi-row INSERT of new runs
+RUN_INSERT_CHUNK_SIZE = 1000
+
+PENDING = ord(StepState.PENDING.value)
+RUNNING = ord(StepState.RUNNING.value)
+SUCCEEDED = ord(StepState.SUCCEEDED.value)
+FAILED = ord(StepState.FAILED.value)
+SKIPPED = ord(StepState.SKIPPED.value)
+
+RunRequest = Tuple[Optional[int], Optional[Dict[str, Any]]]
+
+
+class WorkflowDefinitionError(ValueError):
+    """Raised for a workflow definition that cannot be run"""
+
+
+class WorkflowPlan:
+    """A validated definition with steps addressed by position.
+
+    ``dependencies[i]`` and ``dependents[i]`` hold step positions, so the
+    engine schedules with list lookups and keeps per-step state in one
+    byte per step.
+    """
+
+    def __init__(self, steps: List[Dict[str, Any]], dependencies: List[List[int]]):
+        self.steps = steps
+        self.dependencies = dependencies
+        self.dependents: List[List[int]] = [[] for _ in steps]
+        for index, required in enumerate(dependencies):
+            for dependency in required:
+                self.dependents[dependency].append(index)
+        self.histograms = [STAGE_LATENCY.labels(f"workflow.step.{step['type']}") for step in steps]
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def describe(self, step_states: str) -> Dict[str, str]:
+        """Step id -> state name, e.g. {"diagnose": "succeeded"}"""
+        return {
+            step["id"]: StepState(state).name.lower()
+            for step, state in zip(self.steps, step_states)
+        }
+
+
+def parse_definition(definition: Any) -> WorkflowPlan:
+    """Validate ``{"steps": [{"id", "type", "params", "depends_on", "retries", "timeout"}]}``"""
+    if not isinstance(definition, dict) or not isinstance(definition.get("steps"), list):
+        raise WorkflowDefinitionError("Definition must be an object with a list of steps")
+    raw_steps = definition["steps"]
+    if not raw_steps:
+        raise WorkflowDefinitionError("A workflow needs at least one step")
+    if len(raw_steps) > MAX_WORKFLOW_STEPS:
+        raise WorkflowDefinitionError(f"A workflow can have at most {MAX_WORKFLOW_STEPS} steps")
+
+    steps = []
+    position: Dict[str, int] = {}
+    for index, raw in enumerate(raw_steps):
+        if not isinstance(raw, dict) or not isinstance(raw.get("id"), str) or not raw["id"]:
+            raise WorkflowDefinitionError(f"Step {index} needs a string id")
+        step_id = raw["id"]
+        if step_id in position:
+            raise WorkflowDefinitionError(f"Duplicate step id: {step_id}")
+        if raw.get("type") not in STEP_TYPES:
+            raise WorkflowDefinitionError(
+                f"Step {step_id} has unknown type {raw.get('type')!r}; known types: {', '.join(sorted(STEP_TYPES))}"
+            )
+        params = raw.get("params") or {}
+        depends_on = raw.get("depends_on") or []
+        retries = raw.get("retries", 0)
+        timeout = raw.get("timeout")
+        if not isinstance(params, dict):
+            raise WorkflowDefinitionError(f"Step {step_id} params must be an object")
+        if not isinstance(depends_on, list) or not all(isinstance(dep, str) for dep in depends_on):
+            raise WorkflowDefinitionError(f"Step {step_id} depends_on must be a list of step ids")
+        if not isinstance(retries, int) or retries < 0:
+            raise WorkflowDefinitionError(f"Step {step_id} retries must be a non-negative integer")
+        if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+            raise WorkflowDefinitionError(f"Step {step_id} timeout must be a positive number of seconds")
+        position[step_id] = index
+        steps.append({
+            "id": step_id,
+            "type": raw["type"],
+            "params": params,
+            "depends_on": depends_on,
+            "retries": retries,
+            "timeout": timeout,
+        })
+
+    dependencies = []
+    for step in steps:
+        unknown = [dep for dep in step["depends_on"] if dep not in position]
+        if unknown:
+            raise WorkflowDefinitionError(f"Step {step['id']} depends on unknown steps: {', '.join(unknown)}")
+        dependencies.append(sorted({position[dep] for dep in step["depends_on"]}))
+
+    plan = WorkflowPlan(steps, dependencies)
+    # Kahn's algorithm: every step must become ready eventually
+    waiting = [len(required) for required in dependencies]
+    ready = [index for index, count in enumerate(waiting) if count == 0]
+    placed = 0
+    while ready:
+        index = ready.pop()
+        placed += 1
+        for dependent in plan.dependents[index]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                ready.append(dependent)
+    if placed < len(steps):
+        cyclic = [steps[index]["id"] for index, count in enumerate(waiting) if count > 0]
+        raise WorkflowDefinitionError(f"Step dependencies form a cycle through: {', '.join(cyclic)}")
+    return plan
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class WorkflowService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_workflows(self, skip: int = 0, limit: int = 100) -> List[Workflow]:
+        result = await self.db.execute(select(Workflow).order_by(Workflow.id).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    async def get_workflow(self, workflow_id: int) -> Optional[Workflow]:
+        result = await self.db.execute(select(Workflow).where(Workflow.id == workflow_id))
+        return result.scalar_one_or_none()
+
+    async def create_workflow(self, data: Dict[str, Any]) -> Workflow:
+        """Validate the definition and persist the workflow (raises WorkflowDefinitionError)"""
+        parse_definition(data["definition"])
+        workflow = Workflow(**data)
+        self.db.add(workflow)
+        await self.db.commit()
+        await self.db.refresh(workflow)
+        workflow_engine.invalidate_triggers()
+        return workflow
+
+    async def get_run(self, run_id: int) -> Optional[WorkflowRun]:
+        result = await self.db.execute(select(WorkflowRun).where(WorkflowRun.id == run_id))
+        return result.scalar_one_or_none()
+
+
+class _Run:
+    """In-memory state of a run this process is executing"""
+
+    __slots__ = (
+        "id", "workflow_id", "alert_id", "plan", "limit", "states", "context",
+        "status", "error", "started_at", "finished_at", "context_changed",
+    )
+
+    def __init__(
+        self,
+        run_id: int,
+        workflow_id: int,
+        alert_id: Optional[int],
+        plan: WorkflowPlan,
+        limit: int,
+        step_states: str,
+        context: Optional[Dict[str, Any]],
+        started_at: Optional[datetime] = None
+    ):
+        self.id = run_id
+        self.workflow_id = workflow_id
+        self.alert_id = alert_id
+        self.plan = plan
+        self.limit = limit
+        self.states = bytearray(step_states.encode("ascii"))
+        self.context = context if context is not None else {}
+        self.status = WorkflowRunStatus.RUNNING
+        self.error: Optional[str] = None
+        self.started_at = started_at or _now()
+        self.finished_at: Optional[datetime] = None
+        self.context_changed = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        step_states = self.states.decode("ascii")
+        return {
+            "id": self.id,
+            "workflow_id": self.workflow_id,
+            "alert_id": self.alert_id,
+            "status": self.status,
+            "step_states": step_states,
+            "steps": self.plan.describe(step_states),
+            "context": self.context,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class WorkflowEngine:
+    """Executes workflow runs as DAGs of concurrent steps in this process.
+
+    Each run starts every step whose dependencies succeeded, up to its
+    workflow's ``max_concurrency``; all runs share a global limit of
+    WORKFLOW_MAX_CONCURRENT_STEPS steps in flight. A failed step (after its
+    retries) skips everything downstream of it but lets independent
+    branches finish. Step state lives in memory and is written back for
+    all changed runs in one batched UPDATE per flush interval, so a
+    restart resumes from the last flush: steps caught RUNNING run again.
+
+    Runs are claimed from the database with a conditional UPDATE, so runs
+    created while this process is at WORKFLOW_MAX_ACTIVE_RUNS, or by
+    processes without a running engine (Celery enrichment workers), are
+    picked up by whichever engine polls first. A claimed run carries this
+    engine's ``owner`` id and a lease renewed every third of
+    WORKFLOW_LEASE_SECONDS; other engines only take over a RUNNING run
+    once its lease has expired, i.e. its owner died or stalled.
+    """
+
+    def __init__(self):
+        self._runs: Dict[int, _Run] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._dirty: Dict[int, _Run] = {}
+        self._plans: Dict[int, Tuple[Any, WorkflowPlan]] = {}
+        self._triggers: Optional[Dict[str, List[Workflow]]] = None
+        self._triggers_loaded = 0.0
+        self._slots = asyncio.Semaphore(settings.WORKFLOW_MAX_CONCURRENT_STEPS)
+        self._background: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.started = False
+        self.steps_running = 0
+        self.steps_executed = 0
+        self.runs_succeeded = 0
+        self.runs_failed = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+
+    async def start(self):
+        """Begin claiming runs: PENDING ones, and RUNNING ones whose owner's lease expired"""
+        self.started = True
+        self._wakeup = asyncio.Event()
+        self._background = [
+            asyncio.create_task(self._flush_loop(settings.WORKFLOW_STATE_FLUSH_INTERVAL_SECONDS)),
+            asyncio.create_task(self._heartbeat_loop(settings.WORKFLOW_LEASE_SECONDS / 3)),
+            asyncio.create_task(self._poll_loop(settings.WORKFLOW_POLL_INTERVAL_SECONDS)),
+        ]
+
+    async def stop(self):
+        """Cancel runs in flight, persist where they got to and hand them back as PENDING"""
+        self.started = False
+        for task in self._background:
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        self._background = []
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.flush()
+        # Let another engine resume them now rather than after the lease runs out
+        async with SessionLocal() as session:
+            await session.execute(
+                update(WorkflowRun)
+                .where(WorkflowRun.owner == self.owner, WorkflowRun.status == WorkflowRunStatus.RUNNING)
+                .values(status=WorkflowRunStatus.PENDING, owner=None, lease_expires_at=None)
+            )
+            await session.commit()
+
+    async def join(self):
+        """Wait for every run in this process to finish, then flush"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks.values()), return_exceptions=True)
+        await self.flush()
+
+    def invalidate_triggers(self):
+        self._triggers = None
+
+    def get_live(self, run_id: int) -> Optional[Dict[str, Any]]:
+        run = self._runs.get(run_id)
+        return run.as_dict() if run is not None else None
+
+    def plan(self, workflow: Workflow) -> WorkflowPlan:
+        """Compiled definition, cached until the workflow's updated_at changes"""
+        cached = self._plans.get(workflow.id)
+        if cached is not None and cached[0] == workflow.updated_at:
+            return cached[1]
+        plan = parse_definition(workflow.definition)
+        self._plans[workflow.id] = (workflow.updated_at, plan)
+        return plan
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "runs_running": len(self._tasks),
+            "runs_in_memory": len(self._runs),
+            "runs_succeeded": self.runs_succeeded,
+            "runs_failed": self.runs_failed,
+            "steps_running": self.steps_running,
+            "steps_executed": self.steps_executed,
+            "step_slots": settings.WORKFLOW_MAX_CONCURRENT_STEPS,
+            "state_flushes": self.flushes,
+            "state_rows_flushed": self.rows_flushed,
+        }
+
+    # Submitting
+
+    async def submit(
+        self,
+        workflow: Workflow,
+        alert_id: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> int:
+        return (await self.submit_many(workflow, [(alert_id, context)]))[0]
+
+    async def submit_many(self, workflow: Workflow, requests: Sequence[RunRequest]) -> List[int]:
+        """Create runs of one workflow and start as many as capacity allows; returns run ids"""
+        async with SessionLocal() as session:
+            return await self._create_runs(session, [(workflow, alert_id, context) for alert_id, context in requests])
+
+    async def trigger_for_alerts(self, alerts: Iterable[Tuple[int, Optional[str]]]) -> List[int]:
+        """Start every enabled workflow whose trigger matches each (alert_id, classification)"""
+        alerts = [(alert_id, classification) for alert_id, classification in alerts if classification]
+        if not alerts:
+            return []
+        async with SessionLocal() as session:
+            triggers = await self._load_triggers(session)
+            requests = [
+                (workflow, alert_id, {"classification": classification})
+                for alert_id, classification in alerts
+                for workflow in triggers.get(classification, ())
+            ]
+            if not requests:
+                return []
+            return await self._create_runs(session, requests)
+
+    async def _load_triggers(self, session: AsyncSession) -> Dict[str, List[Workflow]]:
+        if self._triggers is None or time.monotonic() - self._triggers_loaded > settings.WORKFLOW_TRIGGER_CACHE_SECONDS:
+            result = await session.execute(
+                select(Workflow).where(Workflow.enabled.is_(True), Workflow.trigger_classification.is_not(None))
+            )
+            triggers: Dict[str, List[Workflow]] = {}
+            for workflow in result.scalars().all():
+                triggers.setdefault(workflow.trigger_classification, []).append(workflow)
+            self._triggers = triggers
+            self._triggers_loaded = time.monotonic()
+        return self._triggers
+
+    @timed("db.workflow_engine.create_runs")
+    async def _create_runs(
+        self,
+        session: AsyncSession,
+        requests: List[Tuple[Workflow, Optional[int], Optional[Dict[str, Any]]]]
+    ) -> List[int]:
+        # Runs beyond this process's capacity are left PENDING for the poller
+        capacity = settings.WORKFLOW_MAX_ACTIVE_RUNS - len(self._runs) if self.started else 0
+        started_at = _now()
+        lease_expires_at = started_at + timedelta(seconds=settings.WORKFLOW_LEASE_SECONDS)
+        rows = []
+        for position, (workflow, alert_id, context) in enumerate(requests):
+            local = position < capacity
+            rows.append({
+                "workflow_id": workflow.id,
+                "alert_id": alert_id,
+                "status": WorkflowRunStatus.RUNNING if local else WorkflowRunStatus.PENDING,
+                "step_states": StepState.PENDING.value * len(self.plan(workflow)),
+                "context": context or {},
+                "started_at": started_at if local else None,
+                "owner": self.owner if local else None,
+                "lease_expires_at": lease_expires_at if local else None,
+            })
+
+        run_ids: List[int] = []
+        for offset in range(0, len(rows), RUN_INSERT_CHUNK_SIZE):
+            result = await session.execute(
+                insert(WorkflowRun).returning(WorkflowRun.id, sort_by_parameter_order=True),
+                rows[offset:offset + RUN_INSERT_CHUNK_SIZE]
+            )
+            run_ids.extend(result.scalars().all())
+        await session.commit()
+
+        for run_id, row, (workflow, alert_id, _) in zip(run_ids, rows, requests):
+            if row["status"] == WorkflowRunStatus.RUNNING:
+                self._start(_Run(
+                    run_id, workflow.id, alert_id, self.plan(workflow), self._limit(workflow),
+                    row["step_states"], row["context"], started_at,
+                ))
+        if len(run_ids) > capacity and self._wakeup is not None:
+            self._wakeup.set()
+        return run_ids
+
+    def _limit(self, workflow: Workflow) -> int:
+        return workflow.max_concurrency or settings.WORKFLOW_DEFAULT_STEP_CONCURRENCY
+
+    # Claiming
+
+    async def _poll_loop(self, interval: float):
+        while True:
+            try:
+                while await self.claim():
+                    pass
+            except Exception as e:
+                print(f"Workflow run polling failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _heartbeat_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                print(f"Workflow lease renewal failed: {e}")
+
+    async def heartbeat(self):
+        """Extend the lease on every run this engine owns; abandon runs another engine took over"""
+        owned = set(self._tasks)
+        async with SessionLocal() as session:
+            result = await session.execute(
+                update(WorkflowRun)
+                .where(WorkflowRun.owner == self.owner, WorkflowRun.status == WorkflowRunStatus.RUNNING)
+                .values(lease_expires_at=_now() + timedelta(seconds=settings.WORKFLOW_LEASE_SECONDS))
+                .returning(WorkflowRun.id)
+                .execution_options(synchronize_session=False)
+            )
+            renewed = set(result.scalars().all())
+            await session.commit()
+        for run_id in owned - renewed:
+            task = self._tasks.get(run_id)
+            run = self._runs.get(run_id)
+            if task is None or run is None or run.finished_at is not None:
+                continue
+            print(f"Workflow run {run_id} lost its lease; leaving it to its new owner")
+            task.cancel()
+            task.add_done_callback(lambda _, run_id=run_id: self._forget(run_id))
+
+    def _forget(self, run_id: int):
+        self._runs.pop(run_id, None)
+        self._dirty.pop(run_id, None)
+
+    @timed("db.workflow_engine.claim")
+    async def claim(self) -> int:
+        """Take up to the free capacity of claimable runs and start them; returns how many"""
+        capacity = settings.WORKFLOW_MAX_ACTIVE_RUNS - len(self._runs)
+        if capacity <= 0:
+            return 0
+        started_at = _now()
+        claimable = or_(
+            WorkflowRun.status == WorkflowRunStatus.PENDING,
+            and_(
+                WorkflowRun.status == WorkflowRunStatus.RUNNING,
+                or_(WorkflowRun.lease_expires_at.is_(None), WorkflowRun.lease_expires_at < started_at),
+            ),
+        )
+        async with SessionLocal() as session:
+            pending = (
+                select(WorkflowRun.id)
+                .where(claimable)
+                .order_by(WorkflowRun.id)
+                .limit(min(capacity, RUN_INSERT_CHUNK_SIZE))
+            )
+            # Re-checking the condition in the UPDATE itself makes concurrent claimers skip each other's rows
+            result = await session.execute(
+                update(WorkflowRun)
+                .where(WorkflowRun.id.in_(pending.scalar_subquery()), claimable)
+                .values(
+                    status=WorkflowRunStatus.RUNNING,
+                    started_at=func.coalesce(WorkflowRun.started_at, started_at),
+                    owner=self.owner,
+                    lease_expires_at=started_at + timedelta(seconds=settings.WORKFLOW_LEASE_SECONDS),
+                )
+                .returning(WorkflowRun.id, WorkflowRun.workflow_id, WorkflowRun.alert_id,
+                           WorkflowRun.step_states, WorkflowRun.context, WorkflowRun.started_at)
+                .execution_options(synchronize_session=False)
+            )
+            claimed = result.all()
+            workflow_ids = {row.workflow_id for row in claimed}
+            workflows = {}
+            if workflow_ids:
+                workflows = {
+                    workflow.id: workflow
+                    for workflow in (await session.execute(
+                        select(Workflow).where(Workflow.id.in_(workflow_ids))
+                    )).scalars().all()
+                }
+            await session.commit()
+
+        for row in claimed:
+            workflow = workflows[row.workflow_id]
+            try:
+                plan = self.plan(workflow)
+            except WorkflowDefinitionError as e:
+                plan, error = WorkflowPlan([], []), f"Invalid workflow definition: {e}"
+            else:
+                error = None if len(plan) == len(row.step_states) else "Workflow definition changed during the run"
+            run = _Run(
+                row.id, row.workflow_id, row.alert_id, plan, self._limit(workflow),
+                row.step_states, row.context, row.started_at,
+            )
+            if error is not None:
+                self._finish(run, WorkflowRunStatus.FAILED, error)
+                continue
+            self._start(run)
+        return len(claimed)
+
+    # Executing
+
+    def _start(self, run: _Run):
+        self._runs[run.id] = run
+        task = asyncio.create_task(self._execute(run))
+        self._tasks[run.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(run.id, None))
+
+    async def _execute(self, run: _Run):
+        plan = run.plan
+        states = run.states
+        waiting = [0] * len(plan)
+        for index in range(len(plan)):
+            if states[index] == RUNNING:
+                # Interrupted by a restart: run it again
+                states[index] = PENDING
+            waiting[index] = sum(states[dependency] != SUCCEEDED for dependency in plan.dependencies[index])
+        for index in range(len(plan)):
+            if states[index] == FAILED:
+                self._skip_downstream(run, index)
+        ready = [index for index in range(len(plan)) if states[index] == PENDING and waiting[index] == 0]
+        ready.reverse()
+
+        running: Dict[asyncio.Task, int] = {}
+        try:
+            while ready or running:
+                while ready and len(running) < run.limit:
+                    index = ready.pop()
+                    states[index] = RUNNING
+                    running[asyncio.create_task(self._run_step(run, index))] = index
+                self._mark(run)
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = running.pop(task)
+                    error = task.result()
+                    if error is None:
+                        states[index] = SUCCEEDED
+                        for dependent in plan.dependents[index]:
+                            waiting[dependent] -= 1
+                            if waiting[dependent] == 0 and states[dependent] == PENDING:
+                                ready.append(dependent)
+                    else:
+                        states[index] = FAILED
+                        run.error = error if run.error is None else f"{run.error}; {error}"
+                        self._skip_downstream(run, index)
+        except asyncio.CancelledError:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            # Steps stay RUNNING in the persisted state and rerun on resume
+            self._mark(run)
+            raise
+        except Exception as e:
+            print(f"Workflow run {run.id} crashed: {e}")
+            run.error = str(e)
+            self._finish(run, WorkflowRunStatus.FAILED, run.error)
+            return
+
+        failed = FAILED in states
+        self._finish(run, WorkflowRunStatus.FAILED if failed else WorkflowRunStatus.SUCCEEDED, run.error)
+
+    def _skip_downstream(self, run: _Run, index: int):
+        pending = list(run.plan.dependents[index])
+        while pending:
+            dependent = pending.pop()
+            if run.states[dependent] == PENDING:
+                run.states[dependent] = SKIPPED
+                pending.extend(run.plan.dependents[dependent])
+
+    async def _run_step(self, run: _Run, index: int) -> Optional[str]:
+        """Run one step with its retries and timeout; returns an error message or None"""
+        step = run.plan.steps[index]
+        handler = STEP_TYPES[step["type"]]
+        histogram = run.plan.histograms[index]
+        context = StepContext(run.id, run.alert_id, run.context)
+        error = None
+        for _ in range(step["retries"] + 1):
+            async with self._slots:
+                self.steps_running += 1
+                started = time.perf_counter()
+                try:
+                    if step["timeout"]:
+                        output = await asyncio.wait_for(handler(step["params"], context), step["timeout"])
+                    else:
+                        output = await handler(step["params"], context)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    error = f"{step['id']}: {str(e) or type(e).__name__}"
+                    continue
+                finally:
+                    self.steps_running -= 1
+                    self.steps_executed += 1
+                    histogram.observe(time.perf_counter() - started)
+            if output is not None:
+                run.context.setdefault("outputs", {})[step["id"]] = output
+                run.context_changed = True
+            return None
+        return error
+
+    def _finish(self, run: _Run, status: WorkflowRunStatus, error: Optional[str] = None):
+        run.status = status
+        run.error = error
+        run.finished_at = _now()
+        if status == WorkflowRunStatus.SUCCEEDED:
+            self.runs_succeeded += 1
+        else:
+            self.runs_failed += 1
+        # Keep the run in memory until its final state is flushed
+        self._runs[run.id] = run
+        self._mark(run)
+
+    # Persisting
+
+    def _mark(self, run: _Run):
+        self._dirty[run.id] = run
+
+    async def _flush_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Workflow state flush failed: {e}")
+
+    async def flush(self):
+        """Write every changed run in one executemany UPDATE per column set"""
+        if not self._dirty:
+            return
+        runs = list(self._dirty.values())
+        self._dirty = {}
+        batches: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for run in runs:
+            row = {"id": run.id, "status": run.status, "step_states": run.states.decode("ascii")}
+            if run.finished_at is not None:
+                row["error"] = run.error
+                row["finished_at"] = run.finished_at
+            if run.context_changed or run.finished_at is not None:
+                row["context"] = dict(run.context)
+                run.context_changed = False
+            batches.setdefault(tuple(row), []).append(row)
+
+        try:
+            async with SessionLocal() as session:
+                for rows in batches.values():
+                    # Never overwrite a run another engine has taken over
+                    await session.execute(update(WorkflowRun).where(WorkflowRun.owner == self.owner), rows)
+                await session.commit()
+        except BaseException:
+            # Put them back (unless changed again meanwhile) for the next flush
+            for run in runs:
+                self._dirty.setdefault(run.id, run)
+                run.context_changed = True
+            raise
+        self.flushes += 1
+        self.rows_flushed += len(runs)
+        for run in runs:
+            if run.finished_at is not None and run.id not in self._dirty:
+                self._runs.pop(run.id, None)
+
+
+workflow_engine = WorkflowEngine()
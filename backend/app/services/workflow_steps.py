@@ -0,0 +1,111 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.patch import ACTIVE_DEPLOYMENT_STATUSES, PatchDeployment, PatchStatus
+from app.services.alert_service import AlertService
+from app.services.patch_rollout import PatchRolloutService, rollout_manager
+
+
+class StepError(Exception):
+    """Raised by a step to fail it with a readable message"""
+
+
+class StepContext:
+    """What a step knows about the run it belongs to.
+
+    ``data`` is the run's JSON context; steps may read it and the engine
+    stores each step's (JSON-serializable) return value under
+    ``data["outputs"][step_id]``.
+    """
+
+    def __init__(self, run_id: int, alert_id: Optional[int], data: Dict[str, Any]):
+        self.run_id = run_id
+        self.alert_id = alert_id
+        self.data = data
+
+
+StepHandler = Callable[[Dict[str, Any], StepContext], Awaitable[Any]]
+
+STEP_TYPES: Dict[str, StepHandler] = {}
+
+
+def step_type(name: str):
+    """Register an async ``handler(params, context)`` as a workflow step type"""
+    def decorator(handler: StepHandler) -> StepHandler:
+        STEP_TYPES[name] = handler
+        return handler
+
+    return decorator
+
+
+@step_type("noop")
+async def noop(params: Dict[str, Any], context: StepContext):
+    return None
+
+
+@step_type("sleep")
+async def sleep(params: Dict[str, Any], context: StepContext):
+    await asyncio.sleep(float(params.get("seconds", 0)))
+
+
+@step_type("resolve_alert")
+async def resolve_alert(params: Dict[str, Any], context: StepContext):
+    """Resolve ``params.alert_id``, or the alert that triggered the run"""
+    alert_id = params.get("alert_id", context.alert_id)
+    if alert_id is None:
+        raise StepError("No alert_id param and the run was not triggered by an alert")
+    async with SessionLocal() as session:
+        alert = await AlertService(session).resolve_alert(int(alert_id))
+    if alert is None:
+        raise StepError(f"Alert {alert_id} not found")
+    return {"alert_id": alert.id, "status": alert.status.value}
+
+
+@step_type("deploy_patch")
+async def deploy_patch(params: Dict[str, Any], context: StepContext):
+    """Roll out ``params.patch_id`` and, unless ``wait`` is false, wait for it to finish.
+
+    An active deployment of the patch is waited on rather than duplicated.
+    Other params (targets, canary_size, wave_size, concurrency,
+    failure_threshold) default like POST /patches/{id}/deploy.
+    """
+    if "patch_id" not in params:
+        raise StepError("deploy_patch needs a patch_id param")
+    async with SessionLocal() as session:
+        service = PatchRolloutService(session)
+        patch = await service.get_patch(int(params["patch_id"]))
+        if patch is None:
+            raise StepError(f"Patch {params['patch_id']} not found")
+        deployment = await service.get_active_deployment(patch.id)
+        if deployment is None:
+            hosts = params.get("targets") or patch.target_systems or []
+            if not hosts or not all(isinstance(host, str) and host for host in hosts):
+                raise StepError(f"Patch {patch.id} has no valid target systems to deploy to")
+            deployment = await service.create_deployment(
+                patch,
+                list(dict.fromkeys(hosts)),
+                executor=settings.PATCH_EXECUTOR,
+                canary_size=params.get("canary_size", settings.PATCH_ROLLOUT_CANARY_SIZE),
+                wave_size=params.get("wave_size") or settings.PATCH_ROLLOUT_WAVE_SIZE,
+                concurrency=params.get("concurrency") or settings.PATCH_ROLLOUT_CONCURRENCY,
+                failure_threshold=params.get("failure_threshold", settings.PATCH_ROLLOUT_FAILURE_THRESHOLD),
+            )
+            rollout_manager.start(deployment.id, deployment.executor)
+        deployment_id = deployment.id
+
+    if not params.get("wait", True):
+        return {"deployment_id": deployment_id}
+    while True:
+        await asyncio.sleep(settings.WORKFLOW_POLL_INTERVAL_SECONDS)
+        # A fresh session per poll so each check sees the latest commit
+        async with SessionLocal() as session:
+            status = await session.scalar(select(PatchDeployment.status).where(PatchDeployment.id == deployment_id))
+        if status not in ACTIVE_DEPLOYMENT_STATUSES:
+            break
+    if status != PatchStatus.COMPLETED:
+        raise StepError(f"Deployment {deployment_id} ended {status.value if status else 'missing'}")
+    return {"deployment_id": deployment_id, "status": status.value}
@@ -0,0 +1,42 @@
+import asyncio
+import time
+from typing import Any, Dict
+
+import redis
+
+from app.core.celery import celery_app
+from app.core.config import settings
+from app.services.enrichment import CeleryEnrichmentBackend, enrich_alert
+
+# One event loop per worker process so the async engine's pooled
+# connections stay bound to the loop that created them.
+_loop = asyncio.new_event_loop()
+_metrics = redis.Redis.from_url(settings.REDIS_URL)
+
+
+def _record(job: Dict[str, Any], succeeded: bool):
+    lag = time.time() - job["enqueued_at"]
+    key = CeleryEnrichmentBackend.metrics_key
+    pipe = _metrics.pipeline()
+    pipe.hincrby(key, "processed" if succeeded else "failed", 1)
+    pipe.hincrbyfloat(key, "total_lag", lag)
+    pipe.hset(key, "last_lag", lag)
+    pipe.execute()
+    # Not atomic across workers, but good enough for a high-water mark
+    current_max = float(_metrics.hget(key, "max_lag") or 0)
+    if lag > current_max:
+        _metrics.hset(key, "max_lag", lag)
+
+
+@celery_app.task(bind=True, name="alerts.enrich", max_retries=3, default_retry_delay=5)
+def enrich_alert_task(self, job: Dict[str, Any]):
+    """Classify an alert persisted by POST /alerts in background mode"""
+    try:
+        succeeded = _loop.run_until_complete(enrich_alert(job))
+    except Exception as e:
+        # Counted once, when the last retry has failed too
+        if self.request.retries >= self.max_retries:
+            _record(job, False)
+        raise self.retry(exc=e)
+    _record(job, succeeded)
+    return succeeded
@@ -0,0 +1,97 @@
+"""Load test for micro-batched alert analysis against a fake model.
+
+    cd backend && python -m benchmarks.bench_alert_batching --alerts 1000 --window 0.5
+
+Fires ``--alerts`` analyze_alert calls spread over ``--window`` seconds,
+once unbatched and once through the batcher, and reports model calls per
+alert plus p50/p99 latency.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import time
+
+from app.core.config import settings
+from app.services.ai_batcher import AlertBatcher
+from app.services.ai_client import AIClient
+from app.services.ai_service import AIService
+
+ALERT_MARKER = re.compile(r"Alert (\d+):")
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """Answers single and multi-alert prompts with a fixed base latency"""
+
+    def __init__(self, latency: float, per_item_latency: float):
+        self.latency = latency
+        self.per_item_latency = per_item_latency
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls += 1
+        indexes = [int(i) for i in ALERT_MARKER.findall(prompt)]
+        await asyncio.sleep(self.latency + self.per_item_latency * max(len(indexes), 1))
+        item = {"priority_score": 60, "classification": "performance", "suggested_action": "Investigate"}
+        if not indexes:
+            return _Response(json.dumps(item))
+        return _Response(json.dumps([dict(item, index=i) for i in indexes]))
+
+
+async def run_scenario(alerts: int, window: float, batched: bool, args) -> None:
+    model = FakeModel(args.latency, args.per_item_latency)
+    client = AIClient(model=model, max_concurrency=settings.GEMINI_MAX_CONCURRENCY, timeout=60)
+    client.start()
+
+    batcher = None
+    if batched:
+        batcher = AlertBatcher(
+            lambda items: AIService(client).analyze_alerts(items),
+            max_batch_size=args.batch_size,
+            max_wait_ms=args.wait_ms,
+        )
+    service = AIService(client)
+    service.batcher = batcher  # None disables batching regardless of AI_BATCH_ENABLED
+
+    latencies = []
+
+    async def one(i: int):
+        await asyncio.sleep(random.uniform(0, window))
+        start = time.perf_counter()
+        await service.analyze_alert(f"Disk latency high on db-{i}", "p99 write latency above 200ms")
+        latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(alerts)))
+    client.close()
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    label = f"batched (max {args.batch_size}, {args.wait_ms}ms)" if batched else "unbatched"
+    print(f"{label}:")
+    print(f"  model calls: {model.calls}, calls/alert: {model.calls / alerts:.3f}")
+    print(f"  p50: {statistics.median(latencies) * 1000:.1f}ms, p99: {p99 * 1000:.1f}ms")
+
+
+async def main(args):
+    random.seed(0)
+    await run_scenario(args.alerts, args.window, False, args)
+    random.seed(0)
+    await run_scenario(args.alerts, args.window, True, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alerts", type=int, default=1000)
+    parser.add_argument("--window", type=float, default=0.5, help="seconds over which alerts arrive")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake model base latency in seconds")
+    parser.add_argument("--per-item-latency", type=float, default=0.005)
+    parser.add_argument("--batch-size", type=int, default=settings.AI_BATCH_MAX_SIZE)
+    parser.add_argument("--wait-ms", type=int, default=settings.AI_BATCH_MAX_WAIT_MS)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,104 @@
+"""Rows/sec and peak memory of GET /alerts/export over a large range.
+
+    cd backend && python -m benchmarks.bench_alert_export --alerts 2000000 --format csv
+
+Seeds synthetic alerts into a throwaway SQLite database (requires
+aiosqlite), then drains the export stream while tracemalloc tracks the
+peak Python allocation. Exits non-zero when the peak exceeds
+--max-peak-mb: memory must stay bounded by the batch size, not the row
+count. Point DATABASE_URL at a scratch Postgres to measure asyncpg.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_file}")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.api.v1.endpoints.alerts import ALERT_LIST_FIELDS  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.database import ReadSessionLocal, SessionLocal, init_db  # noqa: E402
+from app.models.alert import Alert, AlertSeverity, AlertStatus  # noqa: E402
+from app.services.alert_export import CURSOR_COLUMN, EXPORT_WRITERS, with_cursors  # noqa: E402
+from app.services.alert_service import AlertService  # noqa: E402
+
+SEED_CHUNK = 10000
+SEVERITIES = list(AlertSeverity)
+STATUSES = list(AlertStatus)
+
+
+async def seed(count: int):
+    origin = datetime.utcnow() - timedelta(days=180)
+    async with SessionLocal() as session:
+        for offset in range(0, count, SEED_CHUNK):
+            await session.execute(insert(Alert), [
+                {
+                    "title": f"Disk usage above 90% on app-{i % 5000}",
+                    "description": "Filesystem /var is nearly full; log rotation may have stalled.",
+                    "severity": SEVERITIES[i % len(SEVERITIES)],
+                    "status": STATUSES[i % len(STATUSES)],
+                    "source_system": "bench",
+                    "source_id": f"disk-{i}",
+                    "ai_priority_score": i % 100,
+                    "created_at": origin + timedelta(seconds=i * 7),
+                }
+                for i in range(offset, min(offset + SEED_CHUNK, count))
+            ])
+            await session.commit()
+
+
+async def export(fmt: str):
+    rows = 0
+    size = 0
+
+    async def counted(batches):
+        nonlocal rows
+        async for batch in batches:
+            rows += len(batch)
+            yield batch
+
+    async with ReadSessionLocal() as session:
+        batches = AlertService(session).stream_alert_rows(
+            ALERT_LIST_FIELDS, batch_size=settings.ALERT_EXPORT_BATCH_SIZE
+        )
+        async for chunk in EXPORT_WRITERS[fmt](with_cursors(counted(batches)), (*ALERT_LIST_FIELDS, CURSOR_COLUMN)):
+            size += len(chunk)
+    return rows, size
+
+
+async def run(args):
+    await init_db()
+    start = time.perf_counter()
+    await seed(args.alerts)
+    print(f"seeded {args.alerts:,} alerts in {time.perf_counter() - start:.1f}s")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows, size = await export(args.format)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    peak_mb = peak / 1024 / 1024
+    print(f"{args.format}: {rows:,} rows, {size / 1024 / 1024:,.1f} MiB in {elapsed:.1f}s "
+          f"({rows / elapsed:,.0f} rows/s)")
+    print(f"peak traced memory: {peak_mb:,.1f} MiB (batch size {settings.ALERT_EXPORT_BATCH_SIZE})")
+    if rows != args.alerts:
+        sys.exit(f"exported {rows:,} rows, expected {args.alerts:,}")
+    if peak_mb > args.max_peak_mb:
+        sys.exit(f"peak memory {peak_mb:,.1f} MiB exceeds {args.max_peak_mb} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alerts", type=int, default=2000000)
+    parser.add_argument("--format", choices=sorted(EXPORT_WRITERS), default="ndjson")
+    parser.add_argument("--max-peak-mb", type=float, default=64.0)
+    asyncio.run(run(parser.parse_args()))
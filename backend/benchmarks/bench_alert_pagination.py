@@ -0,0 +1,88 @@
+"""Page-N latency of GET /alerts listings: OFFSET versus keyset cursor.
+
+    cd backend && python -m benchmarks.bench_alert_pagination --rows 1000000 --page 500
+
+Seeds ``--rows`` alerts into a throwaway SQLite database (requires
+aiosqlite) unless DATABASE_URL points elsewhere, then times fetching page
+``--page`` with ``skip`` and with the cursor handed back by page ``--page - 1``.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_file}")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.database import SessionLocal, engine, init_db  # noqa: E402
+from app.models.alert import Alert, AlertSeverity, AlertStatus  # noqa: E402
+from app.services.alert_service import AlertService  # noqa: E402
+
+
+async def seed(rows: int, chunk: int = 10000):
+    start = datetime.now(timezone.utc) - timedelta(days=90)
+    severities, statuses = list(AlertSeverity), list(AlertStatus)
+    random.seed(0)
+    async with engine.begin() as conn:
+        for offset in range(0, rows, chunk):
+            await conn.execute(insert(Alert), [
+                {
+                    "title": f"Synthetic alert {i}",
+                    "severity": random.choice(severities),
+                    "status": random.choice(statuses),
+                    "source_system": "bench",
+                    "ai_priority_score": 50,
+                    "created_at": start + timedelta(seconds=i * 7),
+                }
+                for i in range(offset, min(offset + chunk, rows))
+            ])
+
+
+async def time_page(repeats: int, **kwargs) -> float:
+    samples = []
+    for _ in range(repeats):
+        async with SessionLocal() as session:
+            begin = time.perf_counter()
+            await AlertService(session).get_alerts(**kwargs)
+            samples.append(time.perf_counter() - begin)
+    return statistics.median(samples) * 1000
+
+
+async def run(rows: int, page: int, limit: int, repeats: int, status):
+    await init_db()
+    begin = time.perf_counter()
+    await seed(rows)
+    print(f"seeded {rows:,} alerts in {time.perf_counter() - begin:.1f}s")
+
+    # Walk to the page before the target to obtain its cursor
+    after = None
+    async with SessionLocal() as session:
+        service = AlertService(session)
+        for _ in range(page - 1):
+            alerts = await service.get_alerts(limit=limit, status=status, after=after)
+            after = (alerts[-1].created_at, alerts[-1].id)
+            session.expunge_all()
+
+    offset_ms = await time_page(repeats, skip=(page - 1) * limit, limit=limit, status=status)
+    cursor_ms = await time_page(repeats, limit=limit, status=status, after=after)
+    label = f"status={status.value}" if status else "unfiltered"
+    print(f"page {page} x {limit} rows ({label}), median of {repeats}:")
+    print(f"  offset: {offset_ms:8.2f}ms")
+    print(f"  cursor: {cursor_ms:8.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--status", type=AlertStatus, default=None)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.page, args.limit, args.repeats, args.status))
@@ -0,0 +1,93 @@
+"""Latency of GET /alerts/search over a large alerts table.
+
+    cd backend && DATABASE_URL=postgresql://... python -m benchmarks.bench_alert_search --alerts 5000000
+
+Against PostgreSQL (after ``alembic upgrade head``, or on a fresh database
+created by init_db) this exercises the tsvector and trigram GIN indexes.
+Without DATABASE_URL it runs on a throwaway SQLite database through the
+in-process fallback index; use a smaller --alerts there, and note the
+first query includes building the index.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_file}")
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.core.database import SessionLocal, init_db  # noqa: E402
+from app.models.alert import Alert, AlertSeverity, AlertStatus  # noqa: E402
+from app.services.alert_search import AlertSearchService  # noqa: E402
+
+SEED_CHUNK = 10000
+COMPONENTS = ["disk", "memory", "cpu", "database", "network", "certificate", "backup", "queue", "cache", "dns"]
+SYMPTOMS = ["usage above threshold", "latency spike", "connection refused", "timeout", "expired",
+            "replication lag", "pool exhausted", "packet loss", "failed health check", "high error rate"]
+QUERIES = ["disk usage", "replication lag", "certificate expired", "connection refused database",
+           "databse", "latncy spike", "netwrk packet loss", "pool exhausted on app-42"]
+
+
+async def seed(count: int, seed: int):
+    rng = random.Random(seed)
+    origin = datetime.utcnow() - timedelta(days=365)
+    severities, statuses = list(AlertSeverity), list(AlertStatus)
+    async with SessionLocal() as session:
+        existing = await session.scalar(select(func.count(Alert.id)))
+        for offset in range(existing, count, SEED_CHUNK):
+            rows = []
+            for i in range(offset, min(offset + SEED_CHUNK, count)):
+                component, symptom = rng.choice(COMPONENTS), rng.choice(SYMPTOMS)
+                rows.append({
+                    "title": f"{component.capitalize()} {symptom} on app-{rng.randrange(500)}",
+                    "description": f"{rng.choice(COMPONENTS)} {rng.choice(SYMPTOMS)} reported by monitoring agent",
+                    "severity": rng.choice(severities),
+                    "status": rng.choice(statuses),
+                    "source_system": "bench",
+                    "created_at": origin + timedelta(seconds=i * 6),
+                })
+            await session.execute(insert(Alert), rows)
+            await session.commit()
+
+
+async def run(args):
+    await init_db()
+    start = time.perf_counter()
+    await seed(args.alerts, args.seed)
+    print(f"{args.alerts:,} alerts ready in {time.perf_counter() - start:.1f}s")
+
+    columns = ("id", "title", "severity", "status", "created_at")
+    async with SessionLocal() as session:
+        service = AlertSearchService(session)
+        start = time.perf_counter()
+        await service.search(QUERIES[0], columns, limit=args.limit)
+        print(f"first query (cold): {(time.perf_counter() - start) * 1000:,.0f}ms")
+
+        for query in QUERIES:
+            first, second = [], []
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                rows = await service.search(query, columns, limit=args.limit)
+                first.append(time.perf_counter() - start)
+                if rows:
+                    start = time.perf_counter()
+                    await service.search(query, columns, limit=args.limit, after=(rows[-1]["score"], rows[-1]["id"]))
+                    second.append(time.perf_counter() - start)
+            p95 = sorted(first)[int(len(first) * 0.95) - 1] if len(first) > 1 else first[0]
+            print(f"{query!r:<32} p50 {statistics.median(first) * 1000:>7.1f}ms  p95 {p95 * 1000:>7.1f}ms  "
+                  f"page 2 p50 {statistics.median(second) * 1000 if second else 0:>7.1f}ms  ({len(rows)} hits)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alerts", type=int, default=5000000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
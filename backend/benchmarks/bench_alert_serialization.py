@@ -0,0 +1,82 @@
+"""Serialized alerts/sec for a limit=1000 listing page.
+
+    cd backend && python -m benchmarks.bench_alert_serialization --alerts 1000
+
+Compares the previous path (ORM entities validated into AlertResponse and
+rendered by the stock JSON encoder) with column rows rendered by orjson,
+including a trimmed ``fields=id,title,severity,status`` projection. Runs
+against a throwaway SQLite database (requires aiosqlite).
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_file}")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.api.v1.endpoints.alerts import ALERT_LIST_FIELDS  # noqa: E402
+from app.core.database import SessionLocal, init_db  # noqa: E402
+from app.core.responses import FastJSONResponse  # noqa: E402
+from app.schemas.alert import AlertCreate, AlertResponse  # noqa: E402
+from app.services.alert_service import AlertService  # noqa: E402
+
+
+async def seed(count: int):
+    alerts = [
+        AlertCreate(
+            title=f"Disk usage above 90% on app-{i}",
+            description="Filesystem /var is nearly full; log rotation may have stalled.",
+            source_system="bench",
+            source_id=f"disk-{i}",
+        )
+        for i in range(count)
+    ]
+    async with SessionLocal() as session:
+        await AlertService(session).create_alerts(alerts, ai_analyses=[{"priority_score": 50}] * count)
+
+
+async def orm_pydantic(service: AlertService, limit: int) -> int:
+    alerts = await service.get_alerts(limit=limit)
+    content = jsonable_encoder([AlertResponse.model_validate(alert) for alert in alerts])
+    return len(JSONResponse(content).body)
+
+
+async def rows_orjson(service: AlertService, limit: int, fields) -> int:
+    rows = await service.get_alert_rows(fields, limit=limit)
+    return len(FastJSONResponse(rows).body)
+
+
+async def measure(label: str, rounds: int, limit: int, call):
+    async with SessionLocal() as session:
+        service = AlertService(session)
+        size = await call(service)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await call(service)
+        elapsed = time.perf_counter() - start
+    print(f"{label:<28} {rounds * limit / elapsed:>10,.0f} alerts/s  {size / 1024:>7,.1f} KiB/page")
+
+
+async def run(args):
+    await init_db()
+    await seed(args.alerts)
+    limit = min(args.alerts, 1000)
+
+    await measure("ORM + pydantic", args.rounds, limit, lambda s: orm_pydantic(s, limit))
+    await measure("rows + orjson", args.rounds, limit, lambda s: rows_orjson(s, limit, ALERT_LIST_FIELDS))
+    await measure(
+        "rows + orjson (4 fields)", args.rounds, limit,
+        lambda s: rows_orjson(s, limit, ("id", "title", "severity", "status"))
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alerts", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
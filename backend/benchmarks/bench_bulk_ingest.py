@@ -0,0 +1,93 @@
+"""Rows/sec of POST /api/v1/alerts/bulk versus looping POST /api/v1/alerts.
+
+    cd backend && python -m benchmarks.bench_bulk_ingest --rows 5000
+
+Runs against a throwaway SQLite database (requires aiosqlite); point
+DATABASE_URL at a scratch Postgres to measure the asyncpg path instead.
+The AI client is replaced with an instant stub so only ingest cost is
+measured.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_file}")
+
+import httpx  # noqa: E402
+
+from app.core.database import init_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.ai_client import ai_client  # noqa: E402
+
+
+class _Response:
+    text = json.dumps({"priority_score": 50, "classification": "software", "suggested_action": "Review"})
+
+
+class InstantModel:
+    async def generate_content_async(self, prompt, **kwargs):
+        return _Response()
+
+
+def make_alerts(rows: int, offset: int = 0):
+    return [
+        {
+            "title": f"Service check failed on app-{i}",
+            "description": "HTTP 500 from health endpoint",
+            "severity": "high",
+            "source_system": "nagios",
+            "source_id": str(offset + i),
+        }
+        for i in range(rows)
+    ]
+
+
+async def run(rows: int, concurrency: int):
+    ai_client.model = InstantModel()
+    ai_client.start()
+    await init_db()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(alert):
+            async with semaphore:
+                (await client.post("/api/v1/alerts/", json=alert)).raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(alert) for alert in make_alerts(rows)))
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = await client.post("/api/v1/alerts/bulk", json=make_alerts(rows, rows))
+        response.raise_for_status()
+        bulk_json = time.perf_counter() - start
+
+        body = "\n".join(json.dumps(alert) for alert in make_alerts(rows, 2 * rows))
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/v1/alerts/bulk",
+            content=body,
+            headers={"content-type": "application/x-ndjson"},
+        )
+        response.raise_for_status()
+        bulk_ndjson = time.perf_counter() - start
+
+    ai_client.close()
+    print(f"{rows} rows")
+    print(f"  single POST x{rows} (concurrency {concurrency}): {rows / single:,.0f} rows/s")
+    print(f"  bulk JSON array:  {rows / bulk_json:,.0f} rows/s")
+    print(f"  bulk NDJSON:      {rows / bulk_ndjson:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.concurrency))
@@ -0,0 +1,85 @@
+"""Query latency and memory of the fleet compliance index.
+
+    cd backend && python -m benchmarks.bench_compliance_index --hosts 100000 --patches 10000
+
+Loads synthetic deployment results straight into the in-memory index (no
+database round trips) and times the endpoint queries: per-severity
+summary, hosts missing CRITICAL patches (cold and cached), one host's
+missing patches and one patch's coverage.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_file}")
+
+from app.models.patch import PatchSeverity, TargetStatus  # noqa: E402
+from app.services.compliance_index import ComplianceIndex  # noqa: E402
+
+SEVERITIES = list(PatchSeverity)
+
+
+def load(index: ComplianceIndex, args):
+    rng = random.Random(args.seed)
+    hosts = [f"host-{i:06d}" for i in range(args.hosts)]
+    for number in range(args.patches):
+        targets = rng.sample(hosts, args.targets_per_patch)
+        results = []
+        for host in targets:
+            roll = rng.random()
+            if roll < args.installed_ratio:
+                results.append((host, TargetStatus.SUCCEEDED))
+            elif roll < args.installed_ratio + args.failed_ratio:
+                results.append((host, TargetStatus.FAILED))
+            else:
+                results.append((host, TargetStatus.PENDING))
+        index.record(f"KB{number:06d}", SEVERITIES[number % len(SEVERITIES)], results)
+    # Make sure the last host id exists so bitsets span the whole fleet
+    index.record("KB-FLEET", PatchSeverity.LOW, [(hosts[-1], TargetStatus.SUCCEEDED)])
+    return hosts
+
+
+def timed_call(label: str, func, rounds: int):
+    func()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    print(f"{label:<34} {(time.perf_counter() - start) / rounds * 1000:>9.2f} ms")
+    return result
+
+
+def main(args):
+    index = ComplianceIndex()
+    start = time.perf_counter()
+    hosts = load(index, args)
+    print(f"loaded {args.hosts:,} hosts x {args.patches:,} patches "
+          f"({args.targets_per_patch:,} targets each) in {time.perf_counter() - start:.1f}s")
+
+    summary = timed_call("summary()", index.summary, args.rounds)
+    print(f"  bitsets: {summary['bitset_bytes'] / 1024 / 1024:,.1f} MiB")
+
+    # Cold: every record() invalidates the cached union
+    def cold_missing():
+        index._missing_cache.clear()
+        return index.hosts_missing(PatchSeverity.CRITICAL)
+
+    missing = timed_call("hosts_missing(CRITICAL), cold", cold_missing, args.rounds)
+    timed_call("hosts_missing(CRITICAL), cached", lambda: index.hosts_missing(PatchSeverity.CRITICAL), args.rounds)
+    print(f"  {missing['host_count']:,} hosts missing a CRITICAL patch")
+    timed_call("patches_missing(host)", lambda: index.patches_missing(hosts[args.hosts // 2]), args.rounds)
+    timed_call("patch_compliance(patch)", lambda: index.patch_compliance("KB000042"), args.rounds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hosts", type=int, default=100000)
+    parser.add_argument("--patches", type=int, default=10000)
+    parser.add_argument("--targets-per-patch", type=int, default=1000)
+    parser.add_argument("--installed-ratio", type=float, default=0.9)
+    parser.add_argument("--failed-ratio", type=float, default=0.02)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=11)
+    main(parser.parse_args())
@@ -0,0 +1,83 @@
+"""Requests/sec of POST /api/v1/alerts against a local stub model.
+
+    cd backend && python -m benchmarks.bench_create_alert --requests 500 --concurrency 50
+
+Uses a throwaway SQLite database (requires aiosqlite) so no Postgres or
+Gemini key is needed. ``--sync`` uses a stub without an async API to
+exercise the bounded thread-pool path.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_file}")
+
+import httpx  # noqa: E402
+
+from app.core.database import init_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.ai_client import ai_client  # noqa: E402
+
+STUB_RESPONSE = json.dumps(
+    {"priority_score": 70, "classification": "performance", "suggested_action": "Investigate"}
+)
+
+
+class _Response:
+    text = STUB_RESPONSE
+
+
+class SyncStubModel:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self.latency)
+        return _Response()
+
+
+class AsyncStubModel(SyncStubModel):
+    async def generate_content_async(self, prompt, **kwargs):
+        await asyncio.sleep(self.latency)
+        return _Response()
+
+
+async def run(requests: int, concurrency: int, latency: float, sync: bool):
+    ai_client.model = SyncStubModel(latency) if sync else AsyncStubModel(latency)
+    ai_client.start()
+    await init_db()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(i: int):
+            async with semaphore:
+                response = await client.post(
+                    "/api/v1/alerts/",
+                    json={"title": f"High CPU on web-{i}", "description": "CPU above 90%"},
+                )
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    ai_client.close()
+    mode = "thread pool" if sync else "native async"
+    print(f"{requests} requests, concurrency {concurrency}, model latency {latency * 1000:.0f}ms ({mode})")
+    print(f"  {elapsed:.2f}s total, {requests / elapsed:.1f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub model latency in seconds")
+    parser.add_argument("--sync", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.latency, args.sync))
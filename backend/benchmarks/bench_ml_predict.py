@@ -0,0 +1,84 @@
+"""Throughput of ML severity prediction, one alert at a time vs batched.
+
+    cd backend && python -m benchmarks.bench_ml_predict --sizes 1,10,100,1000,10000
+
+For each batch size, predicts the same alerts through repeated
+predict_alert_severity calls and through one predict_batch call, and
+reports alerts/sec for both. With ``--train-size`` it first times
+train_model on that many synthetic labelled alerts. Needs scikit-learn,
+scipy and numpy installed.
+"""
+import argparse
+import random
+import time
+
+from app.services.ml_service import MLService
+
+WORDS = ["critical", "error", "down", "disk", "latency", "cpu", "memory", "timeout", "api", "db"]
+SOURCES = ["prometheus", "datadog", "sccm", "splunk"]
+SEVERITIES = ["low", "medium", "high", "critical"]
+
+
+def make_alerts(count: int):
+    return [
+        {
+            "title": " ".join(random.choices(WORDS, k=random.randint(2, 8))),
+            "description": " ".join(random.choices(WORDS, k=random.randint(0, 30))),
+            "source_system": random.choice(SOURCES),
+            "severity": random.choice(SEVERITIES),
+        }
+        for _ in range(count)
+    ]
+
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:,.0f}/s" if seconds else "inf"
+
+
+def main(args):
+    random.seed(0)
+    start = time.perf_counter()
+    service = MLService()
+    print(f"model load: {(time.perf_counter() - start) * 1000:.1f}ms (trained={service.is_trained})")
+
+    if args.train_size:
+        training_data = make_alerts(args.train_size)
+        start = time.perf_counter()
+        result = service.train_model(training_data)
+        print(f"train on {args.train_size}: {(time.perf_counter() - start) * 1000:.0f}ms ({result['message']})")
+
+    start = time.perf_counter()
+    MLService()
+    print(f"second MLService(): {(time.perf_counter() - start) * 1e6:.1f}us")
+
+    print(f"{'batch':>8}  {'single':>12}  {'batched':>12}  speedup")
+    for size in (int(s) for s in args.sizes.split(",")):
+        alerts = make_alerts(size)
+
+        single_alerts = alerts[:args.single_limit]
+        start = time.perf_counter()
+        single = [service.predict_alert_severity(alert) for alert in single_alerts]
+        single_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = service.predict_batch(alerts)
+        batch_seconds = time.perf_counter() - start
+
+        assert [p["severity"] for p in single] == [p["severity"] for p in batched[:len(single)]]
+        single_rate = len(single_alerts) / single_seconds
+        batch_rate = size / batch_seconds
+        print(
+            f"{size:>8}  {rate(len(single_alerts), single_seconds):>12}  "
+            f"{rate(size, batch_seconds):>12}  {batch_rate / single_rate:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1,10,100,1000,10000")
+    parser.add_argument("--train-size", type=int, default=0, help="also time training on this many alerts")
+    parser.add_argument(
+        "--single-limit", type=int, default=1000,
+        help="cap on one-at-a-time predictions per size (rate is extrapolated)",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,108 @@
+"""Cold-start cost of the ML service: import time, first prediction and memory.
+
+    cd backend && python -m benchmarks.bench_ml_startup --workers 4
+
+Trains a model on synthetic alerts into a temporary ML_MODEL_PATH, then
+starts ``--workers`` fresh interpreters at once, each of which imports the
+service, makes its first and second prediction and reports RSS and PSS.
+PSS splits shared pages between the processes mapping them, so with
+ML_MODEL_MMAP on it shows the model weights being shared across workers.
+Run with ML_MODEL_MMAP=false to compare. Needs scikit-learn installed.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+PROBE = r"""
+import json, time
+started = time.perf_counter()
+from app.services.ml_service import MLService
+imported = time.perf_counter()
+service = MLService()
+constructed = time.perf_counter()
+alert = {"title": "Disk latency high on db-1", "description": "p99 above 200ms", "source_system": "prometheus"}
+service.predict_alert_severity(alert)
+first = time.perf_counter()
+service.predict_alert_severity(alert)
+second = time.perf_counter()
+
+memory = {}
+with open("/proc/self/status") as status:
+    for line in status:
+        if line.startswith("VmRSS:"):
+            memory["rss_kb"] = int(line.split()[1])
+try:
+    with open("/proc/self/smaps_rollup") as rollup:
+        for line in rollup:
+            if line.startswith("Pss:"):
+                memory["pss_kb"] = int(line.split()[1])
+except OSError:
+    pass
+
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "construct_ms": (constructed - imported) * 1000,
+    "first_prediction_ms": (first - constructed) * 1000,
+    "second_prediction_ms": (second - first) * 1000,
+    **memory,
+}))
+# Keep the model mapped until every worker has measured
+input()
+"""
+
+WORDS = ["critical", "error", "down", "disk", "latency", "cpu", "memory", "timeout", "api", "db"]
+
+
+def train(model_path: str, samples: int):
+    from app.services.ml_service import MLService
+
+    random.seed(0)
+    alerts = [
+        {
+            "title": " ".join(random.choices(WORDS, k=random.randint(2, 8))),
+            "description": " ".join(random.choices(WORDS, k=random.randint(0, 30))),
+            "source_system": random.choice(["prometheus", "datadog", "sccm"]),
+            "severity": random.choice(["low", "medium", "high", "critical"]),
+        }
+        for _ in range(samples)
+    ]
+    print(MLService().train_model(alerts)["message"])
+    size = os.path.getsize(os.path.join(model_path, "alert_pipeline.joblib"))
+    print(f"artifact: {size / 1e6:.1f}MB")
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as model_path:
+        env = dict(os.environ, ML_MODEL_PATH=model_path)
+        subprocess.run(
+            [sys.executable, "-c", f"from benchmarks.bench_ml_startup import train; train({model_path!r}, {args.samples})"],
+            env=env,
+            check=True,
+        )
+
+        workers = [
+            subprocess.Popen([sys.executable, "-c", PROBE], env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+            for _ in range(args.workers)
+        ]
+        results = [json.loads(worker.stdout.readline()) for worker in workers]
+        for worker in workers:
+            worker.communicate("\n")
+
+    print(f"{'worker':>6}  {'import':>9}  {'first':>9}  {'second':>9}  {'rss':>9}  {'pss':>9}")
+    for i, result in enumerate(results):
+        print(
+            f"{i:>6}  {result['import_ms']:>7.1f}ms  {result['first_prediction_ms']:>7.1f}ms  "
+            f"{result['second_prediction_ms']:>7.2f}ms  {result.get('rss_kb', 0) / 1024:>7.1f}MB  "
+            f"{result.get('pss_kb', 0) / 1024:>7.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--samples", type=int, default=20000, help="synthetic alerts to train the model on")
+    main(parser.parse_args())
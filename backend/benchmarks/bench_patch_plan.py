@@ -0,0 +1,62 @@
+"""Build time of the layered patch plan on a synthetic dependency graph.
+
+    cd backend && python -m benchmarks.bench_patch_plan --patches 50000 --max-prerequisites 4
+
+Generates a random DAG (each patch requires up to --max-prerequisites
+earlier ones), optionally closes a few cycles and references unknown
+patches, and times build_plan plus a subset lookup. Pure CPU: no database.
+"""
+import argparse
+import random
+import time
+
+from app.services.patch_plan import build_plan
+
+
+def synthetic_patches(args):
+    rng = random.Random(args.seed)
+    patches = []
+    for i in range(args.patches):
+        count = rng.randint(0, min(i, args.max_prerequisites))
+        prerequisites = [f"KB{rng.randrange(i):06d}" for _ in range(count)]
+        patches.append((f"KB{i:06d}", prerequisites))
+    for _ in range(args.cycles):
+        # Point an early patch at a later one that (probably) depends on it
+        early, late = rng.randrange(args.patches // 2), rng.randrange(args.patches // 2, args.patches)
+        patches[early][1].append(f"KB{late:06d}")
+    for _ in range(args.missing):
+        patches[rng.randrange(args.patches)][1].append("KB-UNKNOWN")
+    rng.shuffle(patches)
+    return patches
+
+
+def main(args):
+    patches = synthetic_patches(args)
+    edges = sum(len(prerequisites) for _, prerequisites in patches)
+    print(f"{args.patches:,} patches, {edges:,} prerequisite edges")
+
+    timings = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        plan = build_plan(patches, satisfied=set())
+        timings.append(time.perf_counter() - start)
+    print(f"build_plan: best {min(timings) * 1000:,.0f}ms over {args.rounds} rounds")
+    print(f"  {len(plan.layers)} layers, {plan.patch_count:,} placed, "
+          f"{len(plan.cycles)} cycles, {len(plan.blocked):,} blocked, {len(plan.missing)} with missing prerequisites")
+
+    sample = [patch_id for patch_id, _ in random.Random(args.seed).sample(patches, 200)]
+    start = time.perf_counter()
+    subset = plan.for_patches(sample)
+    print(f"for_patches(200): {(time.perf_counter() - start) * 1000:,.1f}ms, "
+          f"{subset['patch_count']:,} patches in {len(subset['layers'])} layers")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patches", type=int, default=50000)
+    parser.add_argument("--max-prerequisites", type=int, default=4)
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--missing", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
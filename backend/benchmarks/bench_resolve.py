@@ -0,0 +1,82 @@
+"""Resolves/sec: SELECT + commit + refresh versus UPDATE ... RETURNING versus bulk.
+
+    cd backend && python -m benchmarks.bench_resolve --alerts 2000
+
+Runs against a throwaway SQLite database (requires aiosqlite); point
+DATABASE_URL at a scratch Postgres to measure the asyncpg path instead,
+where the single-statement path saves two round trips per resolve.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_file}")
+
+from sqlalchemy import select  # noqa: E402
+
+from app.core.database import SessionLocal, init_db  # noqa: E402
+from app.models.alert import Alert, AlertStatus  # noqa: E402
+from app.schemas.alert import AlertCreate  # noqa: E402
+from app.services.alert_service import AlertService  # noqa: E402
+
+
+async def seed(count: int, label: str):
+    alerts = [
+        AlertCreate(title=f"{label} check failed on app-{i}", source_system="bench", source_id=f"{label}-{i}")
+        for i in range(count)
+    ]
+    async with SessionLocal() as session:
+        created = await AlertService(session).create_alerts(alerts, ai_analyses=[{"priority_score": 50}] * count)
+    return [alert.id for alert in created]
+
+
+async def legacy_resolve(session, alert_id: int):
+    """The previous resolve_alert: SELECT, mutate, commit, refresh"""
+    alert = (await session.execute(select(Alert).where(Alert.id == alert_id))).scalar_one_or_none()
+    alert.status = AlertStatus.RESOLVED
+    alert.resolved_at = datetime.utcnow()
+    alert.updated_at = datetime.utcnow()
+    await session.commit()
+    await session.refresh(alert)
+
+
+async def run(args):
+    await init_db()
+
+    ids = await seed(args.alerts, "legacy")
+    async with SessionLocal() as session:
+        start = time.perf_counter()
+        for alert_id in ids:
+            await legacy_resolve(session, alert_id)
+        legacy = time.perf_counter() - start
+
+    ids = await seed(args.alerts, "single")
+    async with SessionLocal() as session:
+        service = AlertService(session)
+        start = time.perf_counter()
+        for alert_id in ids:
+            await service.resolve_alert(alert_id)
+        single = time.perf_counter() - start
+
+    ids = await seed(args.alerts, "bulk")
+    async with SessionLocal() as session:
+        service = AlertService(session)
+        start = time.perf_counter()
+        for offset in range(0, len(ids), args.batch_size):
+            await service.resolve_alerts(ids=ids[offset:offset + args.batch_size], auto_resolved=True)
+        bulk = time.perf_counter() - start
+
+    print(f"SELECT + commit + refresh: {args.alerts / legacy:,.0f} resolves/s")
+    print(f"UPDATE ... RETURNING:      {args.alerts / single:,.0f} resolves/s")
+    print(f"bulk ({args.batch_size} per call):     {args.alerts / bulk:,.0f} resolves/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alerts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,96 @@
+"""Workflow runs/sec through the DAG engine with no-op and sleep steps.
+
+    cd backend && python -m benchmarks.bench_workflow_engine --runs 2000 --step-seconds 0.01
+
+Each run is a remediation-shaped diamond: diagnose, then --fan-out
+parallel restarts, then verify and done. Runs are created with
+submit_many and executed concurrently under the global step limit,
+against a throwaway SQLite database (requires aiosqlite). Step state is
+persisted by the batched flusher; the flush count shows how many
+UPDATE round trips all those step transitions cost.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_file}")
+
+from sqlalchemy import func, select  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import SessionLocal, init_db  # noqa: E402
+from app.models.workflow import Workflow, WorkflowRun, WorkflowRunStatus  # noqa: E402
+from app.services.workflow_engine import WorkflowEngine  # noqa: E402
+
+
+def diamond(fan_out: int, step_type: str, seconds: float):
+    params = {"seconds": seconds} if step_type == "sleep" else {}
+    restarts = [f"restart_{i}" for i in range(fan_out)]
+    return {
+        "steps": [
+            {"id": "diagnose", "type": step_type, "params": params},
+            *({"id": step_id, "type": step_type, "params": params, "depends_on": ["diagnose"]}
+              for step_id in restarts),
+            {"id": "verify", "type": step_type, "params": params, "depends_on": restarts},
+            {"id": "done", "type": "noop", "depends_on": ["verify"]},
+        ]
+    }
+
+
+async def run(args):
+    await init_db()
+    settings.WORKFLOW_MAX_CONCURRENT_STEPS = args.global_steps
+    settings.WORKFLOW_MAX_ACTIVE_RUNS = max(args.runs, settings.WORKFLOW_MAX_ACTIVE_RUNS)
+    step_type = "sleep" if args.step_seconds > 0 else "noop"
+    async with SessionLocal() as session:
+        workflow = Workflow(
+            name="bench-diamond",
+            definition=diamond(args.fan_out, step_type, args.step_seconds),
+            max_concurrency=args.per_run_steps,
+        )
+        session.add(workflow)
+        await session.commit()
+        await session.refresh(workflow)
+
+    engine = WorkflowEngine()
+    await engine.start()
+    steps = args.fan_out + 3
+    print(f"{args.runs:,} runs x {steps} {step_type} steps, "
+          f"{args.per_run_steps} steps/run, {args.global_steps} steps in flight overall")
+
+    start = time.perf_counter()
+    await engine.submit_many(workflow, [(None, None)] * args.runs)
+    submitted = time.perf_counter() - start
+    await engine.join()
+    elapsed = time.perf_counter() - start
+    await engine.stop()
+
+    async with SessionLocal() as session:
+        result = await session.execute(
+            select(WorkflowRun.status, func.count()).group_by(WorkflowRun.status)
+        )
+        statuses = {status.value: count for status, count in result.all()}
+    print(f"submit   {submitted:>8.2f}s")
+    print(f"total    {elapsed:>8.2f}s  {args.runs / elapsed:>10,.0f} runs/s  "
+          f"{engine.steps_executed / elapsed:>10,.0f} steps/s")
+    print(f"flushes  {engine.flushes:>8,}  ({engine.rows_flushed:,} run rows written)")
+    print(f"statuses {statuses}")
+    if statuses.get(WorkflowRunStatus.SUCCEEDED.value) != args.runs:
+        raise SystemExit("Not every run succeeded")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--fan-out", type=int, default=4, help="parallel restart steps per run")
+    parser.add_argument("--step-seconds", type=float, default=0.01, help="0 uses noop steps")
+    parser.add_argument("--per-run-steps", type=int, default=4, help="Workflow.max_concurrency")
+    parser.add_argument("--global-steps", type=int, default=1000, help="WORKFLOW_MAX_CONCURRENT_STEPS")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -60,6 +60,16 @@ class ApiClient {
     });
   }
 
+  // Live alert events (server-sent events); returns the EventSource so callers can close it
+  subscribeToAlertEvents(params = {}, onEvent) {
+    const queryString = new URLSearchParams(params).toString();
+    const source = new EventSource(`${this.baseURL}/alerts/stream?${queryString}`);
+    ['alert.created', 'alert.updated', 'alert.resolved', 'stream.reset'].forEach((type) => {
+      source.addEventListener(type, (event) => onEvent(type, JSON.parse(event.data)));
+    });
+    return source;
+  }
+
   // Patches
   async fetchPatches(params = {}) {
     const queryString = new URLSearchParams(params).toString();